@@ -7,13 +7,15 @@ from django.core.asgi import get_asgi_application
 django_asgi_app = get_asgi_application()
 
 from channels.routing import ProtocolTypeRouter, URLRouter
+from master.health import ReadinessApp
 from master.middleware import AuthMiddleware
+from master.metrics import MetricsApp
 
 
-from master.urls import websocket_urlpatterns
+from master.routing import websocket_urlpatterns
 
 
 application = ProtocolTypeRouter({
-    "http": django_asgi_app,
+    "http": MetricsApp(ReadinessApp(django_asgi_app)),
     'websocket':  AuthMiddleware(URLRouter(websocket_urlpatterns))
 })
@@ -0,0 +1,29 @@
+import os
+
+
+# Точка входа воркера, который обслуживает только игру по WebSocket (и
+# /metrics, /ready): настройки без HTTP приложений и middleware (см.
+# game/settings_ws.py), Django HTTP обработчик, админка и представления
+# не импортируются.
+# The entry point of a worker serving only the game over WebSocket (and
+# /metrics, /ready): settings without the HTTP apps and middleware (see
+# game/settings_ws.py); the Django HTTP handler, the admin and the views
+# are not imported.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'game.settings_ws')
+
+import django
+django.setup()
+
+from channels.routing import ProtocolTypeRouter, URLRouter
+from master.health import ReadinessApp, not_found
+from master.middleware import AuthMiddleware
+from master.metrics import MetricsApp
+
+
+from master.routing import websocket_urlpatterns
+
+
+application = ProtocolTypeRouter({
+    'http': MetricsApp(ReadinessApp(not_found)),
+    'websocket': AuthMiddleware(URLRouter(websocket_urlpatterns))
+})
@@ -55,12 +55,40 @@ WSGI_APPLICATION = 'game.wsgi.application'
 
 ASGI_APPLICATION = 'game.asgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# 'sqlite' - файл db.sqlite3 для разработки и тестов (в режиме WAL, см.
+# master/database.py), 'postgresql' - рабочий профиль. Соединения живут
+# DB_CONN_MAX_AGE секунд и переиспользуются потоками пула DB_POOL_SIZE, в
+# котором middleware проверяет пользователей (см. master/middleware.py).
+# 'sqlite' - the db.sqlite3 file for development and tests (in WAL mode,
+# see master/database.py), 'postgresql' - the production profile.
+# Connections live for DB_CONN_MAX_AGE seconds and are reused by the
+# threads of the DB_POOL_SIZE pool the middleware looks users up in (see
+# master/middleware.py).
+DB_ENGINE = config('DB_ENGINE', default='sqlite')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+DB_POOL_SIZE = config('DB_POOL_SIZE', default=8, cast=int)
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': config('POSTGRES_DB', default='game'),
+            'USER': config('POSTGRES_USER', default='game'),
+            'PASSWORD': config('POSTGRES_PASSWORD', default=''),
+            'HOST': config('POSTGRES_HOST', default='localhost'),
+            'PORT': config('POSTGRES_PORT', default=5432, cast=int),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': config('SQLITE_PATH', default=BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {'timeout': 20},
+        }
     }
-}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -89,7 +117,15 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
-STATIC_ROOT = path.join(BASE_DIR, 'staticfiles')
+STATIC_ROOT = config('STATIC_ROOT',
+                     default=path.join(BASE_DIR, 'staticfiles'))
+
+# Без DEBUG статика собирается collectstatic в сжатые файлы с хешем в
+# имени и копиями в brotli/gzip (см. master/storage.py).
+# Without DEBUG, collectstatic builds the static files into minified files
+# with a hash in the name and brotli/gzip copies (see master/storage.py).
+if not DEBUG:
+    STATICFILES_STORAGE = 'master.storage.MinifiedStaticFilesStorage'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -98,12 +134,143 @@ LOGIN_REDIRECT_URL = '/'
 REDIS_HOST = config('REDIS_HOST')
 REDIS_PORT = config('REDIS_PORT', cast=int)
 
+# Шарды redis для channel layer через запятую (host:port). Группа комнаты
+# и её состояние лежат на одном шарде (см. master/batch.py), ключи подбора
+# комнат - на первом.
+# Channel layer redis shards, comma separated (host:port). A room group
+# and its state live on the same shard (see master/batch.py), the
+# matchmaking keys on the first one.
+# База redis на всех шардах. Тесты работают в своей базе (см.
+# game/settings_test.py).
+# The redis database on all the shards. Tests use a database of their own
+# (see game/settings_test.py).
+REDIS_DB = config('REDIS_DB', default=0, cast=int)
+REDIS_HOSTS = config(
+    'REDIS_HOSTS', default='{}:{}'.format(REDIS_HOST, REDIS_PORT),
+    cast=lambda v: [{'address': (host.strip(), int(port)), 'db': REDIS_DB}
+                    for host, port in (s.rsplit(':', 1) for s in v.split(','))]
+)
+
+AUTH_CACHE_SIZE = config('AUTH_CACHE_SIZE', default=10000, cast=int)
+AUTH_CACHE_LOCAL_TTL = config('AUTH_CACHE_LOCAL_TTL', default=30, cast=int)
+AUTH_CACHE_TTL = config('AUTH_CACHE_TTL', default=600, cast=int)
+
+# 'redis' - состояние комнаты читается и меняется в redis на каждый кадр,
+# 'memory' - комнатой владеет один процесс (см. master/engine.py).
+# 'redis' - the room state is read and changed in redis on every frame,
+# 'memory' - a room is owned by one process (see master/engine.py).
+ROOM_ENGINE = config('ROOM_ENGINE', default='redis')
+ROOM_ENGINE_FLUSH_INTERVAL = config('ROOM_ENGINE_FLUSH_INTERVAL',
+                                    default=0.05, cast=float)
+
+# Удаление брошенных комнат (см. master/reaper.py): проход раз в
+# REAPER_INTERVAL секунд (0 - выключено), комнаты без активности дольше
+# REAPER_GRACE секунд и пустой группой удаляются, с подключёнными
+# игроками - после REAPER_IDLE_TTL секунд простоя.
+# Removal of abandoned rooms (see master/reaper.py): a pass every
+# REAPER_INTERVAL seconds (0 - disabled), rooms without activity for
+# longer than REAPER_GRACE seconds and an empty group are removed, with
+# connected players - after REAPER_IDLE_TTL seconds of idling.
+REAPER_INTERVAL = config('REAPER_INTERVAL', default=30, cast=float)
+REAPER_GRACE = config('REAPER_GRACE', default=120, cast=float)
+REAPER_IDLE_TTL = config('REAPER_IDLE_TTL', default=1800, cast=float)
+
+# Архив сыгранных игр (см. master/archive.py): раз в ARCHIVE_INTERVAL
+# секунд (0 - выключено) истории комнат, удалённых больше ARCHIVE_GRACE
+# секунд назад, переносятся в базу пачками по ARCHIVE_BATCH_SIZE.
+# The archive of played games (see master/archive.py): every
+# ARCHIVE_INTERVAL seconds (0 - disabled) the histories of rooms removed
+# more than ARCHIVE_GRACE seconds ago are moved to the database in
+# batches of ARCHIVE_BATCH_SIZE.
+ARCHIVE_INTERVAL = config('ARCHIVE_INTERVAL', default=10, cast=float)
+ARCHIVE_GRACE = config('ARCHIVE_GRACE', default=5, cast=float)
+ARCHIVE_BATCH_SIZE = config('ARCHIVE_BATCH_SIZE', default=100, cast=int)
+
+# Боты-соперники (см. master/bots.py): игрок, ждущий соперника дольше
+# BOT_WAIT секунд (0 - выключено, по умолчанию), получает бота, который
+# думает над ходом около BOT_THINK_TIME секунд и уходит из комнаты после
+# BOT_IDLE_TTL секунд тишины соперника.
+# Bot enemies (see master/bots.py): a player waiting for an enemy for
+# longer than BOT_WAIT seconds (0 - disabled, the default) gets a bot,
+# which thinks about a move for about BOT_THINK_TIME seconds and leaves
+# the room after BOT_IDLE_TTL seconds of silence from the enemy.
+BOT_WAIT = config('BOT_WAIT', default=0, cast=float)
+BOT_THINK_TIME = config('BOT_THINK_TIME', default=1.0, cast=float)
+BOT_IDLE_TTL = config('BOT_IDLE_TTL', default=300, cast=float)
+
+# Проверка соединений (см. master/heartbeat.py): соединению, молчащему
+# HEARTBEAT_INTERVAL секунд (0 - выключено), отправляется ping; не
+# ответившее за HEARTBEAT_TIMEOUT секунд закрывается, как и соединение
+# без кадров игрока дольше IDLE_TIMEOUT секунд (0 - без ограничения).
+# Connection checks (see master/heartbeat.py): a connection silent for
+# HEARTBEAT_INTERVAL seconds (0 - disabled) gets a ping; one that has not
+# answered within HEARTBEAT_TIMEOUT seconds is closed, and so is a
+# connection without player frames for longer than IDLE_TIMEOUT seconds
+# (0 - no limit).
+HEARTBEAT_INTERVAL = config('HEARTBEAT_INTERVAL', default=20, cast=float)
+HEARTBEAT_TIMEOUT = config('HEARTBEAT_TIMEOUT', default=60, cast=float)
+IDLE_TIMEOUT = config('IDLE_TIMEOUT', default=900, cast=float)
+
+# Лобби (см. master/lobby.py): изменения присутствия и открытых комнат
+# рассылаются подписчикам не чаще LOBBY_RATE раз в секунду (0 -
+# выключено), подписчики видят не больше LOBBY_ROOMS_LIMIT открытых
+# комнат. Процесс продлевает своих пользователей раз в PRESENCE_HEARTBEAT
+# секунд, непродлённый пользователь уходит из лобби через PRESENCE_TTL
+# секунд.
+# The lobby (see master/lobby.py): presence and open room changes are sent
+# to the subscribers at most LOBBY_RATE times a second (0 - disabled),
+# the subscribers see at most LOBBY_ROOMS_LIMIT open rooms. A process
+# extends its users every PRESENCE_HEARTBEAT seconds, a user not extended
+# leaves the lobby after PRESENCE_TTL seconds.
+LOBBY_RATE = config('LOBBY_RATE', default=2, cast=float)
+LOBBY_ROOMS_LIMIT = config('LOBBY_ROOMS_LIMIT', default=100, cast=int)
+PRESENCE_HEARTBEAT = config('PRESENCE_HEARTBEAT', default=10, cast=float)
+PRESENCE_TTL = config('PRESENCE_TTL', default=30, cast=float)
+
+# Частота кадров клиента (кадров в секунду, запас корзины) по контекстам
+# для каждого соединения и для комнаты в целом (см. master/throttle.py).
+# Лишние кадры отбрасываются, клиент получает кадр throttled.
+# Client frame rates (frames per second, bucket capacity) per context for
+# every connection and for the room as a whole (see master/throttle.py).
+# Extra frames are dropped, the client gets a throttled frame.
+THROTTLE_CONNECTION_RATES = {
+    'shot': (10, 20),
+    'send_message': (5, 10),
+    'load_messages': (2, 5),
+    'player_ready': (1, 3),
+}
+THROTTLE_ROOM_RATES = {
+    'shot': (20, 40),
+    'send_message': (10, 20),
+}
+
+# Очередь исходящих кадров соединения. Если клиент читает медленнее, чем
+# приходят кадры, и очередь заполнилась: 'close' - соединение
+# закрывается (клиент переподключится и получит пропущенное через
+# resync), 'drop' - кадр отбрасывается.
+# The outbound frame queue of a connection. When the client reads slower
+# than frames arrive and the queue is full: 'close' - the connection is
+# closed (the client reconnects and gets what it missed through resync),
+# 'drop' - the frame is dropped.
+OUTBOUND_QUEUE_SIZE = config('OUTBOUND_QUEUE_SIZE', default=256, cast=int)
+OUTBOUND_OVERFLOW = config('OUTBOUND_OVERFLOW', default='close')
+
+# Каналы соединений процесса делят одну очередь redis (см.
+# master/reader.py), поэтому её ёмкость - на все соединения процесса, а
+# не на одно.
+# The connection channels of a process share one redis queue (see
+# master/reader.py), so its capacity is for all the connections of the
+# process rather than for one.
+PLAYER_CHANNEL_CAPACITY = config('PLAYER_CHANNEL_CAPACITY', default=10000,
+                                 cast=int)
+
 CHANNEL_LAYERS = {
     'default': {
         'BACKEND': 'channels_redis.core.RedisChannelLayer',
         'CONFIG': {
-            "hosts": [(REDIS_HOST, REDIS_PORT)],
+            "hosts": REDIS_HOSTS,
             "group_expiry": 1800,
+            "channel_capacity": {"player.*": PLAYER_CHANNEL_CAPACITY},
         },
     },
 }
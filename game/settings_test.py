@@ -0,0 +1,15 @@
+from .settings import *  # noqa: F401,F403
+from .settings import CHANNEL_LAYERS, REDIS_HOSTS, config
+
+
+# Настройки тестов (manage.py test --settings=game.settings_test): тесты
+# работают в своих базах redis и очищают их перед каждым тестом. Вторая
+# база нужна тестам шардирования как второй шард.
+# Test settings (manage.py test --settings=game.settings_test): tests use
+# redis databases of their own and flush them before every test. The
+# second database is the second shard of the sharding tests.
+REDIS_DB = config('TEST_REDIS_DB', default=15, cast=int)
+TEST_REDIS_SHARD_DB = config('TEST_REDIS_SHARD_DB', default=14, cast=int)
+
+REDIS_HOSTS = [dict(host, db=REDIS_DB) for host in REDIS_HOSTS]
+CHANNEL_LAYERS['default']['CONFIG']['hosts'] = REDIS_HOSTS
@@ -0,0 +1,21 @@
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS
+
+
+# Настройки воркера, обслуживающего только WebSocket (game/asgi_ws.py):
+# приложения, которые нужны лишь HTTP страницам, не загружаются, HTTP
+# middleware нет. Пользователей проверяет AuthMiddleware по
+# django.contrib.auth.
+# Settings of a WebSocket-only worker (game/asgi_ws.py): the apps only
+# the HTTP pages need are not loaded, there is no HTTP middleware. Users
+# are checked by AuthMiddleware through django.contrib.auth.
+HTTP_APPS = (
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+)
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in HTTP_APPS]
+
+MIDDLEWARE = []
@@ -1,2 +1,11 @@
 from django.contrib import admin
 
+from .models import Game
+
+
+@admin.register(Game)
+class GameAdmin(admin.ModelAdmin):
+    list_display = ('room', 'member', 'guest', 'winner', 'length',
+                    'ended_at')
+    search_fields = ('member', 'guest')
+    exclude = ('history',)
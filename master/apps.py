@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MasterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'master'
+
+    def ready(self):
+        from . import database, signals  # noqa: F401
@@ -0,0 +1,197 @@
+import asyncio
+import datetime
+import json
+import logging
+import time
+
+from aioredis import Redis
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+from django.conf import settings
+from django.db import close_old_connections
+
+from .batch import RedisBatch
+from .events import HISTORY_KEY, HISTORY_TTL
+from .metrics import GAMES_ARCHIVED
+from .middleware import db_executor
+from .models import Game
+from . import history
+
+
+logger = logging.getLogger(__name__)
+
+# Комнаты, ждущие переноса в базу (ZSET [комната, игроки...] -> время
+# окончания), на шарде каждой комнаты. История ждущей комнаты хранится
+# HISTORY_TTL секунд с её удаления, даже если архиватор выключен.
+# Rooms waiting to be moved to the database (a ZSET [room, players...] ->
+# end time) on the shard of every room. The history of a waiting room is
+# kept for HISTORY_TTL seconds since its removal, even if the archiver is
+# disabled.
+ARCHIVE_KEY = 'rooms:archive'
+LOCK_KEY = 'rooms:archiver'
+
+
+def archive(batch, room, players, now=None):
+    """
+    Добавляет в пакет на шарде комнаты постановку её истории в очередь
+    архива. Вызывается там же, где удаляется состояние комнаты.
+
+    Queues the room history for the archive into a batch on the room
+    shard. Called where the room state is removed.
+    """
+    players = [player for player in players if player not in (None, 'None')]
+    batch.zadd(ARCHIVE_KEY, time.time() if now is None else now,
+               json.dumps([room] + players))
+    return batch.expire(HISTORY_KEY.format(room), HISTORY_TTL)
+
+
+def save_games(games):
+    close_old_connections()
+    Game.objects.bulk_create(games, ignore_conflicts=True)
+
+
+class GameArchiver:
+    """
+    Переносит истории окончившихся комнат из redis в базу. Удаление
+    комнаты (выход игрока после конца игры, RoomReaper) ставит её в
+    ARCHIVE_KEY; раз в interval секунд один из процессов (блокировка
+    LOCK_KEY на каждом шарде) забирает комнаты, ждущие дольше grace
+    секунд (так успевают дописаться записи, которые движок в памяти
+    сбрасывает с задержкой), пачками по batch_size: истории читаются
+    одним пакетом команд, сжимаются и записываются одним bulk_create в
+    пуле db_executor, затем удаляются из redis. Кадры игроков этой
+    работы не ждут.
+
+    Moves the histories of ended rooms from redis to the database.
+    Removing a room (a player exiting after the game, RoomReaper) queues
+    it in ARCHIVE_KEY; every interval seconds one of the processes (the
+    LOCK_KEY lock on every shard) takes the rooms waiting for longer than
+    grace seconds (so that the entries the memory engine flushes with a
+    delay get written), in batches of batch_size: the histories are read
+    in one command batch, compressed and written with one bulk_create in
+    the db_executor pool, then removed from redis. Player frames never
+    wait for this work.
+    """
+
+    def __init__(self, channel_layer=None, interval=10, grace=5,
+                 batch_size=100):
+        self.channel_layer = channel_layer
+        self.interval = interval
+        self.grace = grace
+        self.batch_size = batch_size
+        self.task = None
+
+    def start(self):
+        if self.task is not None:
+            return
+
+        if self.channel_layer is None:
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.drain()
+            except Exception:
+                logger.exception('Failed to archive games')
+
+    async def drain(self, now=None, lock=True):
+        """
+        Один проход по всем шардам. Возвращает число перенесённых игр.
+
+        One pass over all the shards. Returns the number of moved games.
+        """
+        now = time.time() if now is None else now
+        archived = 0
+
+        for index in range(self.channel_layer.ring_size):
+            if lock:
+                locked = (await RedisBatch(self.channel_layer, index).set(
+                    LOCK_KEY, now, expire=max(1, int(self.interval)),
+                    exist=Redis.SET_IF_NOT_EXIST
+                ).execute())[0]
+
+                if not locked:
+                    continue
+
+            while True:
+                taken, moved = await self.drain_batch(index, now)
+                archived += moved
+
+                if taken < self.batch_size:
+                    break
+        return archived
+
+    async def drain_batch(self, index, now):
+        """
+        Переносит до batch_size ждущих комнат шарда. Возвращает число
+        взятых из очереди комнат и число записанных игр.
+
+        Moves up to batch_size waiting rooms of the shard. Returns the
+        number of rooms taken from the queue and of games written.
+        """
+        waiting = (await RedisBatch(self.channel_layer, index).zrangebyscore(
+            ARCHIVE_KEY, max=now - self.grace, withscores=True, offset=0,
+            count=self.batch_size, encoding='utf8'
+        ).execute())[0]
+
+        if not waiting:
+            return 0, 0
+        rooms = [json.loads(member) for member, _ in waiting]
+        batch = RedisBatch(self.channel_layer, index)
+
+        for room, *_ in rooms:
+            batch.lrange(HISTORY_KEY.format(room), 0, -1, encoding='utf8')
+        histories = await batch.execute()
+        games = {}
+
+        for (room, *players), (_, ended), entries in zip(rooms, waiting,
+                                                         histories):
+            # История комнаты, где ничего не произошло, уже истёкшая или
+            # поставленная в очередь дважды.
+            # The history of a room where nothing happened, expired or
+            # queued twice.
+            if not entries or room in games:
+                continue
+            member, guest = (players + ['', ''])[:2]
+            loser = history.loser(json.loads(entry) for entry in entries)
+            games[room] = Game(
+                room=room, member=member, guest=guest,
+                winner=(member if loser == guest else guest) if loser else '',
+                ended_at=datetime.datetime.fromtimestamp(
+                    ended, datetime.timezone.utc
+                ),
+                length=len(entries), history=history.compress(entries)
+            )
+
+        if games:
+            await asyncio.get_running_loop().run_in_executor(
+                db_executor, save_games, list(games.values())
+            )
+
+        for game in games.values():
+            GAMES_ARCHIVED.inc('finished' if game.winner else 'abandoned')
+        batch = RedisBatch(self.channel_layer, index)
+        batch.zrem(ARCHIVE_KEY, *[member for member, _ in waiting])
+        await batch.delete(*[HISTORY_KEY.format(room)
+                             for room, *_ in rooms]).execute()
+        return len(waiting), len(games)
+
+
+if settings.ARCHIVE_INTERVAL > 0:
+    game_archiver = GameArchiver(interval=settings.ARCHIVE_INTERVAL,
+                                 grace=settings.ARCHIVE_GRACE,
+                                 batch_size=settings.ARCHIVE_BATCH_SIZE)
+else:
+    game_archiver = None
@@ -0,0 +1,148 @@
+import time
+import weakref
+
+from aioredis.errors import ReplyError
+
+from .metrics import REDIS_SECONDS
+
+
+# SHA1 скриптов, загруженных через пул соединений каждого шарда channel
+# layer. Кэш скриптов общий для всех соединений сервера redis, поэтому
+# ключ - пул шарда, а не отдельное соединение.
+# The SHA1 of the scripts loaded through the connection pool of every
+# channel layer shard. The script cache is shared by all the connections
+# to a redis server, so the key is the shard pool rather than a single
+# connection.
+loaded_scripts = weakref.WeakKeyDictionary()
+
+
+def shard(channel_layer, name):
+    """
+    Номер redis шарда channel layer для комнаты или другого имени.
+    channels_redis выбирает шард группы тем же хешем, поэтому состояние
+    комнаты и её группа лежат на одном шарде.
+
+    The channel layer redis shard index for a room or another name.
+    channels_redis picks the shard of a group with the same hash, so the
+    room state and its group live on the same shard.
+    """
+    return channel_layer.consistent_hash(name)
+
+
+class RedisBatch:
+    """
+    Очередь redis команд, которые отправляются одним конвейером (pipeline)
+    или одной транзакцией MULTI/EXEC на одном соединении, то есть за один
+    сетевой запрос. Команды добавляются вызовом одноимённых методов и
+    возвращают сам пакет, поэтому их можно объединять в цепочку.
+
+    A queue of redis commands sent as one pipeline or one MULTI/EXEC
+    transaction on a single connection, i.e. in one network round trip.
+    Commands are queued by calling the methods of the same name and return
+    the batch itself, so they can be chained.
+
+    Пример/Example:
+
+    room_pool = (await self.redis_batch()
+                 .hset(key, field, value)
+                 .expire(key, 3600)
+                 .hlen(key)
+                 .execute())[-1]
+    """
+
+    def __init__(self, channel_layer, index=0, transaction=False):
+        self.channel_layer = channel_layer
+        self.index = index
+        self.transaction = transaction
+        self.commands = []
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    def __len__(self):
+        return len(self.commands)
+
+    def script(self, script, keys=(), args=()):
+        """
+        Добавляет вызов Lua скрипта (EVALSHA). Скрипт, ещё не загруженный
+        на сервер этим процессом, загружается (SCRIPT LOAD) в начале того
+        же пакета, поэтому EVALSHA не получает NOSCRIPT, а команды
+        выполняются по порядку и, в транзакции, атомарно.
+
+        Queues a Lua script call (EVALSHA). A script this process has not
+        loaded onto the server yet is loaded (SCRIPT LOAD) at the start of
+        the same batch, so EVALSHA does not get NOSCRIPT, and the commands
+        run in order and, in a transaction, atomically.
+        """
+        self.commands.append((script, list(keys), list(args)))
+        return self
+
+    async def execute(self):
+        """
+        Отправляет все команды и возвращает список их результатов в
+        порядке добавления. Ошибка любой команды поднимается исключением.
+
+        Sends all the commands and returns the list of their results in
+        the order they were queued. An error in any command is raised.
+        """
+        commands, self.commands = self.commands, []
+
+        if not commands:
+            return []
+
+        started = time.perf_counter()
+
+        async with self.channel_layer.connection(self.index) as connection:
+            if self.transaction:
+                pipeline = connection.multi_exec()
+            else:
+                pipeline = connection.pipeline()
+            loaded = loaded_scripts.setdefault(
+                self.channel_layer.pools[self.index], set()
+            )
+            scripts = {command.sha: command.source
+                       for command, _, _ in commands
+                       if not isinstance(command, str)
+                       and command.sha not in loaded}
+
+            for source in scripts.values():
+                pipeline.script_load(source)
+
+            for command, args, kwargs in commands:
+                if isinstance(command, str):
+                    getattr(pipeline, command)(*args, **kwargs)
+                else:
+                    pipeline.evalsha(command.sha, keys=args, args=kwargs)
+            results = await pipeline.execute(return_exceptions=True)
+            results = results[len(scripts):]
+
+        # NOSCRIPT возможен, только если кэш скриптов сервера очистили
+        # (SCRIPT FLUSH, перезапуск): остальные команды пакета уже
+        # выполнены, поэтому ошибка поднимается, а следующий пакет
+        # загрузит скрипты заново.
+        # NOSCRIPT is only possible if the server script cache was emptied
+        # (SCRIPT FLUSH, a restart): the other commands of the batch have
+        # run already, so the error is raised, and the next batch loads
+        # the scripts again.
+        if any(isinstance(result, ReplyError)
+               and str(result).startswith('NOSCRIPT') for result in results):
+            loaded.clear()
+        else:
+            loaded.update(scripts)
+
+        elapsed = time.perf_counter() - started
+
+        for command in {command if isinstance(command, str) else command.name
+                        for command, _, _ in commands}:
+            REDIS_SECONDS.observe(elapsed, command)
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
@@ -0,0 +1,259 @@
+import json
+import random
+
+
+COLUMNS = 'ABCDEFGHIJ'
+SIZE = 10
+CELLS = SIZE * SIZE
+BOARD_BYTES = (CELLS + 7) // 8
+FLEET = (4, 3, 3, 2, 2, 2, 1, 1, 1, 1)
+FLEET_SIZE = sum(FLEET)
+
+# Поля доски в хеше комнаты: корабли игрока, подбитые клетки его кораблей и
+# его промахи. Значения - битовые маски по BOARD_BYTES байт.
+# Board fields in the room hash: the player's ships, the hit cells of their
+# ships and their misses. Values are BOARD_BYTES byte bitmasks.
+SHIPS = ':ships'
+HITS = ':hits'
+MISSES = ':misses'
+BOARD_FIELDS = (SHIPS, HITS, MISSES)
+
+
+def cell_index(cell):
+    """
+    Номер клетки 0..99 по её идентификатору ('cell_A1' -> 0). Принимается
+    только идентификатор в том виде, в каком его строит cell_id: 'cell_A01',
+    'cell_A+1' или не строка - ValueError.
+
+    Index 0..99 of a cell by its id ('cell_A1' -> 0). Only an id in the
+    form cell_id builds is accepted: 'cell_A01', 'cell_A+1' or a non-string
+    is a ValueError.
+    """
+    try:
+        return CELL_INDEXES[cell]
+    except (KeyError, TypeError):
+        raise ValueError('Invalid cell: {!r}'.format(cell)) from None
+
+
+def cell_id(index):
+    """
+    Идентификатор клетки, который ожидает main.js, по её номеру.
+
+    The cell id main.js expects, by its index.
+    """
+    return 'cell_{}{}'.format(COLUMNS[index % SIZE], index // SIZE + 1)
+
+
+CELL_INDEXES = {cell_id(index): index for index in range(CELLS)}
+
+
+def to_mask(cells):
+    """
+    Битовая маска из списка идентификаторов клеток.
+
+    Bitmask from a list of cell ids.
+    """
+    mask = 0
+
+    for cell in cells:
+        mask |= 1 << cell_index(cell)
+    return mask
+
+
+def to_cells(mask):
+    """
+    Список идентификаторов клеток из битовой маски.
+
+    List of cell ids from a bitmask.
+    """
+    cells = []
+
+    while mask:
+        low = mask & -mask
+        cells.append(cell_id(low.bit_length() - 1))
+        mask ^= low
+    return cells
+
+
+def popcount(mask):
+    return bin(mask).count('1')
+
+
+def build_placements():
+    """
+    Таблица допустимых положений кораблей: для каждой клетки - список
+    (маска корабля, маска его окружения, длина) всех кораблей флота,
+    у которых эта клетка - левая верхняя. Окружение - соседние клетки,
+    в том числе по диагонали, в пределах поля; в нём не должно быть
+    других кораблей.
+
+    The table of legal ship positions: for every cell, a list of (ship
+    mask, mask of its surroundings, length) of all the fleet ships whose
+    top left cell it is. The surroundings are the neighbouring cells,
+    diagonals included, within the board; no other ship may be there.
+    """
+    placements = [[] for _ in range(CELLS)]
+
+    for length in sorted(set(FLEET), reverse=True):
+        for horizontal in ((True, False) if length > 1 else (True,)):
+            for y in range(SIZE - (0 if horizontal else length - 1)):
+                for x in range(SIZE - (length - 1 if horizontal else 0)):
+                    ship = [(x + i, y) if horizontal else (x, y + i)
+                            for i in range(length)]
+                    ship_mask = around = 0
+
+                    for sx, sy in ship:
+                        ship_mask |= 1 << (sy * SIZE + sx)
+
+                        for dy in (-1, 0, 1):
+                            for dx in (-1, 0, 1):
+                                nx, ny = sx + dx, sy + dy
+
+                                if 0 <= nx < SIZE and 0 <= ny < SIZE:
+                                    around |= 1 << (ny * SIZE + nx)
+                    placements[y * SIZE + x].append(
+                        (ship_mask, around & ~ship_mask, length)
+                    )
+    return placements
+
+
+PLACEMENTS = build_placements()
+FLEET_COUNTS = tuple(FLEET.count(length) for length in range(max(FLEET) + 1))
+
+
+def valid_fleet(mask, counts=FLEET_COUNTS):
+    """
+    Проверяет, что маска - флот с counts[длина] кораблями каждой длины
+    (по умолчанию стандартный FLEET): корабли прямые, в пределах поля и
+    не касаются друг друга, в том числе углами. Самая
+    младшая клетка маски - левая верхняя клетка своего корабля, поэтому
+    корабль находится по таблице PLACEMENTS двумя AND на кандидата и
+    снимается с маски.
+
+    Checks that the mask is a fleet with counts[length] ships of every
+    length (the standard FLEET by default): the ships are straight,
+    within the board and do not touch each other, diagonally included.
+    The lowest cell of the mask is the top left cell of its ship, so the
+    ship is found in the PLACEMENTS table with two ANDs per candidate and
+    taken off the mask.
+    """
+    remaining = list(counts)
+
+    while mask:
+        for ship, around, length in PLACEMENTS[(mask & -mask).bit_length()
+                                               - 1]:
+            if mask & ship == ship and not mask & around:
+                break
+        else:
+            return False
+
+        if length >= len(remaining) or not remaining[length]:
+            return False
+        remaining[length] -= 1
+        mask ^= ship
+    return not any(remaining)
+
+
+def encode(mask):
+    """
+    Компактное представление маски для redis: BOARD_BYTES байт,
+    клетка i - бит i % 8 байта i // 8.
+
+    Compact redis encoding of a mask: BOARD_BYTES bytes,
+    cell i is bit i % 8 of byte i // 8.
+    """
+    return mask.to_bytes(BOARD_BYTES, 'little')
+
+
+def decode(value):
+    return int.from_bytes(value or b'', 'little')
+
+
+def random_fleet(rng=random):
+    """
+    Случайная расстановка стандартного флота: корабли не выходят за поле и
+    не касаются друг друга, в том числе углами.
+
+    A random placement of the standard fleet: ships stay in bounds and do
+    not touch each other, diagonally included.
+    """
+    while True:
+        taken = 0
+        cells = []
+
+        for length in FLEET:
+            for _ in range(100):
+                horizontal = rng.random() < 0.5
+                x = rng.randrange(SIZE - (length - 1 if horizontal else 0))
+                y = rng.randrange(SIZE - (0 if horizontal else length - 1))
+                ship = [(y + (0 if horizontal else i)) * SIZE
+                        + x + (i if horizontal else 0)
+                        for i in range(length)]
+
+                if not any(taken >> index & 1 for index in ship):
+                    break
+            else:
+                break
+
+            for index in ship:
+                cells.append(cell_id(index))
+
+                for dy in (-1, 0, 1):
+                    for dx in (-1, 0, 1):
+                        nx, ny = index % SIZE + dx, index // SIZE + dy
+
+                        if 0 <= nx < SIZE and 0 <= ny < SIZE:
+                            taken |= 1 << (ny * SIZE + nx)
+        else:
+            return cells
+
+
+def client_state(raw):
+    """
+    Переводит сырой хеш комнаты (байты) в состояние, которое ожидает
+    main.js: битовые доски превращаются в JSON списки клеток
+    selected_cells/dead_cells/miss_cells/hit_cells.
+
+    Converts the raw room hash (bytes) into the state main.js expects:
+    bitboards become JSON lists of selected_cells/dead_cells/miss_cells/
+    hit_cells.
+    """
+    data = {}
+    boards = {}
+
+    for key, value in raw.items():
+        key = key.decode('utf8')
+
+        if key.endswith(BOARD_FIELDS):
+            boards[key] = decode(value)
+        else:
+            data[key] = value.decode('utf8')
+
+    players = [data.get('room_member', ''), data.get('room_guest', '')]
+
+    for username, enemy in (players, players[::-1]):
+        if username + SHIPS in boards:
+            data[username + ':selected_cells'] = json.dumps(
+                to_cells(boards[username + SHIPS])
+            )
+        if username + HITS in boards:
+            dead_cells = json.dumps(to_cells(boards[username + HITS]))
+            data[username + ':dead_cells'] = dead_cells
+            data[enemy + ':hit_cells'] = dead_cells
+        if username + MISSES in boards:
+            data[username + ':miss_cells'] = json.dumps(
+                to_cells(boards[username + MISSES])
+            )
+    return data
+
+
+def spectator_state(raw):
+    """
+    Состояние комнаты для зрителей: как client_state, но без расстановки
+    кораблей игроков (видны только попадания и промахи).
+
+    The room state for spectators: as client_state, but without the
+    players' ship placement (only hits and misses are visible).
+    """
+    return {key: value for key, value in client_state(raw).items()
+            if not key.endswith(':selected_cells')}
@@ -0,0 +1,514 @@
+import asyncio
+import json
+import logging
+import random
+import time
+
+from urllib.parse import urlencode
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+from django.conf import settings
+
+from .matchmaking import Matchmaker, OPEN_ROOMS_KEY, ROOM_TTL
+from .metrics import BOT_DECISION_SECONDS, BOT_GAMES
+from . import board
+
+
+logger = logging.getLogger(__name__)
+
+# Имена ботов: префикс и комната ('bot.room_17'). Пользователей с таким
+# префиксом нет в базе, регистрация его не принимает (см. forms.py).
+# Bot names: the prefix and the room ('bot.room_17'). There are no users
+# with this prefix in the database and registration does not accept it
+# (see forms.py).
+BOT_PREFIX = 'bot.'
+
+
+class ShotPlanner:
+    """
+    Выбор выстрела по плотности вероятности сразу для многих игр. Для
+    каждой игры известны её попадания и промахи (массивы G x CELLS);
+    все 580 положений кораблей из board.PLACEMENTS - матрицы, поэтому
+    шаг для всех игр - несколько матричных умножений NumPy:
+
+    - потопленный корабль - положение, все клетки которого подбиты, а
+      клетки на продолжении отрезка известны пустыми (или длиннее
+      отрезка кораблей не осталось);
+    - допустимое положение не задевает промахи, клетки по диагонали от
+      попаданий, потопленные корабли с окружением и не касается чужих
+      подбитых клеток; его вес - число оставшихся кораблей его длины;
+    - если есть подбитый непотопленный корабль (добивание), учитываются
+      только положения, проходящие через его клетки;
+    - плотность клетки - сумма весов проходящих через неё положений,
+      стреляем в самую плотную ещё не обстрелянную клетку (равные -
+      случайно).
+
+    Probability density shot selection for many games at once. For every
+    game its hits and misses are known (G x CELLS arrays); all the 580 ship
+    positions from board.PLACEMENTS are matrices, so a step for all the
+    games is a few NumPy matrix products:
+
+    - a sunk ship is a position with all its cells hit and the cells
+      extending the segment known to be empty (or no ships longer than
+      the segment left);
+    - a possible position avoids the misses, the cells diagonal to hits,
+      the sunk ships with their surroundings, and does not touch hit cells
+      it does not cover; its weight is the number of remaining ships of
+      its length;
+    - if there is a hit ship not sunk yet (targeting), only the positions
+      through its cells count;
+    - the density of a cell is the sum of the weights of the positions
+      through it, the densest cell not shot yet is shot (ties at random).
+    """
+
+    def __init__(self, seed=None):
+        import numpy
+
+        np = self.np = numpy
+        self.rng = np.random.default_rng(seed)
+        ships, around, lengths = zip(*[
+            placement for placements in board.PLACEMENTS
+            for placement in placements
+        ])
+        self.ships = self.matrix(ships)
+        self.around = self.matrix(around)
+        self.ends = self.matrix([self.line_ends(ship, length)
+                                 for ship, length in zip(ships, lengths)])
+        self.end_counts = self.ends.sum(axis=1)
+        self.lengths = np.array(lengths)
+        self.by_length = (self.lengths[:, None] == np.arange(
+            len(board.FLEET_COUNTS)
+        )).astype(np.float32)
+        self.counts = np.array(board.FLEET_COUNTS, dtype=np.float32)
+        self.diagonal = self.matrix([self.diagonal_cells(index)
+                                     for index in range(board.CELLS)])
+
+    def matrix(self, masks):
+        return self.np.stack([self.bits(mask) for mask in masks]).astype(
+            self.np.float32
+        )
+
+    def bits(self, masks):
+        """
+        Битовые маски (число или список чисел) как булев массив клеток.
+
+        Bitmasks (a number or a list of numbers) as a boolean cell array.
+        """
+        np = self.np
+        single = isinstance(masks, int)
+        data = b''.join(mask.to_bytes(board.BOARD_BYTES, 'little')
+                        for mask in ([masks] if single else masks))
+        cells = np.unpackbits(
+            np.frombuffer(data, np.uint8).reshape(-1, board.BOARD_BYTES),
+            axis=1, bitorder='little'
+        )[:, :board.CELLS].astype(bool)
+        return cells[0] if single else cells
+
+    @staticmethod
+    def line_ends(ship, length):
+        """
+        Клетки на продолжении корабля: по его линии для длинных, все
+        четыре соседа для однопалубного.
+
+        The cells extending a ship: along its line for long ones, all four
+        neighbours for a single cell.
+        """
+        cells = [index for index in range(board.CELLS) if ship >> index & 1]
+        horizontal = length > 1 and cells[1] == cells[0] + 1
+        vertical = length > 1 and not horizontal
+        mask = 0
+
+        for index in cells:
+            x, y = index % board.SIZE, index // board.SIZE
+
+            for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                nx, ny = x + dx, y + dy
+
+                if (dx and vertical) or (dy and horizontal):
+                    continue
+
+                if 0 <= nx < board.SIZE and 0 <= ny < board.SIZE:
+                    mask |= 1 << (ny * board.SIZE + nx)
+        return mask & ~ship
+
+    @staticmethod
+    def diagonal_cells(index):
+        x, y = index % board.SIZE, index // board.SIZE
+        mask = 0
+
+        for dx in (-1, 1):
+            for dy in (-1, 1):
+                if 0 <= x + dx < board.SIZE and 0 <= y + dy < board.SIZE:
+                    mask |= 1 << ((y + dy) * board.SIZE + x + dx)
+        return mask
+
+    def choose(self, hits, misses):
+        """
+        Номера клеток для выстрела (массив G) по попаданиям и промахам
+        G игр (булевы массивы G x CELLS).
+
+        Cell indices to shoot (a G array) by the hits and misses of G
+        games (G x CELLS boolean arrays).
+        """
+        np = self.np
+        hits_f = hits.astype(np.float32)
+        empty = misses | (hits_f @ self.diagonal > 0)
+        covered = hits_f @ self.ships.T
+        ends_known = empty.astype(np.float32) @ self.ends.T
+        ends_hit = hits_f @ self.ends.T
+        complete = (covered == self.lengths) & (ends_hit == 0)
+
+        sunk = complete & ((ends_known == self.end_counts)
+                           | (self.lengths == len(self.counts) - 1))
+        remaining = self.counts - sunk @ self.by_length
+        # Отрезок не короче самого длинного оставшегося корабля тоже
+        # потоплен.
+        # A segment as long as the longest remaining ship is sunk too.
+        longest = (remaining > 0) * np.arange(len(self.counts))
+        sunk |= complete & (self.lengths >= longest.max(axis=1)[:, None])
+        remaining = np.maximum(self.counts - sunk @ self.by_length, 0)
+
+        sunk_f = sunk.astype(np.float32)
+        sunk_cells = sunk_f @ self.ships > 0
+        blocked = empty | sunk_cells | (sunk_f @ self.around > 0)
+        active = (hits & ~sunk_cells).astype(np.float32)
+        possible = ((blocked.astype(np.float32) @ self.ships.T == 0)
+                    & (active @ self.around.T == 0))
+        weights = possible * remaining[:, self.lengths]
+        through = active @ self.ships.T
+        targeting = active.any(axis=1)
+        weights[targeting] *= through[targeting] > 0
+
+        density = weights @ self.ships
+        # Шум меньше единицы только разбивает равенства, а если плотность
+        # везде нулевая, выбирает случайную необстрелянную клетку.
+        # The noise below one only breaks ties, and if the density is zero
+        # everywhere, it picks a random cell not shot yet.
+        density += self.rng.random(density.shape, dtype=np.float32) * 0.5
+        density[hits | misses] = -1
+        return density.argmax(axis=1)
+
+    def choose_masks(self, games):
+        """
+        То же для списка пар битовых масок (попадания, промахи).
+
+        The same for a list of (hits, misses) bitmask pairs.
+        """
+        hits, misses = zip(*games)
+        return self.choose(self.bits(list(hits)),
+                           self.bits(list(misses))).tolist()
+
+
+class ShotQueue:
+    """
+    Собирает запросы выстрелов всех ботов процесса за window секунд и
+    решает их одним шагом ShotPlanner: на ход одного бота уходят
+    микросекунды, даже когда игр тысячи.
+
+    Collects the shot requests of all the bots of the process for window
+    seconds and resolves them with one ShotPlanner step: a move of a
+    single bot takes microseconds even with thousands of games.
+    """
+
+    def __init__(self, planner=None, window=0.01):
+        self.planner = planner
+        self.window = window
+        self.pending = []
+        self.handle = None
+
+    async def choose(self, hits, misses):
+        if self.planner is None:
+            self.planner = ShotPlanner()
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((hits, misses, future))
+
+        if self.handle is None:
+            self.handle = asyncio.get_running_loop().call_later(
+                self.window, self.decide
+            )
+        return await future
+
+    def decide(self):
+        pending, self.pending, self.handle = self.pending, [], None
+
+        with BOT_DECISION_SECONDS.time():
+            try:
+                cells = self.planner.choose_masks(
+                    [(hits, misses) for hits, misses, _ in pending]
+                )
+            except Exception as error:
+                for *_, future in pending:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+
+        for (*_, future), cell in zip(pending, cells):
+            if not future.done():
+                future.set_result(cell)
+
+
+class LocalConnection:
+    """
+    WebSocket соединение бота с InterfaceConsumer внутри процесса: кадры
+    ходят через очереди ASGI сообщений, без сети и без AuthMiddleware.
+
+    A bot WebSocket connection to InterfaceConsumer inside the process:
+    frames go through ASGI message queues, without a network and without
+    AuthMiddleware.
+    """
+
+    def __init__(self, username):
+        self.username = username
+        self.inbound = asyncio.Queue()
+        self.outbound = asyncio.Queue()
+        self.task = None
+
+    async def connect(self, timeout):
+        from .consumers import InterfaceConsumer
+
+        scope = {
+            'type': 'websocket', 'path': '/ws/game/', 'headers': [],
+            'query_string': urlencode({'username': self.username}).encode(),
+            'subprotocols': [], 'client': None, 'server': None
+        }
+        self.task = asyncio.ensure_future(InterfaceConsumer.as_asgi()(
+            scope, self.inbound.get, self.outbound.put
+        ))
+        await self.inbound.put({'type': 'websocket.connect'})
+        message = await asyncio.wait_for(self.outbound.get(), timeout)
+
+        if message['type'] != 'websocket.accept':
+            raise ConnectionError('connection rejected')
+
+    async def send(self, frame):
+        await self.inbound.put({'type': 'websocket.receive',
+                                'text': json.dumps(frame)})
+
+    async def receive(self, timeout):
+        message = await asyncio.wait_for(self.outbound.get(), timeout)
+
+        if message['type'] == 'websocket.close':
+            raise ConnectionError('connection closed')
+        return json.loads(message['text'])
+
+    async def close(self):
+        if self.task is None or self.task.done():
+            return
+        await self.inbound.put({'type': 'websocket.disconnect',
+                                'code': 1000})
+
+        try:
+            await asyncio.wait_for(self.task, 5)
+        except Exception:
+            logger.exception('Bot connection of %s did not close',
+                             self.username)
+
+
+class Bot:
+    """
+    Бот - виртуальный гость комнаты: подключается к ней как обычный
+    игрок, расставляет случайный флот, стреляет в свой ход по выбору
+    ShotQueue с паузой think_time и выходит из комнаты после конца игры
+    или idle_ttl секунд тишины соперника.
+
+    A bot is a virtual room guest: it connects to the room as a regular
+    player, places a random fleet, shoots in its turn as ShotQueue
+    chooses after a think_time pause and leaves the room after the game
+    or idle_ttl seconds of silence from the enemy.
+    """
+
+    def __init__(self, room, queue, think_time=1.0, idle_ttl=300):
+        self.room = room
+        self.username = BOT_PREFIX + room
+        self.queue = queue
+        self.think_time = think_time
+        self.idle_ttl = idle_ttl
+        self.rng = random.Random()
+        self.hits = self.misses = 0
+        self.my_turn = False
+        self.result = 'abandoned'
+
+    async def play(self):
+        connection = LocalConnection(self.username)
+        await connection.connect(self.idle_ttl)
+
+        try:
+            frame = await connection.receive(self.idle_ttl)
+
+            if frame.get('room') != self.room:
+                return self.result
+            await self.think()
+            await connection.send({'context': 'player_ready',
+                                   'selected_cells':
+                                       board.random_fleet(self.rng)})
+
+            while True:
+                try:
+                    frame = await connection.receive(self.idle_ttl)
+                except asyncio.TimeoutError:
+                    await connection.send({'context': 'exit_room'})
+                    return self.result
+
+                if frame['context'] == 'ping':
+                    await connection.send({'context': 'pong'})
+                elif self.handle(frame) and self.result == 'won':
+                    await connection.send({'context': 'exit_room'})
+                elif frame['context'] == 'notification' and (
+                    frame['type'] == 'exit_room'
+                ):
+                    return self.result
+
+                if self.my_turn:
+                    self.my_turn = False
+                    await self.think()
+                    cell = await self.queue.choose(self.hits, self.misses)
+                    await connection.send({'context': 'shot',
+                                           'cell': board.cell_id(cell)})
+        finally:
+            await connection.close()
+
+    async def think(self):
+        await asyncio.sleep(self.rng.uniform(0.5, 1.5) * self.think_time)
+
+    def handle(self, frame):
+        """
+        Обновляет доску бота по кадру. Возвращает True в конце игры.
+
+        Updates the bot board from a frame. Returns True at the end of the
+        game.
+        """
+        context = frame['context']
+
+        if context == 'throttled' and frame['request'] == 'shot':
+            self.my_turn = True
+        elif context == 'notification' and frame['type'] == 'start_game':
+            self.my_turn = False
+        elif context == 'action':
+            if frame['action_type'] == 'lose':
+                self.result = ('lost' if frame['params'] == self.username
+                               else 'won')
+                return True
+            name, cell = frame['params'].split(',')
+            bit = 1 << board.cell_index(cell)
+
+            if frame['action_type'] == 'miss':
+                own_shot = name == self.username
+
+                if own_shot:
+                    self.misses |= bit
+            else:
+                own_shot = name != self.username
+
+                if own_shot:
+                    self.hits |= bit
+            self.my_turn = not own_shot
+        return False
+
+
+class BotEngine:
+    """
+    Сажает ботов в комнаты, где игрок ждёт соперника дольше wait
+    секунд. Раз в interval секунд каждый процесс смотрит очередь
+    открытых комнат и забирает ждущие комнаты тем же ZREM, что и подбор
+    (см. MATCH_ROOM), поэтому комнату получает ровно один бот или
+    игрок. Бот играет в этом процессе (см. Bot), выстрелы всех его ботов
+    решаются общей ShotQueue.
+
+    Seats bots in rooms where a player has waited for an enemy for longer
+    than wait seconds. Every interval seconds every process looks at the
+    open rooms queue and takes the waiting rooms with the same ZREM as
+    matchmaking (see MATCH_ROOM), so exactly one bot or player gets a
+    room. The bot plays in this process (see Bot), the shots of all its
+    bots are resolved by a shared ShotQueue.
+    """
+
+    def __init__(self, channel_layer=None, wait=30, interval=1,
+                 think_time=1.0, idle_ttl=300, batch_size=100):
+        self.channel_layer = channel_layer
+        self.wait = wait
+        self.interval = interval
+        self.think_time = think_time
+        self.idle_ttl = idle_ttl
+        self.batch_size = batch_size
+        self.queue = ShotQueue()
+        self.bots = set()
+        self.task = None
+
+    def start(self):
+        if self.task is not None:
+            return
+
+        if self.channel_layer is None:
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, *self.bots,
+                                 return_exceptions=True)
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.invite()
+            except Exception:
+                logger.exception('Failed to seat bots')
+
+    async def invite(self, now=None):
+        """
+        Забирает комнаты, ждущие дольше wait секунд, и запускает в них
+        ботов. Возвращает список комнат.
+
+        Takes the rooms waiting for longer than wait seconds and starts
+        bots in them. Returns the list of rooms.
+        """
+        now = time.time() if now is None else now
+        matchmaker = Matchmaker(self.channel_layer)
+        # Счёт открытой комнаты - время её создания плюс ROOM_TTL.
+        # The score of an open room is its creation time plus ROOM_TTL.
+        rooms = (await matchmaker.batch().zrangebyscore(
+            OPEN_ROOMS_KEY, min=now, max=now + ROOM_TTL - self.wait,
+            offset=0, count=self.batch_size, encoding='utf8'
+        ).execute())[0]
+        seated = []
+
+        for room in rooms:
+            if await self.claim(matchmaker, room):
+                seated.append(room)
+                task = asyncio.ensure_future(self.play(room))
+                self.bots.add(task)
+                task.add_done_callback(self.bots.discard)
+        return seated
+
+    async def claim(self, matchmaker, room):
+        """
+        Делает бота гостем открытой комнаты, если её ещё никто не забрал.
+
+        Makes a bot the guest of an open room unless someone took it
+        already.
+        """
+        return await matchmaker.join_room(room, BOT_PREFIX + room)
+
+    async def play(self, room):
+        bot = Bot(room, self.queue, self.think_time, self.idle_ttl)
+
+        try:
+            BOT_GAMES.inc(await bot.play())
+        except Exception:
+            BOT_GAMES.inc('failed')
+            logger.exception('Bot failed in %s', room)
+
+
+if settings.BOT_WAIT > 0:
+    bot_engine = BotEngine(wait=settings.BOT_WAIT,
+                           think_time=settings.BOT_THINK_TIME,
+                           idle_ttl=settings.BOT_IDLE_TTL)
+else:
+    bot_engine = None
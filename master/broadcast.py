@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+
+from .events import client_frame
+from .metrics import BROADCAST_SECONDS, Gauge
+from . import protocol
+
+
+logger = logging.getLogger(__name__)
+
+# События, которые видят зрители: чат остаётся между игроками.
+# Events spectators see: the chat stays between the players.
+SPECTATOR_EVENTS = ('action', 'notification')
+
+
+class Subscription:
+    """
+    Зрители одной комнаты в этом процессе и канал, которым процесс
+    подписан на группу комнаты.
+
+    The spectators of one room in this process and the channel this
+    process is subscribed to the room group with.
+    """
+
+    __slots__ = ('room', 'channel', 'spectators', 'joining', 'backlog',
+                 'task')
+
+    def __init__(self, room, channel):
+        self.room = room
+        self.channel = channel
+        self.spectators = set()
+        self.joining = set()
+        self.backlog = []
+        self.task = None
+
+
+class BroadcastHub:
+    """
+    Широковещательный уровень для зрителей. На каждую комнату, которую
+    смотрят зрители этого процесса, процесс один раз добавляет в её группу
+    свой канал, поэтому group_send игроков обходится redis в одно
+    сообщение на процесс, а не на зрителя. Полученное событие один раз
+    переводится в кадр и один раз кодируется (в JSON и, если есть такие
+    зрители, в бинарный подпротокол), и одно и то же ASGI сообщение
+    отправляется всем зрителям комнаты.
+
+    A broadcast tier for spectators. For every room watched by spectators
+    of this process, the process adds its own channel to the room group
+    once, so a group_send of the players costs redis one message per
+    process rather than per spectator. A received event is turned into a
+    frame once and encoded once (into JSON and, if there are such
+    spectators, into the binary subprotocol), and the same ASGI message
+    is sent to every spectator of the room.
+    """
+
+    def __init__(self, channel_layer=None):
+        self.channel_layer = channel_layer
+        self.subscriptions = {}
+        self.refresh_task = None
+
+    def start(self):
+        if self.refresh_task is not None:
+            return
+
+        if self.channel_layer is None:
+            # Свой экземпляр слоя, как у движка комнат (см. engine.py).
+            # A separate layer instance, as for the room engine (see
+            # engine.py).
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.refresh_task = asyncio.ensure_future(self.refresh_loop())
+
+    def spectators(self):
+        return sum(len(subscription.spectators) + len(subscription.joining)
+                   for subscription in self.subscriptions.values())
+
+    async def subscribe(self, room, spectator):
+        """
+        Подписывает зрителя на комнату. До вызова ready() события для него
+        копятся, чтобы ничего не потерялось, пока он читает состояние
+        комнаты.
+
+        Subscribes a spectator to a room. Until ready() is called the
+        events for them are kept, so that nothing is lost while they read
+        the room state.
+        """
+        self.start()
+        subscription = self.subscriptions.get(room)
+
+        if subscription is None:
+            channel = await self.channel_layer.new_channel('broadcast')
+            subscription = Subscription(room, channel)
+            self.subscriptions[room] = subscription
+            await self.channel_layer.group_add(room, channel)
+            subscription.task = asyncio.ensure_future(
+                self.receive_loop(subscription)
+            )
+        subscription.joining.add(spectator)
+
+    async def ready(self, room, spectator, version):
+        """
+        Зритель получил состояние комнаты версии version: отправляет ему
+        накопленные более поздние события и включает в рассылку.
+
+        The spectator has got the room state of the given version: sends
+        them the later kept events and adds them to the broadcast.
+        """
+        subscription = self.subscriptions.get(room)
+
+        if subscription is None or spectator not in subscription.joining:
+            return
+
+        for event_version, frame, message in subscription.backlog:
+            if event_version is None or event_version > version:
+                await spectator.base_send(
+                    self.encode(frame, message, spectator.binary)
+                )
+        subscription.joining.discard(spectator)
+        subscription.spectators.add(spectator)
+
+        if not subscription.joining:
+            subscription.backlog = []
+
+    async def unsubscribe(self, room, spectator):
+        subscription = self.subscriptions.get(room)
+
+        if subscription is None:
+            return
+        subscription.spectators.discard(spectator)
+        subscription.joining.discard(spectator)
+
+        if not subscription.spectators and not subscription.joining:
+            await self.close(subscription)
+
+    async def close(self, subscription):
+        if self.subscriptions.get(subscription.room) is not subscription:
+            return
+        del self.subscriptions[subscription.room]
+
+        if subscription.task is not asyncio.current_task():
+            subscription.task.cancel()
+        await self.channel_layer.group_discard(subscription.room,
+                                               subscription.channel)
+
+    async def receive_loop(self, subscription):
+        while self.subscriptions.get(subscription.room) is subscription:
+            try:
+                event = await self.channel_layer.receive(subscription.channel)
+            except Exception:
+                logger.exception('Failed to receive events of room %s',
+                                 subscription.room)
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                await self.publish(subscription, event)
+            except Exception:
+                logger.exception('Failed to broadcast an event of room %s',
+                                 subscription.room)
+
+    async def publish(self, subscription, event):
+        """
+        Рассылает событие группы всем зрителям комнаты. После exit_room
+        комната удалена: зрители отключаются, подписка снимается.
+
+        Sends a group event to all the spectators of the room. After
+        exit_room the room is removed: the spectators are disconnected and
+        the subscription is dropped.
+        """
+        if event['type'] not in SPECTATOR_EVENTS:
+            return
+
+        with BROADCAST_SECONDS.time():
+            frame = client_frame(event)
+            message = {}
+
+            if subscription.joining:
+                subscription.backlog.append((frame.get('version'), frame,
+                                             message))
+
+            for spectator in list(subscription.spectators):
+                await spectator.base_send(
+                    self.encode(frame, message, spectator.binary)
+                )
+
+        if event['type'] == 'notification' and event['message'] == 'exit_room':
+            spectators = subscription.spectators | subscription.joining
+            subscription.spectators, subscription.joining = set(), set()
+
+            for spectator in spectators:
+                await spectator.close()
+            await self.close(subscription)
+
+    @staticmethod
+    def encode(frame, message, binary):
+        """
+        ASGI сообщение с кадром, закодированное один раз на событие для
+        каждого вида зрителей (message - кэш этого события).
+
+        The ASGI message with the frame, encoded once per event for every
+        kind of spectator (message is the cache of this event).
+        """
+        if binary not in message:
+            if binary:
+                message[binary] = {'type': 'websocket.send',
+                                   'bytes': protocol.encode(frame)}
+            else:
+                message[binary] = {'type': 'websocket.send',
+                                   'text': json.dumps(frame)}
+        return message[binary]
+
+    async def refresh_loop(self):
+        """
+        Продлевает членство каналов процесса в группах: channels_redis
+        убирает из группы каналы старше group_expiry.
+
+        Extends the membership of the process channels in the groups:
+        channels_redis drops channels older than group_expiry from a
+        group.
+        """
+        expiry = getattr(self.channel_layer, 'group_expiry', 86400)
+
+        while True:
+            await asyncio.sleep(expiry / 3)
+
+            for subscription in list(self.subscriptions.values()):
+                try:
+                    await self.channel_layer.group_add(subscription.room,
+                                                       subscription.channel)
+                except Exception:
+                    logger.exception('Failed to refresh the subscription '
+                                     'to room %s', subscription.room)
+
+
+broadcast_hub = BroadcastHub()
+Gauge('game_spectators', 'Spectators connected to this process.',
+      function=broadcast_hub.spectators)
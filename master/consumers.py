@@ -1,15 +1,49 @@
 import json
-import functools
+import time
+import asyncio
+
+from collections import Counter, deque
 
 from urllib.parse import parse_qs
 from asgiref.sync import async_to_sync
 
 from channels.layers import get_channel_layer
+from django.conf import settings
 from channels.utils import await_many_dispatch
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.exceptions import (StopConsumer, InvalidChannelLayerError,
                                  AcceptConnection, DenyConnection)
 
+from .batch import RedisBatch, shard
+from .matchmaking import Matchmaker, ROOM_TTL, ACTIVITY_KEY, touch
+from .events import (EVENTS_KEY, EVENTS_LIMIT, HISTORY_KEY, MESSAGES_KEY,
+                     MESSAGES_LIMIT, MESSAGES_PAGE_SIZE, SEQ_FIELD,
+                     SKIPPED_FIELD, client_frame, frame_seq, skipped_seqs)
+from .scripts import (SHOT, READY, APPEND_MESSAGE, MESSAGES_PAGE,
+                      EVENTS_SINCE)
+from .engine import room_engine
+from .reaper import room_reaper
+from .archive import archive, game_archiver
+from .bots import BOT_PREFIX, bot_engine
+from .heartbeat import CLOSE_CODES, heartbeat
+from .reader import channel_reader, channel_username
+from .broadcast import broadcast_hub
+from .lobby import lobby
+from .throttle import frame_throttle
+from .metrics import (RECEIVE_SECONDS, GROUP_SEND_SECONDS, CONNECT_SECONDS,
+                      CONNECTIONS, ROOMS, THROTTLED_FRAMES,
+                      OUTBOUND_OVERFLOWS, DUPLICATE_FRAMES, INVALID_FRAMES,
+                      EVICTED_CONNECTIONS)
+from . import board, protocol
+
+
+CONTEXTS = ('exit_room', 'send_message', 'load_messages', 'player_ready',
+            'shot')
+
+# Комнаты с игроками, подключёнными к этому процессу.
+# Rooms with players connected to this process.
+local_rooms = Counter()
+
 
 class InterfaceConsumer(AsyncWebsocketConsumer):
 
@@ -18,44 +52,38 @@ class InterfaceConsumer(AsyncWebsocketConsumer):
         Called when a WebSocket connection is opened.
         """
         try:
-            groups = await self.get_all_groups()
-
-            if groups:
-                for group in groups:
-                    self.group = (group.split(':'))[2]
-                    members = await self.get_group_members()
-
-                    if len(members) == 1:
-                        if members[0].startswith(self.username):
-                            await self.readd(members[0])
-                            break
-                        else:
-                            await self.channel_layer.group_add(
-                                self.group,
-                                self.channel_name
-                            )
-                            await self.redis_connection_manager(hset=[
-                                [self.group, 'room_guest', self.username]
-                            ], expire=[[self.group, 3600]])
-                            break
-                    else:
-                        if members[0].startswith(self.username):
-                            await self.readd(members[0])
-                            break
-                        elif members[1].startswith(self.username):
-                            await self.readd(members[1])
-                            break
-                        else:
-                            await self.new_room()
-                            break
+            matchmaker = Matchmaker(self.channel_layer)
+            room = await matchmaker.find_user_room(self.username)
+
+            if room is not None:
+                self.group = room
+                await self.readd()
             else:
-                await self.new_room()
+                # Открытая комната, выбранная в лобби, если её ещё не
+                # забрали, иначе - любая.
+                # The open room chosen in the lobby unless it has been
+                # taken already, otherwise any.
+                if self.join is not None and await matchmaker.join_room(
+                        self.join, self.username):
+                    self.group = self.join
+                else:
+                    self.group, _ = await matchmaker.match_room(
+                        self.username
+                    )
+                await self.channel_layer.group_add(
+                    self.group,
+                    self.channel_name
+                )
         except AttributeError:
             raise InvalidChannelLayerError(
                 "BACKEND is unconfigured or doesn't support groups"
             )
+        local_rooms[self.group] += 1
+        ROOMS.set(len(local_rooms))
+
         try:
-            await self.connect()
+            with CONNECT_SECONDS.time():
+                await self.connect()
         except AcceptConnection:
             await self.accept()
         except DenyConnection:
@@ -66,90 +94,301 @@ class InterfaceConsumer(AsyncWebsocketConsumer):
         Dispatches incoming messages to type-based handlers asynchronously.
         """
         self.scope = scope
-        self.values = self.scope['query_string']
-        self.values = parse_qs(self.values.decode())
+        values = parse_qs(self.scope['query_string'].decode())
         # Распознаём пользователя по логину
-        self.username = self.values['username'][0]
+        self.username = values['username'][0]
+        # Комната и версия, с которых клиент продолжает игру (см. connect).
+        # The room and the version the client resumes from (see connect).
+        self.resume = (values.get('room', [None])[0],
+                       values.get('version', [''])[0])
+        self.join = values.get('join', [None])[0]
         self.group = None
+        self.enemy = None
+        self.member = None
+        self.engine = room_engine
+        self.exited = False
+        self.left = False
+        self.seen = self.active = time.monotonic()
+        self.buckets = frame_throttle.connection()
+        self.outbound = deque()
+        self.writer = None
+        self.closing = False
+        self.binary = protocol.SUBPROTOCOL in scope.get('subprotocols', ())
         # Initialize channel layer
         self.channel_layer = get_channel_layer(self.channel_layer_alias)
 
+        if room_reaper is not None:
+            room_reaper.start()
+
+        if game_archiver is not None:
+            game_archiver.start()
+
+        if bot_engine is not None:
+            bot_engine.start()
+
+        if heartbeat is not None:
+            heartbeat.start()
+
+        # Сообщения на канал соединения передаёт общий приёмник процесса
+        # (см. reader.py).
+        # Messages to the connection channel are passed on by the shared
+        # receiver of the process (see reader.py).
         if self.channel_layer is not None:
-            self.channel_name = await self.channel_layer.new_channel(
-                prefix=self.username
-            )
-            self.channel_receive = functools.partial(
-                self.channel_layer.receive, self.channel_name
-            )
+            self.channel_name = channel_reader.add(self, self.username)
         # Store send function
         if self._sync:
             self.base_send = async_to_sync(send)
         else:
             self.base_send = send
         # Pass messages in from channel layer or client to dispatch method
+        CONNECTIONS.inc()
+
+        if lobby is not None and not self.username.startswith(BOT_PREFIX):
+            lobby.connect(self.username)
+
         try:
-            if self.channel_layer is not None:
-                await await_many_dispatch(
-                    [receive, self.channel_receive], self.dispatch
-                )
-            else:
-                await await_many_dispatch([receive], self.dispatch)
+            await await_many_dispatch([receive], self.dispatch)
         except StopConsumer:
             # Exit cleanly
             pass
+        finally:
+            CONNECTIONS.dec()
+
+            if lobby is not None and not self.username.startswith(BOT_PREFIX):
+                lobby.disconnect(self.username)
+
+            if self.channel_layer is not None:
+                channel_reader.discard(self.channel_name)
+
+            if heartbeat is not None:
+                heartbeat.discard(self)
+
+            if self.writer is not None:
+                self.writer.cancel()
+
+            if self.group in local_rooms:
+                local_rooms[self.group] -= 1
+
+                if not local_rooms[self.group]:
+                    del local_rooms[self.group]
+                    frame_throttle.forget(self.group)
+                ROOMS.set(len(local_rooms))
 
     async def connect(self):
         """
-        Подключаемся и отправляем состояние комнаты.
+        Подключаемся и отправляем состояние комнаты. Если клиент
+        переподключается к той же комнате и передал последнюю известную
+        версию, отправляем только пропущенные события.
 
-        Connect and send the state of the room.
+        Connect and send the state of the room. If the client reconnects to
+        the same room and passed the last version it has seen, only the
+        missed events are sent. A client that offers the binary
+        subprotocol (see protocol.py) gets it instead of JSON. Both the
+        state (the <username>:seq field) and resync carry the number of the
+        player's last applied frame and the skipped numbers before it (see
+        events.SKIPPED_FIELD): the client resends only later and skipped
+        frames.
         """
-        await self.accept()
-        await self.get_data()
-        await self.send(text_data=json.dumps({'context': 'connect',
-                                              'data': self.data}))
+        await self.accept(protocol.SUBPROTOCOL if self.binary else None)
+
+        if heartbeat is not None:
+            heartbeat.add(self)
+
+        room, version = self.resume
+
+        if room == self.group and version.isdigit():
+            since = int(version)
+            room = self.engine and self.engine.local(self.group)
+
+            seq_field = SEQ_FIELD.format(self.username)
+            skipped_field = SKIPPED_FIELD.format(self.username)
+
+            if room:
+                events = room.events_since(since)
+                seq = room.fields.get(seq_field)
+                skipped = room.fields.get(skipped_field)
+            else:
+                events, (seq, skipped) = await self.redis_batch().script(
+                    EVENTS_SINCE,
+                    keys=[self.group, EVENTS_KEY.format(self.group)],
+                    args=[since]
+                ).hmget(self.group, seq_field, skipped_field,
+                        encoding='utf8').execute()
+
+            if events is not None:
+                await self.send_frame({
+                    'context': 'resync',
+                    'room': self.group,
+                    'version': events[0],
+                    'seq': int(seq or 0),
+                    'skipped': skipped_seqs(skipped),
+                    'events': [client_frame(json.loads(event))
+                               for event in events[1:]]
+                })
+                return
+        await self.send_frame({
+            'context': 'connect', 'room': self.group,
+            'data': await self.get_data(with_messages=True)
+        })
 
     async def disconnect(self, close_code):
         """
         Отключаем пользователей от группы и удаляем состояние комнаты при
-        выходе одного из пользователей.
+        выходе одного из пользователей. Закрытое соединение покидает
+        группу и отмечает активность комнаты, чтобы RoomReaper (см.
+        reaper.py) удалил комнату, когда уйдут оба игрока.
 
         Disconnect users from the group and delete the room state when
-        logging out of one of the users.
-        """
-        if close_code == 'exit_room':
-            await self.channel_layer.group_send(self.group,
-                                                {'type': 'notification',
-                                                 'message': 'exit_room'})
-            await self.redis_connection_manager(delete=[self.group])
-            await self.redis_connection_manager(delete=['asgi:group:' +
-                                                        self.group])
+        logging out of one of the users. A closed connection leaves the
+        group and marks the room activity, so that RoomReaper (see
+        reaper.py) removes the room once both players are gone. Whatever
+        the close code, the connection leaves the group once.
+        """
+        if self.group is None or self.exited or self.left:
+            return
+
+        if close_code != 'exit_room':
+            self.left = True
+            await self.channel_layer.group_discard(self.group,
+                                                   self.channel_name)
+            await touch(self.redis_batch(), self.group).execute()
+        else:
+            self.exited = True
+
+            # Состояние удаляется до уведомления, чтобы сразу
+            # переподключившийся игрок не вернулся в удаляемую комнату.
+            # История комнаты остаётся архиватору (см. archive.py). Комнату
+            # движка удаляет её владелец (см. RoomEngine.apply).
+            # The state is dropped before the notification, so that a player
+            # reconnecting right away does not return to the room being
+            # deleted. The room history is left to the archiver (see
+            # archive.py). An engine room is removed by its owner (see
+            # RoomEngine.apply).
+            players = [self.username, self.enemy]
+            players = players if self.member else players[::-1]
+
+            if self.engine is not None:
+                await self.engine.submit(self.group, 'drop',
+                                         {'players': players})
+            else:
+                batch = self.redis_batch().delete(
+                    self.group, MESSAGES_KEY.format(self.group),
+                    EVENTS_KEY.format(self.group)
+                ).zrem(ACTIVITY_KEY, self.group)
+                await archive(batch, self.group, players).execute()
+
+            await Matchmaker(self.channel_layer).close_room(
+                self.group, self.username, self.enemy
+            )
+            await self.group_send({'type': 'notification',
+                                   'message': 'exit_room'})
+            await self.redis_batch().delete(
+                'asgi:group:' + self.group
+            ).execute()
 
-    async def receive(self, text_data):
+    async def receive(self, text_data=None, bytes_data=None):
         """
         Главный обработчик.
 
         Main handler.
         """
-        text_data_json = json.loads(text_data)
+        try:
+            if bytes_data is not None:
+                text_data_json = protocol.decode_request(bytes_data)
+            else:
+                text_data_json = json.loads(text_data)
+        except ValueError:
+            # Неразбираемый кадр отклоняется, соединение остаётся открытым.
+            # An undecodable frame is rejected, the connection stays open.
+            INVALID_FRAMES.inc('other')
+            await self.send_frame({'context': 'rejected', 'request': None})
+            return
         context = text_data_json['context']
-        await self.get_data()
-        room_guest = self.data['room_guest']
-        room_member = self.data['room_member']
+        self.seen = time.monotonic()
+
+        # Ответ на ping только подтверждает, что соединение живо.
+        # A ping answer only confirms that the connection is alive.
+        if context == 'pong':
+            return
+        self.active = self.seen
+        limited = frame_throttle.limited(self.buckets, self.group, context)
+
+        if limited:
+            # Кадр отбрасывается до обращений к redis, клиент узнаёт об
+            # этом и может повторить его позже с тем же номером: номер,
+            # пропущенный перед более поздним кадром, не считается
+            # повтором (см. events.SKIPPED_FIELD).
+            # The frame is dropped before any redis access, the client
+            # learns about it and may repeat it later with the same number:
+            # a number skipped before a later frame is not taken for a retry
+            # (see events.SKIPPED_FIELD).
+            THROTTLED_FRAMES.inc(context, limited)
+            await self.send_frame({'context': 'throttled',
+                                   'request': context,
+                                   'seq': frame_seq(text_data_json)})
+            return
+
+        with RECEIVE_SECONDS.time(context if context in CONTEXTS
+                                  else 'other'):
+            await self.load_enemy()
+
+            if context == 'exit_room':
+                await self.disconnect(close_code='exit_room')
+            elif context == 'send_message':
+                await self.redirect_message(text_data_json)
+            elif context == 'load_messages':
+                await self.send_messages_page(text_data_json)
+            elif context == 'player_ready':
+                await self.ready_handler(text_data_json)
+            elif context == 'shot':
+                await self.shot_handler(text_data_json)
+
+    async def load_enemy(self):
+        """
+        Соперник не меняется после входа гостя, поэтому состояние
+        комнаты читается только пока он неизвестен.
+
+        The enemy does not change once the guest joins, so the room state
+        is only read while it is unknown.
+        """
+        if self.enemy in (None, 'None'):
+            data = await self.get_data()
+            room_guest = data['room_guest']
+            room_member = data['room_member']
+            self.member = room_member == self.username
+
+            if room_guest != self.username:
+                self.enemy = room_guest
+            else:
+                self.enemy = room_member
 
-        if room_guest != self.username:
-            self.enemy = room_guest
-        else:
-            self.enemy = room_member
+    async def ping(self):
+        await self.send_frame({'context': 'ping'})
+
+    async def evict(self, reason):
+        """
+        Закрывает соединение по решению heartbeat (см. heartbeat.py) и
+        сразу выводит его из группы, не дожидаясь, пока сервер заметит
+        разрыв. Простаивающий игрок выходит из комнаты так же, как кадром
+        exit_room: соперник получает уведомление, комната удаляется.
+
+        Closes the connection as the heartbeat decided (see heartbeat.py)
+        and takes it out of the group right away, without waiting for the
+        server to notice the broken connection. An idle player leaves the
+        room as with an exit_room frame: the enemy gets notified and the
+        room is removed.
+        """
+        EVICTED_CONNECTIONS.inc(reason)
 
-        if context == 'exit_room':
+        if reason == 'idle' and self.group is not None:
+            await self.load_enemy()
             await self.disconnect(close_code='exit_room')
-        elif context == 'send_message':
-            await self.redirect_message(text_data_json)
-        elif context == 'player_ready':
-            await self.ready_handler(text_data_json)
-        elif context == 'shot':
-            await self.shot_handler(text_data_json)
+        self.closing = True
+
+        if self.writer is not None:
+            self.writer.cancel()
+        await self.close(code=CLOSE_CODES[reason])
+        await self.disconnect(close_code=CLOSE_CODES[reason])
 
     async def chat_message(self, event):
         """
@@ -157,10 +396,7 @@ class InterfaceConsumer(AsyncWebsocketConsumer):
 
         Sends a message to the group with the context 'message'.
         """
-        message = event['message']
-
-        await self.send(text_data=json.dumps({'context': 'message',
-                                              'message': message}))
+        await self.send_frame(client_frame(event))
 
     async def notification(self, event):
         """
@@ -168,10 +404,25 @@ class InterfaceConsumer(AsyncWebsocketConsumer):
 
         Sends a message to the group with the context 'notification'.
         """
-        message = event['message']
+        if event['message'] == 'exit_room':
+            # Комната уже удалена, отключение не должно её отмечать.
+            # The room is removed already, the disconnect must not mark it.
+            self.exited = True
+        await self.send_frame(client_frame(event))
+
+    async def duplicate(self, event):
+        """
+        Подтверждает повторённый кадр клиента, не выполняя его снова.
+
+        Acknowledges a retried client frame without executing it again.
+        """
+        await self.send_frame({'context': 'duplicate',
+                               'request': event['request'],
+                               'seq': event['seq']})
 
-        await self.send(text_data=json.dumps({'context': 'notification',
-                                              'type': message}))
+    async def retried(self, context, seq):
+        DUPLICATE_FRAMES.inc(context)
+        await self.duplicate({'request': context, 'seq': seq})
 
     async def action(self, event):
         """
@@ -181,134 +432,130 @@ class InterfaceConsumer(AsyncWebsocketConsumer):
         Sends a message to the group with the context 'action'
         (shot, miss, hit).
         """
-        action_type = event['action_type']
-        params = event['params']
+        await self.send_frame(client_frame(event))
+
+    async def send_frame(self, frame):
+        """
+        Отправляет кадр клиенту в JSON или в бинарном подпротоколе.
+
+        Sends a frame to the client as JSON or in the binary subprotocol.
+        """
+        if self.binary:
+            message = {'type': 'websocket.send',
+                       'bytes': protocol.encode(frame)}
+        else:
+            message = {'type': 'websocket.send', 'text': json.dumps(frame)}
+        await self.enqueue(message)
 
-        await self.send(text_data=json.dumps({'context': 'action',
-                                              'action_type': action_type,
-                                              'params': params}))
+    async def enqueue(self, message):
+        """
+        Ставит сообщение в ограниченную очередь исходящих кадров, которую
+        отдельная задача передаёт серверу. Медленный клиент не задерживает
+        обработку событий группы; при переполнении очереди действует
+        OUTBOUND_OVERFLOW.
 
-    async def redis_connection_manager(self, **kwargs):
+        Puts a message into the bounded outbound frame queue, which a
+        separate task passes on to the server. A slow client does not hold
+        up the handling of group events; when the queue overflows,
+        OUTBOUND_OVERFLOW applies.
         """
-        Используется для более простого и краткого взаимодействия с redis.
-        Позволяет использовать одну/несколько комманд,
-        с одним/множеством параметром/ов.
+        if self.closing:
+            return
 
-        Used for easier and concise interaction with redis.
-        Allows to use one/several commands, with one/many parameter/s.
+        if 0 < settings.OUTBOUND_QUEUE_SIZE <= len(self.outbound):
+            OUTBOUND_OVERFLOWS.inc(settings.OUTBOUND_OVERFLOW)
 
-        Примеры/Examples:
+            if settings.OUTBOUND_OVERFLOW == 'close':
+                self.closing = True
+                self.writer.cancel()
+                await self.close(code=1013)
+            return
+        self.outbound.append(message)
 
-        await self.redis_connection_manager(
-            hset=[[key, field, value],
-                [key, field, value],
-                [key, field, value]],
-            expire=[[key, value]]
-        )
+        if self.writer is None:
+            self.writer = asyncio.ensure_future(self.write_loop())
 
-        await self.redis_connection_manager(keys=['*'])
+    async def write_loop(self):
         """
-        try:
-            async with self.channel_layer.connection(0) as connection:
-                result = []
-
-                for k, v in kwargs.items():
-                    val_numb = 0
-
-                    if len(kwargs.items()) > 1:
-                        if len(v) > 2:
-                            for i in v[val_numb]:
-                                res = await connection.__getattribute__(
-                                    k
-                                )(*v[val_numb])
-                                result.append(res)
-                                val_numb += 1
-                        else:
-                            res = await connection.__getattribute__(k)(*v[0])
-                            result.append(res)
-                    else:
-                        res = await connection.__getattribute__(k)(v[0])
-                        return res
-            return result
-        except:
-            return 'None'
-
-    async def get_data(self):
-        """
-        Получаем всю сохранённую информацию о комнате (состояние комнаты).
-
-        We get all the stored information about the room (room state).
-        """
-        data = {k.decode('utf8'): v.decode('utf8')
-                for k, v in
-                (await self.redis_connection_manager(
-                    hgetall=[self.group]
-                )).items()}
-        self.data = data
-
-    async def readd(self, member):
-        """
-        Передобавляем пользователя в channels группу.
-
-        Re-add the user to the channels group.
-        """
-        await self.channel_layer.group_discard(self.group, member)
-        await self.channel_layer.group_add(self.group, self.channel_name)
+        Передаёт очередь серверу и завершается, когда она пуста: у
+        простаивающего соединения нет задачи записи.
 
-    async def get_all_groups(self):
+        Passes the queue on to the server and ends once it is empty: an
+        idle connection has no writer task.
         """
-        Получаем список всех channels групп.
+        while self.outbound:
+            await self.base_send(self.outbound.popleft())
+        self.writer = None
 
-        Get a list of all channels groups.
+    async def group_send(self, event):
         """
-        keys = [x.decode("utf8") for x in await self.redis_connection_manager(
-            keys=['*']
-        )]
-        groups = []
+        Рассылает событие всем участникам комнаты.
 
-        for key in keys:
-            if key.startswith('asgi:group:'):
-                groups.append(key)
-        return groups
+        Sends an event to all the members of the room.
+        """
+        with GROUP_SEND_SECONDS.time():
+            await self.channel_layer.group_send(self.group, event)
 
-    async def get_group_members(self):
+    def redis_batch(self, transaction=False):
         """
-        Получаем список всех членов в channels группе.
+        Создаёт пакет redis команд, отправляемых за один сетевой запрос,
+        на шарде комнаты.
 
-        Get a list of all members in the channels group.
+        Creates a batch of redis commands sent in one network round trip,
+        on the room shard.
         """
-        members = [x.decode("utf8") for x
-                   in await self.redis_connection_manager(
-                       zrange=['asgi:group:' + self.group, 0, -1]
-        )]
-        return members
+        return RedisBatch(self.channel_layer,
+                          shard(self.channel_layer, self.group), transaction)
 
-    async def new_room(self):
+    async def get_data(self, with_messages=False):
         """
-        Создаём новую комнату (инициализируем состояние комнаты) и добавляем
-        нового члена в группу.
+        Получаем всю сохранённую информацию о комнате (состояние комнаты),
+        при необходимости вместе с последней страницей чата. Соединение её
+        не хранит.
 
-        Create a new room (initialize the state of the room) and add a new
-        member to the group.
+        We get all the stored information about the room (room state),
+        with the last chat page if needed. The connection does not keep
+        it.
         """
-        try:
-            r, last_room_number = self.group[-1].split(':')[2].split('_')
-            self.group = r + '_' + str(int(last_room_number) + 1)
-            await self.channel_layer.group_add(self.group, self.channel_name)
-            await self.redis_connection_manager(hset=[
-                [self.group, 'room_member', self.username],
-                [self.group, 'room_guest', 'None'],
-                [self.group, 'messages', '[]']
-            ], expire=[[self.group, 3600]])
-        except:
-            self.group = 'room_1'
-            await self.channel_layer.group_add(self.group,
-                                               self.channel_name)
-            await self.redis_connection_manager(hset=[
-                [self.group, 'room_member', self.username],
-                [self.group, 'room_guest', 'None'],
-                [self.group, 'messages', '[]']
-            ], expire=[[self.group, 3600]])
+        room = self.engine and self.engine.local(self.group)
+
+        if room:
+            room.join(self.username)
+            results = [room.raw(), list(room.messages)]
+        else:
+            batch = self.redis_batch().hgetall(self.group)
+
+            if with_messages:
+                batch.lrange(MESSAGES_KEY.format(self.group),
+                             -MESSAGES_PAGE_SIZE, -1, encoding='utf8')
+            results = await batch.execute()
+        data = board.client_state(results[0])
+
+        if with_messages:
+            data['messages'] = '[' + ','.join(results[1]) + ']'
+        return data
+
+    async def readd(self):
+        """
+        Передобавляем пользователя в channels группу, убирая его старые
+        каналы.
+
+        Re-add the user to the channels group, dropping their old channels.
+        """
+        for member in await self.get_group_members():
+            if channel_username(member) == self.username:
+                await self.channel_layer.group_discard(self.group, member)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+
+    async def get_group_members(self):
+        """
+        Получаем список всех членов в channels группе.
+
+        Get a list of all members in the channels group.
+        """
+        return (await self.redis_batch().zrange(
+            'asgi:group:' + self.group, 0, -1, encoding='utf8'
+        ).execute())[0]
 
     async def redirect_message(self, text_data_json):
         """
@@ -317,132 +564,260 @@ class InterfaceConsumer(AsyncWebsocketConsumer):
 
         Forward messages by group and save them in state rooms.
         """
-        message = text_data_json['message']
-        messages = json.loads(self.data['messages'])
-
-        try:
-            message = {'id': str(int((messages[-1])['id'])+1),
-                       'sender': self.username,
-                       'message': message}
-        except:
-            message = {'id': '1', 'sender': self.username, 'message': message}
-        await self.channel_layer.group_send(self.group,
-                                            {'type': 'chat_message',
-                                             'message': message})
-        messages.append(message)
-        messages = json.dumps(messages)
-        await self.redis_connection_manager(hset=[
-            [self.group, 'messages', messages]
-        ], expire=[[self.group, 3600]])
+        seq = frame_seq(text_data_json)
+
+        if self.engine is not None:
+            if await self.engine.submit(self.group, 'send_message', {
+                'username': self.username,
+                'message': text_data_json['message'],
+                'seq': seq, 'reply_to': self.channel_name
+            }):
+                await self.retried('send_message', seq)
+            return
+        batch = self.redis_batch().script(
+            APPEND_MESSAGE,
+            keys=[self.group, MESSAGES_KEY.format(self.group),
+                  EVENTS_KEY.format(self.group),
+                  HISTORY_KEY.format(self.group)],
+            args=[self.username, json.dumps(text_data_json['message']),
+                  MESSAGES_LIMIT, ROOM_TTL, EVENTS_LIMIT,
+                  '' if seq is None else seq]
+        )
+        event = (await touch(batch, self.group).execute())[0]
+
+        if event is None:
+            await self.retried('send_message', seq)
+            return
+        await self.group_send(json.loads(event))
+
+    async def send_messages_page(self, text_data_json):
+        """
+        Отправляет пользователю страницу более ранних сообщений чата.
+        Запрос без числового before отклоняется.
+
+        Sends the user a page of earlier chat messages. A request without
+        a numeric before is rejected.
+        """
+        before = text_data_json.get('before')
+
+        if (not isinstance(before, int) or isinstance(before, bool)
+                or before < 0):
+            INVALID_FRAMES.inc('load_messages')
+            await self.send_frame({'context': 'rejected',
+                                   'request': 'load_messages'})
+            return
+        messages = (await self.redis_batch().script(
+            MESSAGES_PAGE,
+            keys=[MESSAGES_KEY.format(self.group)],
+            args=[before, MESSAGES_PAGE_SIZE]
+        ).execute())[0]
+        await self.send_frame({
+            'context': 'messages',
+            'messages': [json.loads(message) for message in messages]
+        })
 
     async def ready_handler(self, text_data_json):
         """
-        Обработчик готовности пользователей в комнате.
-
-        User readiness handler in the room.
-        """
-        selected_cells = json.dumps(text_data_json['selected_cells'])
-        await self.redis_connection_manager(hset=[
-            [self.group, self.username + ':selected_cells', selected_cells]
-        ], expire=[[self.group, 3600]])
-        room_pool = await self.redis_connection_manager(hlen=[self.group])
-
-        if room_pool == 5:
-            await self.redis_connection_manager(hset=[
-                [self.group,
-                 self.username + ':access_to_shot',
-                 'false']], expire=[[self.group, 3600]])
-            await self.redis_connection_manager(hset=[
-                [self.group,
-                 self.enemy + ':access_to_shot',
-                 'true']], expire=[[self.group, 3600]])
-            await self.redis_connection_manager(hset=[[self.group,
-                                                       'game_status',
-                                                       'started']],
-                                                expire=[[self.group, 3600]])
-            await self.channel_layer.group_send(self.group,
-                                                {'type': 'notification',
-                                                 'message': 'start_game'})
+        Обработчик готовности пользователей в комнате. Расстановка,
+        которая не является стандартным флотом (см. board.valid_fleet),
+        не сохраняется: клиент получает кадр rejected и может расставить
+        корабли заново.
+
+        User readiness handler in the room. A placement that is not the
+        standard fleet (see board.valid_fleet) is not stored: the client
+        gets a rejected frame and may place the ships again.
+        """
+        seq = frame_seq(text_data_json)
+
+        try:
+            mask = board.to_mask(text_data_json.get('selected_cells'))
+        except (ValueError, TypeError, AttributeError):
+            mask = None
+
+        if mask is None or not board.valid_fleet(mask):
+            INVALID_FRAMES.inc('player_ready')
+            await self.send_frame({'context': 'rejected',
+                                   'request': 'player_ready', 'seq': seq})
+            return
+        ships = board.encode(mask)
+
+        if self.engine is not None:
+            if await self.engine.submit(self.group, 'player_ready', {
+                'username': self.username, 'enemy': self.enemy,
+                'ships': ships, 'seq': seq, 'reply_to': self.channel_name
+            }):
+                await self.retried('player_ready', seq)
+            return
+        batch = self.redis_batch().script(
+            READY,
+            keys=[self.group, EVENTS_KEY.format(self.group),
+                  HISTORY_KEY.format(self.group)],
+            args=[self.username, self.enemy, ships, ROOM_TTL, EVENTS_LIMIT,
+                  '' if seq is None else seq]
+        )
+        events = (await touch(batch, self.group).execute())[0]
+
+        if events is None:
+            await self.retried('player_ready', seq)
+            return
+
+        for event in events:
+            await self.group_send(json.loads(event))
 
     async def shot_handler(self, text_data_json):
         """
         Обработчик выстрелов, промахов, попаданий. Завершает игру,
         когда все корабли одного из пользователей, в комнате, уничтожены.
+        Выстрел целиком разрешается одним Lua скриптом в redis или, если
+        ROOM_ENGINE равен 'memory', владельцем комнаты в памяти
+        (см. engine.py). Повторённый кадр (см. events.frame_seq) только
+        подтверждается, как и в остальных обработчиках. Выстрел по
+        неверной клетке отклоняется, а в комнату попадает только
+        каноничный идентификатор клетки.
 
         Handler for shots, misses, hits. Ends the game when all the ships of
-        one of the users in the room are destroyed.
+        one of the users in the room are destroyed. The whole shot is
+        resolved by a single Lua script in redis or, with ROOM_ENGINE set
+        to 'memory', by the room owner in memory (see engine.py). A
+        retried frame (see events.frame_seq) is only acknowledged, as in
+        the other handlers. A shot at a malformed cell is rejected, and
+        the room only ever sees the canonical cell id.
         """
+        seq = frame_seq(text_data_json)
+
         try:
-            selected_cells = self.data[self.enemy + ':selected_cells']
-        except:
-            selected_cells = []
-        try:
-            dead_cells = self.data[self.enemy + ':dead_cells']
-        except:
-            dead_cells = []
-        try:
-            miss_cells = self.data[self.username + ':miss_cells']
-        except:
-            miss_cells = []
-
-        if dead_cells:
-            dead_cells = json.loads(dead_cells)
-        if selected_cells:
-            selected_cells = json.loads(selected_cells)
-        if miss_cells:
-            miss_cells = json.loads(miss_cells)
-
-        if len(dead_cells) < 20:
-            if text_data_json['cell'] in selected_cells:
-                dead_cells.append(text_data_json['cell'])
-                dead_cells = json.dumps(dead_cells)
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.enemy + ':dead_cells', dead_cells]
-                ], expire=[[self.group, 3600]])
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.username + ':hit_cells', dead_cells]
-                ], expire=[[self.group, 3600]])
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.username + ':access_to_shot', 'false']
-                ], expire=[[self.group, 3600]])
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.enemy + ':access_to_shot', 'true']
-                ], expire=[[self.group, 3600]])
-
-                await self.channel_layer.group_send(
-                    self.group,
-                    {'type': 'action',
-                     'action_type': 'hit',
-                     'params': '{},{}'.format(self.enemy,
-                                              text_data_json['cell'])}
-                )
-            else:
-                miss_cells.append(text_data_json['cell'])
-                miss_cells = json.dumps(miss_cells)
-
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.username + ':miss_cells',
-                     miss_cells]
-                ], expire=[[self.group, 3600]])
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.username + ':access_to_shot',
-                     'false']
-                ], expire=[[self.group, 3600]])
-                await self.redis_connection_manager(hset=[
-                    [self.group, self.enemy + ':access_to_shot',
-                     'true']
-                ], expire=[[self.group, 3600]])
-                await self.channel_layer.group_send(
-                    self.group,
-                    {'type': 'action',
-                     'action_type': 'miss',
-                     'params': '{},{}'.format(self.username,
-                                              text_data_json['cell'])}
-                )
+            index = board.cell_index(text_data_json.get('cell'))
+        except (ValueError, TypeError, AttributeError):
+            INVALID_FRAMES.inc('shot')
+            await self.send_frame({'context': 'rejected',
+                                   'request': 'shot', 'seq': seq})
+            return
+        cell = board.cell_id(index)
+
+        if self.engine is not None:
+            if await self.engine.submit(self.group, 'shot', {
+                'username': self.username, 'enemy': self.enemy,
+                'index': index, 'cell': cell, 'seq': seq,
+                'reply_to': self.channel_name
+            }):
+                await self.retried('shot', seq)
+            return
+        batch = self.redis_batch().script(
+            SHOT,
+            keys=[self.group, EVENTS_KEY.format(self.group),
+                  HISTORY_KEY.format(self.group)],
+            args=[self.username, self.enemy, index, cell, ROOM_TTL,
+                  EVENTS_LIMIT, '' if seq is None else seq]
+        )
+        events = (await touch(batch, self.group).execute())[0]
+
+        if events is None:
+            await self.retried('shot', seq)
+            return
+
+        for event in events:
+            await self.group_send(json.loads(event))
+
+
+class SpectatorConsumer(AsyncWebsocketConsumer):
+    """
+    Зритель комнаты: получает состояние комнаты без расстановки кораблей
+    и затем действия и уведомления игроков через broadcast_hub. Своего
+    канала в channel layer у зрителя нет, поэтому число зрителей не
+    увеличивает работу redis на событие.
+
+    A room spectator: gets the room state without the ship placement and
+    then the players' actions and notifications through broadcast_hub.
+    A spectator has no channel layer channel of their own, so the number
+    of spectators does not add redis work per event.
+    """
+
+    channel_layer_alias = None
+
+    async def connect(self):
+        self.room = self.scope['url_route']['kwargs']['room']
+        self.binary = protocol.SUBPROTOCOL in self.scope.get('subprotocols',
+                                                             ())
+        # Подписка до чтения состояния: события, пришедшие во время
+        # чтения, накапливаются и отправляются после состояния.
+        # Subscribing before reading the state: events arriving meanwhile
+        # are kept and sent after the state.
+        await broadcast_hub.subscribe(self.room, self)
+        room = room_engine and room_engine.local(self.room)
+
+        if room:
+            raw = room.raw()
         else:
-            await self.channel_layer.group_send(
-                self.group,
-                {'type': 'action',
-                 'action_type': 'lose',
-                 'params': '{}'.format(self.enemy)}
-            )
+            channel_layer = get_channel_layer()
+            raw = (await RedisBatch(
+                channel_layer, shard(channel_layer, self.room)
+            ).hgetall(self.room).execute())[0]
+
+        if not raw:
+            await broadcast_hub.unsubscribe(self.room, self)
+            await self.close()
+            return
+        await self.accept(protocol.SUBPROTOCOL if self.binary else None)
+        data = board.spectator_state(raw)
+        await self.send_frame({'context': 'spectate', 'room': self.room,
+                               'data': data})
+        await broadcast_hub.ready(self.room, self, int(data.get('version', 0)))
+
+    async def disconnect(self, close_code):
+        await broadcast_hub.unsubscribe(self.room, self)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        """
+        Кадры зрителя игнорируются.
+
+        Spectator frames are ignored.
+        """
+
+    async def send_frame(self, frame):
+        if self.binary:
+            await self.send(bytes_data=protocol.encode(frame))
+        else:
+            await self.send(text_data=json.dumps(frame))
+
+
+class LobbyConsumer(AsyncWebsocketConsumer):
+    """
+    Подписчик лобби: пока соединение открыто, пользователь онлайн, а
+    соединение получает состояние лобби (кадр lobby) и затем не чаще
+    LOBBY_RATE раз в секунду разницу с ним (кадр lobby_diff), см.
+    lobby.py. Своего канала в channel layer у подписчика нет.
+
+    A lobby subscriber: while the connection is open the user is online,
+    and the connection gets the lobby state (the lobby frame) and then, at
+    most LOBBY_RATE times a second, the diff with it (the lobby_diff
+    frame), see lobby.py. A subscriber has no channel layer channel of
+    their own.
+    """
+
+    channel_layer_alias = None
+
+    async def connect(self):
+        self.username = None
+
+        if lobby is None:
+            await self.close()
+            return
+        values = parse_qs(self.scope['query_string'].decode())
+        self.binary = protocol.SUBPROTOCOL in self.scope.get('subprotocols',
+                                                             ())
+        await self.accept(protocol.SUBPROTOCOL if self.binary else None)
+        self.username = values['username'][0]
+        lobby.connect(self.username)
+        lobby.subscribe(self)
+
+    async def disconnect(self, close_code):
+        if self.username is not None:
+            lobby.unsubscribe(self)
+            lobby.disconnect(self.username)
+
+    async def receive(self, text_data=None, bytes_data=None):
+        """
+        Кадры подписчика игнорируются.
+
+        Subscriber frames are ignored.
+        """
@@ -0,0 +1,19 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Переводит SQLite в режим WAL: чтения (проверка пользователей) не ждут
+    записи (регистрации), и запись не блокирует весь файл. Для PostgreSQL
+    (DB_ENGINE=postgresql) ничего не делает.
+
+    Switches SQLite into WAL mode: reads (user lookups) do not wait for
+    writes (registrations), and a write does not lock the whole file. Does
+    nothing for PostgreSQL (DB_ENGINE=postgresql).
+    """
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+            cursor.execute('PRAGMA synchronous=NORMAL')
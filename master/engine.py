@@ -0,0 +1,670 @@
+import asyncio
+import json
+import logging
+import time
+
+from collections import deque
+
+from aioredis import Redis
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+from django.conf import settings
+
+from .batch import RedisBatch, shard
+from .events import (EVENTS_KEY, EVENTS_LIMIT, HISTORY_KEY, HISTORY_TTL,
+                     MESSAGES_KEY, MESSAGES_LIMIT, MESSAGES_PAGE_SIZE,
+                     SEQ_FIELD, SEQ_WINDOW, SKIPPED_FIELD, skipped_seqs)
+from .archive import archive
+from .matchmaking import ACTIVITY_KEY, ROOM_TTL, touch
+from .metrics import DUPLICATE_FRAMES, GROUP_SEND_SECONDS, Gauge
+from .scripts import OWNER_EXTEND, OWNER_RELEASE
+from . import board, history
+
+
+logger = logging.getLogger(__name__)
+
+OWNER_KEY = '{}:owner'
+OWNER_TTL = 30
+OWNER_CACHE_TTL = 1
+MAX_HOPS = 2
+
+
+class Room:
+    """
+    Состояние комнаты в памяти процесса-владельца. Методы ready, shot и
+    append_message повторяют Lua скрипты READY, SHOT и APPEND_MESSAGE, но
+    только запоминают изменения: в redis они записываются пакетом в
+    flush().
+
+    Room state in the memory of the owner process. The ready, shot and
+    append_message methods mirror the READY, SHOT and APPEND_MESSAGE Lua
+    scripts, but only remember the changes: they are written to redis in
+    a batch by flush().
+    """
+
+    __slots__ = ('name', 'fields', 'boards', 'version', 'message_id',
+                 'events', 'messages', 'dirty', 'new_events', 'new_messages',
+                 'new_history', 'touched')
+
+    def __init__(self, name, raw, events=(), messages=()):
+        self.name = name
+        self.fields = {}
+        self.boards = {}
+        self.version = 0
+        self.message_id = 0
+
+        for key, value in raw.items():
+            key = key.decode('utf8')
+
+            if key.endswith(board.BOARD_FIELDS):
+                self.boards[key] = board.decode(value)
+            elif key == 'version':
+                self.version = int(value)
+            elif key == 'message_id':
+                self.message_id = int(value)
+            else:
+                self.fields[key] = value.decode('utf8')
+        self.events = deque(events, maxlen=EVENTS_LIMIT)
+        self.messages = deque(messages, maxlen=MESSAGES_PAGE_SIZE)
+        self.dirty = set()
+        self.new_events = []
+        self.new_messages = []
+        self.new_history = []
+        self.touched = time.monotonic()
+
+    def join(self, username):
+        # Гостя записывает подбор комнаты прямо в redis.
+        # The guest is written straight to redis by matchmaking.
+        if (self.fields.get('room_guest') == 'None'
+                and self.fields.get('room_member') != username):
+            self.fields['room_guest'] = username
+
+    def set(self, field, value):
+        self.fields[field] = value
+        self.dirty.add(field)
+
+    def set_board(self, field, mask):
+        self.boards[field] = mask
+        self.dirty.add(field)
+
+    def record(self, event):
+        self.version += 1
+        self.dirty.add('version')
+        event['version'] = self.version
+        encoded = json.dumps(event)
+        self.events.append(encoded)
+        self.new_events.append(encoded)
+        return event
+
+    def is_retry(self, username, seq):
+        """
+        То же окно повторов, что DEDUP в scripts.py.
+
+        The same retry window as DEDUP in scripts.py.
+        """
+        if seq is None:
+            return False
+        field = SEQ_FIELD.format(username)
+        skipped_field = SKIPPED_FIELD.format(username)
+        last = int(self.fields.get(field, 0))
+        value = self.fields.get(skipped_field, '')
+        numbers = skipped_seqs(value)
+        floor = max(seq, last) - SEQ_WINDOW
+
+        if seq <= last and seq not in numbers:
+            return True
+        skipped = [number for number in numbers
+                   if number != seq and number > floor]
+
+        if seq > last:
+            skipped.extend(range(max(last + 1, floor + 1), seq))
+            self.set(field, str(seq))
+        updated = ','.join(map(str, skipped))
+
+        if updated != value:
+            self.set(skipped_field, updated)
+        return False
+
+    def ready(self, username, enemy, ships):
+        if 'game_status' in self.fields:
+            return []
+        self.set_board(username + board.SHIPS, ships)
+        self.new_history.append(history.entry(
+            history.PLACEMENT, username, board.encode(ships).hex()
+        ))
+
+        if enemy + board.SHIPS not in self.boards:
+            return []
+        self.set('game_status', 'started')
+        self.set(username + ':access_to_shot', 'false')
+        self.set(enemy + ':access_to_shot', 'true')
+        return [self.record({'type': 'notification',
+                             'message': 'start_game'})]
+
+    def shot(self, username, enemy, index, cell):
+        ships = self.boards.get(enemy + board.SHIPS, 0)
+        hits = self.boards.get(enemy + board.HITS, 0)
+        fleet = board.popcount(ships)
+        lose = {'type': 'action', 'action_type': 'lose', 'params': enemy}
+
+        if fleet and board.popcount(hits) >= fleet:
+            return [self.record(lose)]
+
+        if ships >> index & 1:
+            hits |= 1 << index
+            self.set_board(enemy + board.HITS, hits)
+            self.new_history.append(history.entry(history.HIT, username,
+                                                  index))
+            events = [self.record({'type': 'action', 'action_type': 'hit',
+                                   'params': enemy + ',' + cell})]
+        else:
+            misses = self.boards.get(username + board.MISSES, 0)
+            self.set_board(username + board.MISSES, misses | 1 << index)
+            self.new_history.append(history.entry(history.MISS, username,
+                                                  index))
+            events = [self.record({'type': 'action', 'action_type': 'miss',
+                                   'params': username + ',' + cell})]
+        self.set(username + ':access_to_shot', 'false')
+        self.set(enemy + ':access_to_shot', 'true')
+
+        if fleet and board.popcount(hits) >= fleet:
+            self.new_history.append(history.entry(history.LOSE, enemy))
+            events.append(self.record(lose))
+        return events
+
+    def append_message(self, sender, message):
+        self.message_id += 1
+        self.dirty.add('message_id')
+        message = {'id': str(self.message_id), 'sender': sender,
+                   'message': message}
+        encoded = json.dumps(message)
+        self.messages.append(encoded)
+        self.new_messages.append(encoded)
+        self.new_history.append(history.entry(history.CHAT, sender, message))
+        return [self.record({'type': 'chat_message', 'message': message})]
+
+    def events_since(self, since):
+        """
+        То же, что скрипт EVENTS_SINCE, по журналу в памяти.
+
+        The same as the EVENTS_SINCE script, from the log in memory.
+        """
+        if since > self.version or self.version - since > len(self.events):
+            return None
+        missed = list(self.events)[len(self.events) - self.version + since:]
+        return [self.version] + missed
+
+    def raw(self):
+        """
+        Состояние в виде сырого хеша комнаты для board.client_state.
+
+        The state as a raw room hash for board.client_state.
+        """
+        raw = {key.encode('utf8'): value.encode('utf8')
+               for key, value in self.fields.items()}
+
+        for key, mask in self.boards.items():
+            raw[key.encode('utf8')] = board.encode(mask)
+        raw[b'version'] = str(self.version).encode('utf8')
+        return raw
+
+    def has_changes(self):
+        return bool(self.dirty or self.new_events or self.new_messages
+                    or self.new_history)
+
+    def take_changes(self):
+        fields = {}
+
+        for field in self.dirty:
+            if field in self.boards:
+                fields[field] = board.encode(self.boards[field])
+            elif field == 'version':
+                fields[field] = self.version
+            elif field == 'message_id':
+                fields[field] = self.message_id
+            else:
+                fields[field] = self.fields[field]
+        changes = (fields, self.new_events, self.new_messages,
+                   self.new_history)
+        self.dirty, self.new_events, self.new_messages = set(), [], []
+        self.new_history = []
+        return changes
+
+    def restore_changes(self, changes):
+        """
+        Возвращает не записанные изменения, чтобы записать их позже.
+
+        Puts back changes that were not written, to write them later.
+        """
+        fields, events, messages, entries = changes
+        self.dirty.update(fields)
+        self.new_events[:0] = events
+        self.new_messages[:0] = messages
+        self.new_history[:0] = entries
+
+    def flush(self, batch, changes):
+        fields, events, messages, entries = changes
+
+        if fields:
+            batch.hmset_dict(self.name, fields)
+        touch(batch.expire(self.name, ROOM_TTL), self.name)
+
+        for key, items, limit in ((EVENTS_KEY, events, EVENTS_LIMIT),
+                                  (MESSAGES_KEY, messages, MESSAGES_LIMIT)):
+            if items:
+                key = key.format(self.name)
+                batch.rpush(key, *items)
+                batch.ltrim(key, -limit, -1)
+                batch.expire(key, ROOM_TTL)
+        self.flush_history(batch, entries)
+
+    def flush_history(self, batch, entries):
+        if entries:
+            key = HISTORY_KEY.format(self.name)
+            batch.rpush(key, *entries)
+            batch.expire(key, HISTORY_TTL)
+
+
+class RoomEngine:
+    """
+    Комнаты, которыми владеет этот процесс. Владелец захватывает комнату
+    ключом <room>:owner (SET NX с TTL), держит её состояние в памяти,
+    применяет кадры без обращений к redis и раз в flush_interval секунд
+    пакетно записывает изменения в redis. Кадры комнаты из других
+    процессов пересылаются владельцу через его канал в channel layer.
+    Если владелец пропал, ключ истекает через OWNER_TTL секунд, и комнату
+    захватывает следующий процесс, загружая последнее записанное
+    состояние.
+
+    Rooms owned by this process. The owner claims a room with the
+    <room>:owner key (SET NX with a TTL), keeps its state in memory,
+    applies frames without going to redis and writes the changes to redis
+    in a batch every flush_interval seconds. Room frames from other
+    processes are forwarded to the owner through its channel layer
+    channel. If the owner is gone, the key expires after OWNER_TTL seconds
+    and the next process claims the room, loading the last written state.
+    """
+
+    def __init__(self, channel_layer=None, flush_interval=0.05,
+                 owner_ttl=OWNER_TTL):
+        self.channel_layer = channel_layer
+        self.flush_interval = flush_interval
+        self.owner_ttl = owner_ttl
+        self.rooms = {}
+        self.owners = {}
+        self.loading = {}
+        self.dirty = set()
+        self.channel = None
+        self.tasks = []
+        self.refresh_at = 0
+        self.flushing = asyncio.Lock()
+
+    async def start(self):
+        if self.channel is not None:
+            return
+
+        if self.channel_layer is None:
+            # Свой экземпляр слоя: в channels_redis приём на каналах '!'
+            # одного экземпляра идёт под общей блокировкой, и ожидание
+            # кадров движка не должно задерживать приём консьюмеров.
+            # A separate layer instance: channels_redis receives on the
+            # '!' channels of one instance under a shared lock, and waiting
+            # for engine frames must not hold up the consumers' receives.
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.channel = await self.channel_layer.new_channel('engine')
+        self.tasks = [asyncio.ensure_future(self.receive_loop()),
+                      asyncio.ensure_future(self.flush_loop())]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.flush()
+        self.tasks = []
+
+    def batch(self, name):
+        """
+        Пакет команд на шарде комнаты.
+
+        A command batch on the room shard.
+        """
+        return RedisBatch(self.channel_layer, shard(self.channel_layer, name))
+
+    def local(self, name):
+        """
+        Комната, если ею владеет этот процесс.
+
+        The room, if this process owns it.
+        """
+        return self.rooms.get(name)
+
+    async def owner(self, name):
+        """
+        Канал владельца комнаты. Свободную комнату захватывает этот
+        процесс.
+
+        The channel of the room owner. A free room is claimed by this
+        process.
+        """
+        if name in self.rooms:
+            return self.channel
+        cached = self.owners.get(name)
+
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        key = OWNER_KEY.format(name)
+        _, owner = await self.batch(name).set(
+            key, self.channel, expire=self.owner_ttl,
+            exist=Redis.SET_IF_NOT_EXIST
+        ).get(key, encoding='utf8').execute()
+
+        if owner == self.channel:
+            return self.channel
+        self.owners[name] = (owner, time.monotonic() + OWNER_CACHE_TTL)
+        return owner
+
+    async def load(self, name):
+        """
+        Комната из памяти или, при первом обращении, из redis (загрузки
+        одной комнаты объединяются). None, если комнаты нет.
+
+        The room from memory or, on the first access, from redis
+        (concurrent loads of a room are shared). None if there is no room.
+        """
+        room = self.rooms.get(name)
+
+        if room is not None:
+            return room
+        loading = self.loading.get(name)
+
+        if loading is None:
+            loading = asyncio.ensure_future(self.read(name))
+            self.loading[name] = loading
+            loading.add_done_callback(
+                lambda _: self.loading.pop(name, None)
+            )
+        return await asyncio.shield(loading)
+
+    async def read(self, name):
+        raw, events, messages = await self.batch(name).hgetall(name).lrange(
+            EVENTS_KEY.format(name), -EVENTS_LIMIT, -1, encoding='utf8'
+        ).lrange(
+            MESSAGES_KEY.format(name), -MESSAGES_PAGE_SIZE, -1,
+            encoding='utf8'
+        ).execute()
+
+        if not raw:
+            await self.release(name)
+            return None
+        room = self.rooms[name] = Room(name, raw, events, messages)
+        return room
+
+    async def release(self, name):
+        """
+        Отпускает комнату без записи её состояния (комнаты нет или она
+        удаляется) и ключ владельца, если он ещё принадлежит процессу.
+
+        Releases the room without writing its state (there is no room or
+        it is being removed) and the owner key if the process still holds
+        it.
+        """
+        self.rooms.pop(name, None)
+        self.dirty.discard(name)
+        await self.batch(name).script(
+            OWNER_RELEASE, keys=[OWNER_KEY.format(name)], args=[self.channel]
+        ).execute()
+
+    async def forget(self, name):
+        """
+        Убирает комнату из памяти, дописав изменения, накопленные после
+        последней записи.
+
+        Drops the room from memory, writing the changes gathered since the
+        last write.
+        """
+        room = self.rooms.pop(name, None)
+        self.dirty.discard(name)
+
+        if room is not None and room.has_changes():
+            batch = self.batch(name)
+            room.flush(batch, room.take_changes())
+            await batch.execute()
+
+    async def submit(self, name, context, params, hops=0):
+        """
+        Применяет кадр к комнате, если она принадлежит этому процессу,
+        иначе пересылает его владельцу.
+
+        Applies a frame to the room if this process owns it, otherwise
+        forwards it to the owner. Returns True for a retried frame applied
+        here; the owner in another process acknowledges it itself.
+        """
+        await self.start()
+        owner = await self.owner(name)
+
+        if owner == self.channel:
+            return await self.apply(name, context, params)
+        elif hops < MAX_HOPS:
+            await self.channel_layer.send(owner, {
+                'type': 'engine.frame', 'room': name, 'context': context,
+                'params': params, 'hops': hops + 1
+            })
+        else:
+            logger.warning('Dropped %s frame for room %s: no owner found',
+                           context, name)
+
+    async def apply(self, name, context, params):
+        """
+        Применяет кадр к комнате этого процесса. Возвращает True, если
+        кадр - повтор уже применённого и не выполнялся.
+
+        Applies a frame to a room of this process. Returns True if the
+        frame is a retry of an applied one and was not executed.
+        """
+        if context == 'drop':
+            # Состояние удаляет владелец и только потом отпускает комнату,
+            # иначе его запись в flush() создала бы её заново. Не
+            # записанная история нужна архиву.
+            # The owner removes the state and only then releases the room,
+            # otherwise its write in flush() would create it again. The
+            # unwritten history is needed by the archive.
+            async with self.flushing:
+                room = self.rooms.pop(name, None)
+                self.dirty.discard(name)
+                batch = self.batch(name)
+
+                if room is not None and room.new_history:
+                    room.flush_history(batch, room.new_history)
+                batch.delete(name, MESSAGES_KEY.format(name),
+                             EVENTS_KEY.format(name)).zrem(ACTIVITY_KEY, name)
+                await archive(batch, name, params['players']).execute()
+            await self.release(name)
+            return
+        room = await self.load(name)
+
+        if room is None:
+            return
+        room.join(params['username'])
+        room.touched = time.monotonic()
+
+        if room.is_retry(params['username'], params.get('seq')):
+            return True
+
+        if context == 'player_ready':
+            events = room.ready(params['username'], params['enemy'],
+                                board.decode(params['ships']))
+        elif context == 'shot':
+            events = room.shot(params['username'], params['enemy'],
+                               params['index'], params['cell'])
+        else:
+            events = room.append_message(params['username'],
+                                         params['message'])
+
+        if room.dirty:
+            self.dirty.add(name)
+
+        for event in events:
+            with GROUP_SEND_SECONDS.time():
+                await self.channel_layer.group_send(name, event)
+
+    async def receive_loop(self):
+        while True:
+            try:
+                message = await self.channel_layer.receive(self.channel)
+            except Exception:
+                logger.exception('Failed to receive from the channel layer')
+                await asyncio.sleep(1)
+                continue
+
+            try:
+                if message['room'] in self.rooms:
+                    retried = await self.apply(message['room'],
+                                               message['context'],
+                                               message['params'])
+                else:
+                    # Владение потеряно или ещё не захвачено: кадр идёт
+                    # к текущему владельцу.
+                    # Ownership is lost or not claimed yet: the frame goes
+                    # to the current owner.
+                    self.owners.pop(message['room'], None)
+                    retried = await self.submit(
+                        message['room'], message['context'],
+                        message['params'], message['hops']
+                    )
+
+                if retried:
+                    # Повтор подтверждается консьюмеру, приславшему кадр.
+                    # A retry is acknowledged to the consumer that sent
+                    # the frame.
+                    DUPLICATE_FRAMES.inc(message['context'])
+                    await self.channel_layer.send(
+                        message['params']['reply_to'], {
+                            'type': 'duplicate',
+                            'request': message['context'],
+                            'seq': message['params']['seq']
+                        }
+                    )
+            except Exception:
+                logger.exception('Failed to apply a forwarded frame')
+
+    async def flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception('Failed to write rooms to redis')
+
+    async def flush(self):
+        """
+        Записывает изменения комнат одним пакетом на каждый шард и
+        продлевает владение. Комнаты, ключ владельца которых истёк, и
+        комнаты, простаивающие дольше ROOM_TTL (их состояние в redis тоже
+        истекло), отпускаются.
+
+        Writes the room changes in one batch per shard and extends the
+        ownership. Rooms whose owner key has expired and rooms idle for
+        longer than ROOM_TTL (their redis state has expired too) are
+        released.
+
+        Владение продлевается и отпускается, только если ключ всё ещё
+        хранит канал процесса (см. OWNER_EXTEND). Простаивающая комната
+        отпускается в том же пакете после записи её изменений и остаётся в
+        памяти, если пакет не записался; комната, которой завладел другой
+        процесс, убирается из памяти после записи оставшихся изменений.
+
+        The ownership is extended and released only if the key still holds
+        the process channel (see OWNER_EXTEND). An idle room is released in
+        the same batch after its changes are written and stays in memory if
+        the batch fails; a room taken over by another process is dropped
+        from memory after its remaining changes are written.
+        """
+        async with self.flushing:
+            await self.write()
+
+    async def write(self):
+        """
+        Сам пакет flush(), под блокировкой flushing.
+
+        The flush() batch itself, under the flushing lock.
+        """
+        names, self.dirty = self.dirty, set()
+        batches = {}
+        changes = {}
+        refresh = {}
+        idle = {}
+        now = time.monotonic()
+
+        if now >= self.refresh_at:
+            idle = {name: room for name, room in self.rooms.items()
+                    if room.touched + ROOM_TTL < now}
+            names.update(name for name, room in idle.items()
+                         if room.has_changes())
+
+        def batch(name):
+            index = shard(self.channel_layer, name)
+
+            if index not in batches:
+                batches[index] = RedisBatch(self.channel_layer, index)
+            return index, batches[index]
+
+        for name in names:
+            room = self.rooms.get(name)
+
+            if room is not None:
+                changes[name] = room.take_changes()
+                room.flush(batch(name)[1], changes[name])
+
+        if now >= self.refresh_at:
+            self.refresh_at = now + self.owner_ttl / 3
+
+            for name in self.rooms:
+                index, owners = batch(name)
+
+                if name in idle:
+                    owners.script(OWNER_RELEASE, keys=[OWNER_KEY.format(name)],
+                                  args=[self.channel])
+                else:
+                    owners.script(OWNER_EXTEND, keys=[OWNER_KEY.format(name)],
+                                  args=[self.channel, self.owner_ttl])
+                    refresh[name] = (index, len(owners) - 1)
+        results = dict(zip(batches, await asyncio.gather(
+            *[batch.execute() for batch in batches.values()],
+            return_exceptions=True
+        )))
+
+        for name, room_changes in changes.items():
+            failed = isinstance(results[shard(self.channel_layer, name)],
+                                Exception)
+
+            if failed and name in self.rooms:
+                self.rooms[name].restore_changes(room_changes)
+                self.dirty.add(name)
+
+        for name, room in idle.items():
+            if (not isinstance(results[shard(self.channel_layer, name)],
+                               Exception)
+                    and self.rooms.get(name) is room):
+                await self.forget(name)
+
+        for name, (index, position) in refresh.items():
+            if (not isinstance(results[index], Exception)
+                    and not results[index][position]):
+                await self.forget(name)
+
+        for result in results.values():
+            if isinstance(result, Exception):
+                raise result
+
+
+if settings.ROOM_ENGINE == 'memory':
+    room_engine = RoomEngine(
+        flush_interval=settings.ROOM_ENGINE_FLUSH_INTERVAL
+    )
+    Gauge('game_engine_rooms', 'Rooms owned by the room engine of this '
+          'process.', function=lambda: len(room_engine.rooms))
+else:
+    room_engine = None
@@ -0,0 +1,79 @@
+EVENTS_KEY = '{}:events'
+EVENTS_LIMIT = 256
+MESSAGES_KEY = '{}:messages'
+MESSAGES_LIMIT = 500
+MESSAGES_PAGE_SIZE = 50
+# Полная история комнаты для архива (см. history.py): в отличие от
+# ограниченного журнала событий, список только дополняется. Срок жизни
+# задаётся при создании списка и переживает комнату, пока историю не
+# заберёт архиватор (или она не истечёт, если он выключен).
+# The full room history for the archive (see history.py): unlike the
+# capped event log, the list is only appended to. Its lifetime is set
+# when the list is created and outlives the room until the archiver
+# takes the history (or it expires if the archiver is disabled).
+HISTORY_KEY = '{}:history'
+HISTORY_TTL = 86400
+# Поле хеша комнаты с последним применённым номером кадра игрока.
+# The room hash field with the last applied frame number of a player.
+SEQ_FIELD = '{}:seq'
+# Номера кадров игрока, пропущенные (не применённые) до последнего
+# применённого, например отброшенные ограничением частоты, через запятую.
+# Помнятся только номера из последних SEQ_WINDOW: столько кадров клиент
+# хранит для повтора (MAX_NOT_ACKED в main.js).
+# The frame numbers of a player skipped (not applied) before the last
+# applied one, e.g. dropped by a rate limit, comma separated. Only the
+# numbers within the last SEQ_WINDOW are kept: that many frames the client
+# keeps for resending (MAX_NOT_ACKED in main.js).
+SKIPPED_FIELD = '{}:skipped'
+SEQ_WINDOW = 20
+
+
+def frame_seq(frame):
+    """
+    Номер кадра клиента (seq) или None, если клиент его не передал.
+    Номера кадров игрока возрастают, поэтому кадр с номером не больше
+    последнего применённого в комнате - повтор, и он не выполняется,
+    если только его номер не был пропущен (см. SKIPPED_FIELD).
+
+    The client frame number (seq) or None if the client did not pass one.
+    The frame numbers of a player increase, so a frame numbered no higher
+    than the last one applied in the room is a retry and is not executed,
+    unless its number was skipped (see SKIPPED_FIELD).
+    """
+    seq = frame.get('seq')
+
+    if isinstance(seq, int) and not isinstance(seq, bool) and seq > 0:
+        return seq
+    return None
+
+
+def skipped_seqs(value):
+    """
+    Пропущенные номера кадров из поля SKIPPED_FIELD.
+
+    The skipped frame numbers from the SKIPPED_FIELD field.
+    """
+    return [int(seq) for seq in value.split(',')] if value else []
+
+
+def client_frame(event):
+    """
+    Переводит событие группы (chat_message, notification, action) в кадр
+    для main.js. Версия состояния комнаты передаётся клиенту, чтобы при
+    переподключении он мог запросить только пропущенные события.
+
+    Converts a group event (chat_message, notification, action) into a
+    frame for main.js. The room state version is passed to the client so
+    that on reconnect it can ask for the missed events only.
+    """
+    if event['type'] == 'chat_message':
+        frame = {'context': 'message', 'message': event['message']}
+    elif event['type'] == 'notification':
+        frame = {'context': 'notification', 'type': event['message']}
+    else:
+        frame = {'context': 'action', 'action_type': event['action_type'],
+                 'params': event['params']}
+
+    if 'version' in event:
+        frame['version'] = event['version']
+    return frame
@@ -1,12 +1,23 @@
 from django import forms
 from django.contrib.auth.models import User
 
+from .bots import BOT_PREFIX
+
 
 class UserRegistrationForm(forms.ModelForm):
     password = forms.CharField(label='Пароль', widget=forms.PasswordInput)
     password2 = forms.CharField(label='Повторите пароль',
                                 widget=forms.PasswordInput)
 
+    def clean_username(self):
+        username = self.cleaned_data['username']
+
+        # Имена с префиксом ботов заняты ботами (см. bots.py).
+        # Names with the bot prefix are taken by bots (see bots.py).
+        if username.startswith(BOT_PREFIX):
+            raise forms.ValidationError('Это имя зарезервировано')
+        return username
+
     class Meta:
         model = User
         fields = ('username', 'first_name', 'email')
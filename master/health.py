@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from channels.layers import get_channel_layer
+from django.db import close_old_connections, connection
+
+from .middleware import db_executor
+
+
+def check_database():
+    """
+    Открывает (или проверяет) соединение потока с базой.
+
+    Opens (or checks) the thread connection to the database.
+    """
+    close_old_connections()
+
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+class ReadinessApp:
+    """
+    ASGI приложение, отвечающее на path готовностью процесса принимать
+    игроков: доступны все шарды redis channel layer и база пользователей.
+    200 - готов, 503 - нет; в теле JSON с результатом каждой проверки.
+    Остальные HTTP запросы передаются в app.
+
+    An ASGI application answering on path whether the process is ready
+    to take players: all the channel layer redis shards and the user
+    database are reachable. 200 - ready, 503 - not; the body is JSON with
+    the result of every check. Other HTTP requests are passed to app.
+    """
+
+    def __init__(self, app, path='/ready', timeout=1.0):
+        self.app = app
+        self.path = path
+        self.timeout = timeout
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path:
+            return await self.app(scope, receive, send)
+        checks = await self.check()
+        ready = all(result == 'ok' for result in checks.values())
+        body = json.dumps(checks).encode('utf8')
+        await send({'type': 'http.response.start',
+                    'status': 200 if ready else 503,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def check(self):
+        channel_layer = get_channel_layer()
+        checks = [('redis_{}'.format(index), self.ping(channel_layer, index))
+                  for index in range(channel_layer.ring_size)]
+        checks.append(('database', asyncio.get_running_loop().run_in_executor(
+            db_executor, check_database
+        )))
+        results = await asyncio.gather(*[
+            asyncio.wait_for(check, self.timeout) for _, check in checks
+        ], return_exceptions=True)
+        return {name: 'ok' if not isinstance(result, BaseException)
+                else type(result).__name__
+                for (name, _), result in zip(checks, results)}
+
+    @staticmethod
+    async def ping(channel_layer, index):
+        async with channel_layer.connection(index) as redis:
+            await redis.ping()
+
+
+async def not_found(scope, receive, send):
+    """
+    Ответ 404 на HTTP запросы воркера, обслуживающего только WebSocket.
+
+    A 404 response to HTTP requests of a WebSocket-only worker.
+    """
+    await send({'type': 'http.response.start', 'status': 404,
+                'headers': [(b'content-type', b'text/plain'),
+                            (b'content-length', b'9')]})
+    await send({'type': 'http.response.body', 'body': b'Not Found'})
@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Коды закрытия соединения при вытеснении: клиент, не ответивший на
+# ping, переподключается к своей комнате; простаивающий игрок выходит из
+# комнаты (см. InterfaceConsumer.evict).
+# Close codes of evicted connections: a client that did not answer a ping
+# reconnects to its room; an idle player leaves the room (see
+# InterfaceConsumer.evict).
+CLOSE_CODES = {'timeout': 4000, 'idle': 4001}
+
+
+class Heartbeat:
+    """
+    Проверка соединений процесса на уровне приложения. Раз в interval
+    секунд одна задача обходит все соединения:
+
+    - молчащему дольше interval секунд отправляется кадр ping, клиент
+      отвечает кадром pong;
+    - молчащее дольше timeout секунд (полуоткрытый сокет, усыплённая
+      вкладка) вытесняется с кодом 4000;
+    - соединение без кадров игрока (pong не считается) дольше
+      idle_timeout секунд (0 - без ограничения) - брошенная вкладка -
+      вытесняется с кодом 4001.
+
+    Соединению нужны атрибуты seen и active (time.monotonic() последнего
+    кадра и последнего кадра игрока) и корутины ping() и evict(reason).
+
+    Application level checks of the connections of the process. Every
+    interval seconds a single task walks all the connections:
+
+    - one silent for longer than interval seconds gets a ping frame, the
+      client answers with a pong frame;
+    - one silent for longer than timeout seconds (a half-open socket, a
+      suspended tab) is evicted with code 4000;
+    - one without player frames (pongs do not count) for longer than
+      idle_timeout seconds (0 - no limit), an abandoned tab, is evicted
+      with code 4001.
+
+    A connection needs the seen and active attributes (time.monotonic() of
+    the last frame and of the last player frame) and the ping() and
+    evict(reason) coroutines.
+    """
+
+    def __init__(self, interval=20, timeout=60, idle_timeout=900):
+        self.interval = interval
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.connections = set()
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def add(self, connection):
+        self.connections.add(connection)
+
+    def discard(self, connection):
+        self.connections.discard(connection)
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.sweep()
+            except Exception:
+                logger.exception('Failed to check connections')
+
+    async def sweep(self, now=None):
+        """
+        Один обход соединений. Возвращает число вытесненных.
+
+        One walk over the connections. Returns the number of evicted ones.
+        """
+        now = time.monotonic() if now is None else now
+        evictions = []
+
+        for connection in list(self.connections):
+            if now - connection.seen > self.timeout:
+                reason = 'timeout'
+            elif (self.idle_timeout
+                  and now - connection.active > self.idle_timeout):
+                reason = 'idle'
+            else:
+                if now - connection.seen >= self.interval:
+                    await connection.ping()
+                continue
+            self.discard(connection)
+            evictions.append(connection.evict(reason))
+
+        for error in await asyncio.gather(*evictions,
+                                          return_exceptions=True):
+            if isinstance(error, Exception):
+                logger.error('Failed to evict a connection',
+                             exc_info=error)
+        return len(evictions)
+
+
+if settings.HEARTBEAT_INTERVAL > 0:
+    heartbeat = Heartbeat(interval=settings.HEARTBEAT_INTERVAL,
+                          timeout=settings.HEARTBEAT_TIMEOUT,
+                          idle_timeout=settings.IDLE_TIMEOUT)
+else:
+    heartbeat = None
@@ -0,0 +1,109 @@
+import json
+import zlib
+
+from . import board
+
+
+# Записи истории комнаты - JSON массивы [код, игрок, данные...]:
+#   ['p', игрок, корабли в hex] - расстановка флота (битовая доска);
+#   ['h', стрелок, клетка]      - попадание по кораблю соперника;
+#   ['m', стрелок, клетка]      - промах;
+#   ['l', проигравший]          - конец игры;
+#   ['c', отправитель, текст]   - сообщение чата.
+# Клетка - номер 0..99 (см. board.cell_index).
+#
+# Room history entries are JSON arrays [code, player, data...]:
+#   ['p', player, ships in hex] - the fleet placement (a bitboard);
+#   ['h', shooter, cell]        - a hit on an enemy ship;
+#   ['m', shooter, cell]        - a miss;
+#   ['l', loser]                - the end of the game;
+#   ['c', sender, text]         - a chat message.
+# A cell is an index 0..99 (see board.cell_index).
+PLACEMENT = 'p'
+HIT = 'h'
+MISS = 'm'
+LOSE = 'l'
+CHAT = 'c'
+
+
+def entry(*fields):
+    """
+    Запись истории в том же виде, что пишут Lua скрипты (cjson).
+
+    A history entry in the same form the Lua scripts write (cjson).
+    """
+    return json.dumps(fields, separators=(',', ':'))
+
+
+def compress(entries):
+    """
+    Записи истории (строки JSON) одним сжатым JSON массивом.
+
+    History entries (JSON strings) as a single compressed JSON array.
+    """
+    return zlib.compress(('[' + ','.join(entries) + ']').encode('utf8'))
+
+
+def decompress(data):
+    return json.loads(zlib.decompress(data).decode('utf8'))
+
+
+def loser(entries):
+    """
+    Проигравший по разобранным записям или None, если игра не окончена.
+
+    The loser by the decoded entries or None if the game has not ended.
+    """
+    for code, username, *_ in entries:
+        if code == LOSE:
+            return username
+    return None
+
+
+def replay(players, entries, upto=None):
+    """
+    Восстанавливает состояние комнаты после первых upto записей истории
+    (всех, если upto равен None) в том виде, который main.js получает при
+    подключении (см. board.client_state), вместе с чатом. players -
+    создатель комнаты и гость.
+
+    Rebuilds the room state after the first upto history entries (all of
+    them if upto is None) in the form main.js gets on connect (see
+    board.client_state), together with the chat. players are the room
+    creator and the guest.
+    """
+    member, guest = players
+    enemies = {member: guest, guest: member}
+    boards = {}
+    messages = []
+    raw = {'room_member': member, 'room_guest': guest or 'None'}
+
+    for code, username, *data in entries[:upto]:
+        if code == PLACEMENT:
+            boards[username + board.SHIPS] = board.decode(
+                bytes.fromhex(data[0])
+            )
+        elif code == HIT:
+            field = enemies.get(username, '') + board.HITS
+            boards[field] = boards.get(field, 0) | 1 << data[0]
+        elif code == MISS:
+            field = username + board.MISSES
+            boards[field] = boards.get(field, 0) | 1 << data[0]
+        elif code == LOSE:
+            raw['game_status'] = 'finished'
+            raw['winner'] = enemies.get(username, '')
+        elif code == CHAT:
+            messages.append({'id': str(len(messages) + 1),
+                             'sender': username, 'message': data[0]})
+
+    if 'game_status' not in raw and all(player + board.SHIPS in boards
+                                        for player in players):
+        raw['game_status'] = 'started'
+    raw = {key.encode('utf8'): value.encode('utf8')
+           for key, value in raw.items()}
+
+    for key, mask in boards.items():
+        raw[key.encode('utf8')] = board.encode(mask)
+    state = board.client_state(raw)
+    state['messages'] = json.dumps(messages)
+    return state
@@ -0,0 +1,344 @@
+import asyncio
+import logging
+import time
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+from django.conf import settings
+
+from .broadcast import BroadcastHub
+from .matchmaking import Matchmaker, OPEN_ROOMS_KEY, OPEN_ROOM_MEMBERS_KEY
+from .metrics import LOBBY_TICK_SECONDS, Gauge
+from .reader import channel_reader
+from .scripts import PRESENCE
+
+
+logger = logging.getLogger(__name__)
+
+# Пользователи онлайн (ZSET пользователь -> unix время, до которого он
+# считается онлайн) на шарде подбора. Процессы продлевают время своих
+# пользователей раз в heartbeat секунд; пользователь процесса, который
+# перестал продлевать его, уходит из лобби через ttl секунд.
+# Online users (a ZSET user -> unix time until which they count as online)
+# on the matchmaking shard. Processes extend the time of their users every
+# heartbeat seconds; a user of a process that stopped extending it leaves
+# the lobby after ttl seconds.
+PRESENCE_KEY = 'lobby:online'
+LOBBY_GROUP = 'lobby'
+
+
+class Lobby:
+    """
+    Присутствие пользователей и открытые комнаты для подписчиков лобби.
+    Изменения не рассылаются по одному: раз в interval секунд одна задача
+    процесса
+
+    - записывает в PRESENCE_KEY пользователей, подключившихся к процессу и
+      отключившихся от него за это время, и одним group_send сообщает о
+      них остальным процессам;
+    - раз в heartbeat секунд продлевает всех своих пользователей и
+      убирает из PRESENCE_KEY тех, кого никто не продлил;
+    - если у процесса есть подписчики, читает не больше rooms_limit
+      открытых комнат из очереди подбора и отправляет подписчикам одну
+      разницу (кадр lobby_diff) со всем, что изменилось за interval;
+    - новым подписчикам отправляет одно на всех состояние лобби (кадр
+      lobby).
+
+    Поэтому подписчик получает не больше 1 / interval кадров в секунду, а
+    redis - не больше одного сообщения группы на процесс за interval,
+    сколько бы пользователей ни подключалось.
+
+    User presence and open rooms for lobby subscribers. Changes are not
+    sent one by one: every interval seconds a single task of the process
+
+    - writes the users who connected to and disconnected from the process
+      meanwhile into PRESENCE_KEY and tells the other processes about them
+      with one group_send;
+    - every heartbeat seconds extends all its users and removes the ones
+      nobody extended from PRESENCE_KEY;
+    - if the process has subscribers, reads at most rooms_limit open rooms
+      from the matchmaking queue and sends the subscribers a single diff
+      (the lobby_diff frame) of everything changed within interval;
+    - sends new subscribers one lobby state (the lobby frame) for all of
+      them.
+
+    So a subscriber gets at most 1 / interval frames a second, and redis
+    at most one group message per process per interval, however many
+    users connect.
+    """
+
+    def __init__(self, channel_layer=None, reader=channel_reader,
+                 interval=0.5, heartbeat=10, ttl=30, rooms_limit=100):
+        self.channel_layer = channel_layer
+        self.reader = reader
+        self.interval = interval
+        self.heartbeat = heartbeat
+        self.ttl = ttl
+        self.rooms_limit = rooms_limit
+        # Соединения пользователей процесса и изменения их присутствия,
+        # ещё не записанные в redis (пользователь -> онлайн ли).
+        # Connections of the process users and the changes of their
+        # presence not written to redis yet (user -> whether online).
+        self.local = {}
+        self.changes = {}
+        # Изменения присутствия от всех процессов для подписчиков.
+        # Presence changes from all the processes for the subscribers.
+        self.presence = {}
+        self.subscribers = set()
+        self.joining = set()
+        self.rooms = {}
+        self.channel = None
+        self.refreshed = self.grouped = 0
+        self.task = None
+
+    def start(self):
+        if self.task is not None:
+            return
+
+        if self.channel_layer is None:
+            # Свой экземпляр слоя, как у движка комнат (см. engine.py).
+            # A separate layer instance, as for the room engine (see
+            # engine.py).
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def batch(self):
+        return Matchmaker(self.channel_layer).batch()
+
+    def connect(self, username):
+        """
+        У пользователя открылось соединение с этим процессом.
+
+        A connection of the user to this process has opened.
+        """
+        self.start()
+        self.local[username] = self.local.get(username, 0) + 1
+
+        if self.local[username] == 1:
+            self.changes[username] = True
+
+    def disconnect(self, username):
+        count = self.local.get(username, 0) - 1
+
+        if count > 0:
+            self.local[username] = count
+            return
+        self.local.pop(username, None)
+        self.changes[username] = False
+
+    def subscribe(self, subscriber):
+        """
+        Подписывает соединение (с base_send и binary, как у зрителей
+        BroadcastHub) на лобби. Состояние лобби оно получит при следующей
+        рассылке.
+
+        Subscribes a connection (with base_send and binary, as
+        BroadcastHub spectators) to the lobby. It gets the lobby state
+        with the next broadcast.
+        """
+        self.start()
+        self.joining.add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+        self.joining.discard(subscriber)
+
+    def count(self):
+        return len(self.subscribers) + len(self.joining)
+
+    async def dispatch(self, message):
+        """
+        Изменения присутствия, о которых сообщил процесс (включая этот).
+        Приходят через общий приёмник процесса (см. reader.py).
+
+        Presence changes reported by a process (this one included). They
+        arrive through the shared receiver of the process (see reader.py).
+        """
+        for username in message['joined']:
+            self.presence[username] = True
+
+        for username in message['left']:
+            self.presence[username] = False
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                with LOBBY_TICK_SECONDS.time():
+                    await self.tick()
+            except Exception:
+                logger.exception('Failed to update the lobby')
+
+    async def tick(self, now=None):
+        """
+        Одна рассылка: записывает и публикует изменения процесса, затем
+        отправляет подписчикам накопленную разницу, а новым - состояние.
+
+        One broadcast: writes and publishes the changes of the process,
+        then sends the subscribers the gathered diff, and the new ones the
+        state.
+        """
+        now = time.time() if now is None else now
+        await self.publish(now)
+
+        if not self.count():
+            if self.channel is not None:
+                await self.leave()
+            self.presence, self.rooms = {}, {}
+            return
+
+        # Повторное добавление продлевает членство в группе (group_expiry).
+        # Adding again extends the group membership (group_expiry).
+        if self.channel is None or now - self.grouped >= self.heartbeat:
+            await self.join(now)
+        opened, closed = await self.read_rooms(now)
+        frame = self.diff(opened, closed)
+
+        if frame is not None and self.subscribers:
+            message = {}
+
+            for subscriber in list(self.subscribers):
+                await subscriber.base_send(
+                    BroadcastHub.encode(frame, message, subscriber.binary)
+                )
+
+        if self.joining:
+            joining, self.joining = self.joining, set()
+            frame = {'context': 'lobby',
+                     'users': await self.read_users(now),
+                     'rooms': self.rooms}
+            message = {}
+
+            for subscriber in joining:
+                await subscriber.base_send(
+                    BroadcastHub.encode(frame, message, subscriber.binary)
+                )
+            self.subscribers |= joining
+
+    async def publish(self, now):
+        """
+        Записывает изменения присутствия пользователей процесса и, раз в
+        heartbeat секунд, продлевает их всех (см. PRESENCE). Те, кто
+        действительно появился в лобби или ушёл из него, уходят всем
+        процессам одним сообщением группы. Пользователь, отключившийся от
+        этого процесса, но подключённый к другому, пропадает из лобби до
+        продления тем процессом.
+
+        Writes the presence changes of the process users and, every
+        heartbeat seconds, extends all of them (see PRESENCE). The users
+        who actually appeared in or left the lobby go to all the processes
+        as one group message. A user disconnected from this process but
+        connected to another one is gone from the lobby until that process
+        extends them.
+        """
+        changes, self.changes = self.changes, {}
+        left = [username for username, online in changes.items()
+                if not online and username not in self.local]
+
+        if now - self.refreshed >= self.heartbeat:
+            self.refreshed = now
+            online = list(self.local)
+        else:
+            online = [username for username, online in changes.items()
+                      if online and username in self.local]
+
+            if not online and not left:
+                return
+        joined, left = (await self.batch().script(
+            PRESENCE, keys=[PRESENCE_KEY],
+            args=[now, now + self.ttl, len(online)] + online + left
+        ).execute())[0]
+
+        if joined or left:
+            await self.channel_layer.group_send(LOBBY_GROUP, {
+                'type': 'lobby.presence',
+                'joined': [username.decode('utf8') for username in joined],
+                'left': [username.decode('utf8') for username in left]
+            })
+
+    async def join(self, now):
+        if self.channel is None:
+            self.channel = self.reader.add(self, LOBBY_GROUP)
+        self.grouped = now
+        await self.channel_layer.group_add(LOBBY_GROUP, self.channel)
+
+    async def leave(self):
+        channel, self.channel = self.channel, None
+        self.reader.discard(channel)
+        await self.channel_layer.group_discard(LOBBY_GROUP, channel)
+
+    async def read_rooms(self, now):
+        """
+        Открытые комнаты (не больше rooms_limit, самые давние), которые
+        появились и пропали с прошлой рассылки. Счёт открытой комнаты -
+        время её создания плюс ROOM_TTL.
+
+        The open rooms (at most rooms_limit, the oldest ones) that have
+        appeared and gone since the last broadcast. The score of an open
+        room is its creation time plus ROOM_TTL.
+        """
+        rooms = (await self.batch().zrangebyscore(
+            OPEN_ROOMS_KEY, min=now, offset=0, count=self.rooms_limit,
+            encoding='utf8'
+        ).execute())[0]
+        closed = list(self.rooms.keys() - set(rooms))
+        new = [room for room in rooms if room not in self.rooms]
+        opened = {}
+
+        if new:
+            members = (await self.batch().hmget(
+                OPEN_ROOM_MEMBERS_KEY, *new, encoding='utf8'
+            ).execute())[0]
+            opened = {room: member for room, member in zip(new, members)
+                      if member is not None}
+
+        for room in closed:
+            del self.rooms[room]
+        self.rooms.update(opened)
+        return opened, closed
+
+    async def read_users(self, now):
+        return (await self.batch().zrangebyscore(
+            PRESENCE_KEY, min=now, encoding='utf8'
+        ).execute())[0]
+
+    def diff(self, opened, closed):
+        """
+        Кадр lobby_diff с изменениями с прошлой рассылки или None.
+
+        The lobby_diff frame with the changes since the last broadcast or
+        None.
+        """
+        presence, self.presence = self.presence, {}
+
+        if not presence and not opened and not closed:
+            return None
+        return {
+            'context': 'lobby_diff',
+            'joined': [username for username, online in presence.items()
+                       if online],
+            'left': [username for username, online in presence.items()
+                     if not online],
+            'opened': opened,
+            'closed': closed
+        }
+
+
+if settings.LOBBY_RATE > 0:
+    lobby = Lobby(interval=1 / settings.LOBBY_RATE,
+                  heartbeat=settings.PRESENCE_HEARTBEAT,
+                  ttl=settings.PRESENCE_TTL,
+                  rooms_limit=settings.LOBBY_ROOMS_LIMIT)
+    Gauge('game_lobby_subscribers', 'Lobby subscribers connected to this '
+          'process.', function=lobby.count)
+else:
+    lobby = None
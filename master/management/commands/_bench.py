@@ -0,0 +1,82 @@
+import aioredis
+
+from channels_redis.core import RedisChannelLayer
+from django.conf import settings
+
+
+def percentile(values, percent):
+    """
+    Перцентиль по отсортированной копии значений.
+
+    Percentile over a sorted copy of the values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    index = min(last, int(round(percent / 100 * last)))
+    return ordered[index]
+
+
+def summary(latencies):
+    """
+    Краткая сводка задержек в миллисекундах.
+
+    Short latency summary in milliseconds.
+    """
+    latencies = [x * 1000 for x in latencies]
+    mean = sum(latencies) / len(latencies) if latencies else 0.0
+    return 'n={} mean={:.3f}ms p50={:.3f}ms p99={:.3f}ms max={:.3f}ms'.format(
+        len(latencies), mean, percentile(latencies, 50),
+        percentile(latencies, 99), max(latencies, default=0.0)
+    )
+
+
+def rss(pid):
+    """
+    Резидентная память процесса в мегабайтах (Linux) или None.
+
+    The resident memory of a process in megabytes (Linux) or None.
+    """
+    try:
+        with open('/proc/{}/status'.format(pid)) as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+
+
+def add_redis_arguments(parser):
+    parser.add_argument('--redis-host', default=settings.REDIS_HOST)
+    parser.add_argument('--redis-port', type=int, default=settings.REDIS_PORT)
+    parser.add_argument('--db', type=int, default=15,
+                        help='Redis database used for the benchmark. '
+                             'It is flushed before and after the run.')
+
+
+async def connect_redis(options):
+    """
+    Отдельное соединение с redis на изолированной базе для бенчмарков.
+
+    A separate redis connection on an isolated database for benchmarks.
+    """
+    connection = await aioredis.create_redis(
+        (options['redis_host'], options['redis_port']), db=options['db']
+    )
+    await connection.flushdb()
+    return connection
+
+
+def channel_layer(options, **config):
+    """
+    Channel layer на той же изолированной базе (config - остальные
+    параметры RedisChannelLayer).
+
+    A channel layer on the same isolated database (config holds the other
+    RedisChannelLayer parameters).
+    """
+    return RedisChannelLayer(hosts=[{
+        'address': (options['redis_host'], options['redis_port']),
+        'db': options['db']
+    }], **config)
@@ -0,0 +1,532 @@
+import asyncio
+import json
+import random
+import time
+
+from collections import defaultdict, deque
+from urllib.parse import urlencode
+
+from channels.layers import get_channel_layer
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from master import board, protocol
+from master.bots import ShotQueue
+from master.matchmaking import (Matchmaker, OPEN_ROOMS_KEY,
+                                OPEN_ROOM_MEMBERS_KEY, USER_ROOM_KEY)
+
+from ._bench import percentile
+
+
+GAME_PATH = '/ws/game/'
+CELLS = [board.cell_id(index) for index in range(board.CELLS)]
+THROTTLE_PAUSE = 0.1
+# Сколько последних нумерованных кадров игрок повторяет после
+# переподключения, если включены повторы.
+# How many of the last numbered frames a player repeats after a reconnect
+# when replays are on.
+REPLAY_WINDOW = 8
+
+
+PROVISION_BATCH_SIZE = 500
+
+
+def provision_users(prefix, count):
+    """
+    Возвращает count пользователей нагрузочного теста вместе с их хешами,
+    создавая недостающих пачками по PROVISION_BATCH_SIZE (у SQLite есть
+    предел числа параметров запроса). Пароль хешируется один раз на всех,
+    уже существующие пользователи пропускаются, поэтому одновременные
+    генераторы нагрузки не мешают друг другу.
+
+    Returns count load test users with their hashes, creating the missing
+    ones in batches of PROVISION_BATCH_SIZE (SQLite limits the number of
+    query parameters). The password is hashed once for all of them and
+    existing users are skipped, so concurrent load generators do not get
+    in each other's way.
+    """
+    password = make_password(prefix)
+    users = []
+
+    for start in range(0, count, PROVISION_BATCH_SIZE):
+        usernames = ['{}{}'.format(prefix, i) for i
+                     in range(start, min(count, start + PROVISION_BATCH_SIZE))]
+        User.objects.bulk_create([User(username=username, password=password)
+                                  for username in usernames],
+                                 ignore_conflicts=True)
+        users.extend(
+            (user.username, user._legacy_get_session_auth_hash())
+            for user in User.objects.filter(
+                username__in=usernames
+            ).only('username', 'password')
+        )
+    return users
+
+
+async def forget_rooms(usernames):
+    """
+    Удаляет ссылки пользователей на комнаты и открытые комнаты этих
+    пользователей, оставшиеся от прерванных прогонов, чтобы каждая игра
+    начиналась с подбора соперника.
+
+    Drops the users' room pointers and the users' open rooms left over by
+    interrupted runs, so that every game starts with finding an enemy.
+    """
+    matchmaker = Matchmaker(get_channel_layer())
+    members = (await matchmaker.batch().hgetall(
+        OPEN_ROOM_MEMBERS_KEY, encoding='utf8'
+    ).execute())[0]
+    usernames = set(usernames)
+    batch = matchmaker.batch()
+
+    for room, member in members.items():
+        if member in usernames:
+            batch.zrem(OPEN_ROOMS_KEY, room).hdel(OPEN_ROOM_MEMBERS_KEY, room)
+
+    for username in usernames:
+        batch.delete(USER_ROOM_KEY.format(username))
+    await batch.execute()
+
+
+class NetworkClient:
+    """
+    WebSocket клиент для сервера, запущенного отдельно (daphne). С
+    binary клиент предлагает бинарный подпротокол.
+
+    WebSocket client for a separately running server (daphne). With
+    binary the client offers the binary subprotocol.
+    """
+
+    def __init__(self, url, binary=False):
+        import websockets
+
+        self.url = url.rstrip('/')
+        self.websockets = websockets
+        self.binary = binary
+        self.socket = None
+
+    async def connect(self, path, timeout):
+        self.socket = await asyncio.wait_for(self.websockets.connect(
+            self.url + path,
+            subprotocols=[protocol.SUBPROTOCOL] if self.binary else None
+        ), timeout)
+
+    async def send(self, frame):
+        if self.socket.subprotocol == protocol.SUBPROTOCOL:
+            await self.socket.send(protocol.encode_request(frame))
+        else:
+            await self.socket.send(json.dumps(frame))
+
+    async def receive(self, timeout):
+        data = await asyncio.wait_for(self.socket.recv(), timeout)
+
+        if isinstance(data, bytes):
+            return protocol.decode(data)
+        return json.loads(data)
+
+    async def close(self):
+        await self.socket.close()
+
+
+class InProcessClient:
+    """
+    Клиент, запускающий ASGI приложение в том же процессе, без сети.
+
+    Client running the ASGI application in the same process, without a
+    network.
+    """
+
+    def __init__(self, application, binary=False):
+        self.application = application
+        self.binary = binary
+        self.communicator = None
+
+    async def connect(self, path, timeout):
+        from channels.testing import WebsocketCommunicator
+
+        self.communicator = WebsocketCommunicator(
+            self.application, path,
+            subprotocols=[protocol.SUBPROTOCOL] if self.binary else None
+        )
+        connected, subprotocol = await self.communicator.connect(timeout)
+
+        if not connected:
+            raise ConnectionError('connection rejected')
+        self.binary = subprotocol == protocol.SUBPROTOCOL
+
+    async def send(self, frame):
+        if self.binary:
+            await self.communicator.send_to(
+                bytes_data=protocol.encode_request(frame)
+            )
+        else:
+            await self.communicator.send_json_to(frame)
+
+    async def receive(self, timeout):
+        # Таймаут communicator отменяет приложение, поэтому ждём вывода
+        # приложения сами.
+        # The communicator timeout cancels the application, so the
+        # application output is awaited here.
+        message = await asyncio.wait_for(
+            self.communicator.output_queue.get(), timeout
+        )
+
+        if message['type'] == 'websocket.close':
+            raise ConnectionError('connection closed')
+
+        if message.get('bytes') is not None:
+            return protocol.decode(message['bytes'])
+        return json.loads(message['text'])
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+
+class Stats:
+    """
+    Задержки по контекстам сообщений и счётчики прогона.
+
+    Latencies per message context and run counters.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.connections = 0
+        self.games = 0
+        self.errors = defaultdict(int)
+        self.counts = defaultdict(int)
+        self.started = time.perf_counter()
+
+    def record(self, context, seconds):
+        self.latencies[context].append(seconds)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started
+        lines = ['{:<14} {:>7} {:>10} {:>10}'.format('context', 'n',
+                                                     'p50 ms', 'p99 ms')]
+
+        for context, latencies in sorted(self.latencies.items()):
+            lines.append('{:<14} {:>7} {:>10.2f} {:>10.2f}'.format(
+                context, len(latencies), percentile(latencies, 50) * 1000,
+                percentile(latencies, 99) * 1000
+            ))
+        lines.append('{} connections in {:.1f}s: {:.1f} connections/s, '
+                     '{} games finished'.format(
+                         self.connections, elapsed,
+                         self.connections / elapsed, self.games
+                     ))
+
+        for name, count in sorted(self.counts.items()):
+            lines.append('{}: {}'.format(name, count))
+
+        for error, count in sorted(self.errors.items()):
+            lines.append('error {}: {}'.format(error, count))
+        return '\n'.join(lines)
+
+
+class Player:
+    """
+    Виртуальный игрок: подключается, расставляет флот, стреляет по
+    очереди (в случайную клетку или, если включены боты, по выбору
+    ShotPlanner), пишет в чат и выходит из комнаты после конца игры.
+
+    A virtual player: connects, places a fleet, shoots in turn (at a
+    random cell or, with bots on, as ShotPlanner chooses), chats and
+    leaves the room when the game is over.
+    """
+
+    def __init__(self, load, username, user_hash):
+        self.load = load
+        self.username = username
+        self.user_hash = user_hash
+        self.rng = random.Random(username)
+
+    def reset(self):
+        self.client = None
+        self.room = None
+        self.version = 0
+        self.member = False
+        self.my_turn = False
+        self.targets = self.rng.sample(CELLS, len(CELLS))
+        self.hits_given = 0
+        self.hits_taken = set()
+        # Свои попадания и промахи битовыми масками для ShotPlanner.
+        # Own hits and misses as bitmasks for ShotPlanner.
+        self.shots_hit = self.shots_missed = 0
+        self.shot_sent = None
+        self.chat_sent = deque()
+        self.exit_sent = None
+        self.finished = False
+        self.seq = 0
+        self.throttled = 0
+        self.sent = deque(maxlen=REPLAY_WINDOW)
+
+    def path(self, resume=False):
+        query = {'username': self.username, 'user_hash': self.user_hash}
+
+        if resume:
+            query.update(room=self.room, version=self.version)
+        return GAME_PATH + '?' + urlencode(query)
+
+    async def open(self, resume=False):
+        """
+        Открывает соединение и ждёт кадр состояния комнаты (connect или
+        resync), возвращая его.
+
+        Opens a connection and waits for the room state frame (connect or
+        resync), returning it.
+        """
+        started = time.perf_counter()
+        self.client = self.load.client()
+        await self.client.connect(self.path(resume), self.load.timeout)
+        frame = await self.receive()
+        self.load.stats.connections += 1
+        self.load.stats.record('reconnect' if resume else 'connect',
+                               time.perf_counter() - started)
+        return frame
+
+    async def receive(self):
+        frame = await self.client.receive(self.load.timeout)
+
+        if 'version' in frame:
+            self.version = frame['version']
+        return frame
+
+    async def play(self):
+        """
+        Играет одну игру от подключения до выхода из комнаты.
+
+        Plays a single game from connecting to leaving the room.
+        """
+        self.reset()
+        frame = await self.open()
+        self.room = frame['room']
+        self.version = int(frame['data'].get('version') or 0)
+        self.member = frame['data']['room_member'] == self.username
+        await self.think()
+        self.load.ready[self.room].append(time.perf_counter())
+        await self.send({'context': 'player_ready',
+                         'selected_cells': board.random_fleet(self.rng)})
+
+        try:
+            while not self.finished:
+                await self.handle(await self.receive())
+
+                if self.my_turn:
+                    await self.take_turn()
+        finally:
+            await self.client.close()
+        self.load.stats.games += 1
+        # Каждый применённый кадр, кроме двух player_ready, записывает
+        # одно событие, и ещё одно - конец игры, поэтому без потерь и
+        # повторных выполнений событий комнаты столько же, сколько
+        # кадров отправили оба игрока. Отброшенные ограничением частоты
+        # кадры не применяются.
+        # Every applied frame but the two player_ready ones records one
+        # event, plus one for the end of the game, so without losses and
+        # repeated executions a room has as many events as both players
+        # sent frames. Throttled frames are not applied.
+        self.load.stats.counts['frames sent'] += self.seq - self.throttled
+
+        if self.member:
+            self.load.stats.counts['events written'] += self.version
+
+    async def send(self, frame):
+        """
+        Отправляет кадр с номером seq и запоминает его для повторов.
+
+        Sends a frame numbered with seq and keeps it for replays.
+        """
+        self.seq += 1
+        frame['seq'] = self.seq
+        self.sent.append(frame)
+        await self.client.send(frame)
+
+    async def think(self):
+        if self.load.think_time:
+            await asyncio.sleep(self.rng.uniform(0, 2 * self.load.think_time))
+
+    async def take_turn(self):
+        self.my_turn = False
+
+        if (self.hits_given == board.FLEET_SIZE
+                or len(self.hits_taken) == board.FLEET_SIZE):
+            return
+        await self.think()
+
+        if self.rng.random() < self.load.reconnect_rate:
+            await self.client.close()
+            frame = await self.open(resume=True)
+
+            if frame['context'] == 'resync':
+                for event in frame['events']:
+                    await self.handle(event)
+            else:
+                self.load.stats.errors['full state on reconnect'] += 1
+
+            if self.finished:
+                return
+
+            if self.load.replay:
+                # Клиент, не знающий, что дошло до сервера, повторяет
+                # последние кадры: все они уже применены.
+                # A client that does not know what reached the server
+                # repeats its last frames: all of them are applied already.
+                for frame in self.sent:
+                    self.load.stats.counts['frames replayed'] += 1
+                    await self.client.send(frame)
+
+        if self.load.shots is not None:
+            self.targets.append(board.cell_id(await self.load.shots.choose(
+                self.shots_hit, self.shots_missed
+            )))
+
+        if self.rng.random() < self.load.chat_rate:
+            self.chat_sent.append(time.perf_counter())
+            await self.send({'context': 'send_message',
+                             'message': 'shot ' + self.targets[-1]})
+        self.shot_sent = time.perf_counter()
+        await self.send({'context': 'shot', 'cell': self.targets[-1]})
+
+    async def handle(self, frame):
+        """
+        Обновляет состояние игрока по кадру сервера и замеряет задержки
+        ответов на его собственные сообщения.
+
+        Updates the player state from a server frame and measures the
+        latency of replies to the player's own messages.
+        """
+        now = time.perf_counter()
+        context = frame['context']
+
+        if context == 'ping':
+            await self.client.send({'context': 'pong'})
+        elif context == 'throttled':
+            # Кадр отброшен ограничением частоты: сообщение чата
+            # пропадает, выстрел повторяется после паузы.
+            # The frame was dropped by a rate limit: a chat message is
+            # lost, a shot is repeated after a pause.
+            self.load.stats.errors['throttled ' + frame['request']] += 1
+            self.throttled += 1
+
+            if frame['request'] == 'send_message' and self.chat_sent:
+                self.chat_sent.pop()
+            elif frame['request'] == 'shot':
+                await asyncio.sleep(THROTTLE_PAUSE)
+                self.my_turn = True
+        elif context == 'duplicate':
+            self.load.stats.counts['duplicates acknowledged'] += 1
+        elif context == 'message':
+            if frame['message']['sender'] == self.username and self.chat_sent:
+                self.load.stats.record('send_message',
+                                       now - self.chat_sent.popleft())
+        elif context == 'notification':
+            if frame['type'] == 'start_game':
+                # Задержка считается от готовности второго игрока, время
+                # ожидания соперника в неё не входит.
+                # The latency is counted from the second player's ready,
+                # the time spent waiting for an enemy is not included.
+                self.load.stats.record('player_ready',
+                                       now - max(self.load.ready[self.room]))
+                self.my_turn = self.member
+            elif frame['type'] == 'exit_room':
+                if self.exit_sent is not None:
+                    self.load.stats.record('exit_room', now - self.exit_sent)
+                self.load.ready.pop(self.room, None)
+                self.finished = True
+        elif context == 'action':
+            if frame['action_type'] == 'lose':
+                if frame['params'] != self.username:
+                    self.exit_sent = time.perf_counter()
+                    await self.client.send({'context': 'exit_room'})
+                return
+            name, cell = frame['params'].split(',')
+
+            if frame['action_type'] == 'miss':
+                own_shot = name == self.username
+            else:
+                own_shot = name != self.username
+
+                if own_shot:
+                    self.hits_given += 1
+                else:
+                    self.hits_taken.add(cell)
+
+            if own_shot and self.targets and self.targets[-1] == cell:
+                self.targets.pop()
+
+            if own_shot and frame['action_type'] == 'miss':
+                self.shots_missed |= 1 << board.cell_index(cell)
+            elif own_shot:
+                self.shots_hit |= 1 << board.cell_index(cell)
+
+            if own_shot and self.shot_sent is not None:
+                self.load.stats.record('shot', now - self.shot_sent)
+                self.shot_sent = None
+            self.my_turn = not own_shot
+
+
+class LoadTest:
+    """
+    Запускает concurrency игроков, каждый играет games игр подряд или,
+    если задано duration, игры одну за другой в течение duration секунд.
+    С bots выстрелы всех игроков выбираются общей ShotQueue.
+
+    Runs concurrency players, each plays games games in a row or, with
+    duration set, game after game for duration seconds. With bots the
+    shots of all the players are chosen by a shared ShotQueue.
+    """
+
+    player = Player
+
+    def __init__(self, client, users, games=1, think_time=0.0,
+                 reconnect_rate=0.0, chat_rate=0.0, timeout=30.0,
+                 replay=False, bots=False, duration=None):
+        self.client = client
+        self.users = users
+        self.games = games
+        self.think_time = think_time
+        self.reconnect_rate = reconnect_rate
+        self.chat_rate = chat_rate
+        self.timeout = timeout
+        self.replay = replay
+        self.shots = ShotQueue() if bots else None
+        self.duration = duration
+        self.deadline = None
+        self.ready = defaultdict(list)
+        self.stats = Stats()
+
+    def playing(self, played):
+        if self.deadline is not None:
+            return time.monotonic() < self.deadline
+        return played < self.games
+
+    async def run_player(self, player):
+        played = 0
+
+        while self.playing(played):
+            played += 1
+
+            try:
+                await player.play()
+            except asyncio.TimeoutError:
+                self.stats.errors['timeout'] += 1
+            except Exception as error:
+                self.stats.errors[type(error).__name__] += 1
+            else:
+                continue
+            # Брошенная игра не должна стать комнатой следующей.
+            # An abandoned game must not become the room of the next one.
+            await forget_rooms([player.username])
+
+    async def run(self):
+        await forget_rooms([username for username, _ in self.users])
+        self.stats = Stats()
+
+        if self.duration is not None:
+            self.deadline = time.monotonic() + self.duration
+        await asyncio.gather(*[
+            self.run_player(self.player(self, username, user_hash))
+            for username, user_hash in self.users
+        ])
+        return self.stats
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from master import archive
+from master.board import FLEET_SIZE
+from master.models import Game
+from ._loadtest import InProcessClient, LoadTest, provision_users
+
+
+class Command(BaseCommand):
+    help = ('Plays games in this process, moves their histories to the '
+            'database with one archiver pass and checks that every '
+            'archived game replays to its result: the loser ends with the '
+            'whole fleet sunk and the history holds one entry per frame '
+            'sent plus the end of the game.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Number of simultaneously playing users.')
+        parser.add_argument('--games', type=int, default=2,
+                            help='Games played by every user in a row.')
+        parser.add_argument('--chat-rate', type=float, default=0.0,
+                            help='Probability to send a chat message '
+                                 'before a move.')
+        parser.add_argument('--batch-size', type=int, default=100,
+                            help='Rooms moved per database insert.')
+        parser.add_argument('--binary', action='store_true')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] % 2:
+            raise CommandError('--concurrency must be even.')
+        from game.asgi import application
+
+        self.application = application
+        # Фоновый архиватор процесса не должен забрать игры до замера.
+        # The background archiver of the process must not take the games
+        # before the measurement.
+        if archive.game_archiver is not None:
+            archive.game_archiver.interval = 86400
+        asyncio.run(self.run(provision_users('archive_',
+                                             options['concurrency']),
+                             options))
+
+    async def run(self, users, options):
+        usernames = [username for username, _ in users]
+        archiver = archive.GameArchiver(get_channel_layer(),
+                                        batch_size=options['batch_size'])
+        # Игры прошлых прогонов не должны попасть в замер.
+        # Games of earlier runs must not get into the measurement.
+        await archiver.drain(now=time.time() + archiver.grace, lock=False)
+        await self.in_executor(self.delete_games, usernames)
+        stats = await LoadTest(
+            lambda: InProcessClient(self.application, options['binary']),
+            users, games=options['games'], chat_rate=options['chat_rate'],
+            timeout=options['timeout']
+        ).run()
+        self.stdout.write(stats.report() + '\n')
+
+        started = time.perf_counter()
+        moved = await archiver.drain(now=time.time() + archiver.grace,
+                                     lock=False)
+        elapsed = time.perf_counter() - started
+        games = await self.in_executor(self.load_games, usernames)
+        stored = sum(len(game.history) for game in games)
+        raw = sum(len(json.dumps(game.entries(), separators=(',', ':')))
+                  for game in games)
+        self.stdout.write(
+            '{} games archived in {:.1f} ms ({:.0f} games/s), {} history '
+            'entries, {:.0f} bytes per game stored ({:.0f} before '
+            'compression)'.format(
+                moved, elapsed * 1000, moved / elapsed if elapsed else 0,
+                sum(game.length for game in games),
+                stored / len(games) if games else 0,
+                raw / len(games) if games else 0
+            )
+        )
+        wrong = [game.room for game in games if not self.replays(game)]
+        entries = sum(game.length for game in games)
+        expected = stats.counts['frames sent'] + sum(
+            1 for game in games if game.winner
+        )
+        self.stdout.write('replay: {} of {} games end with the loser\'s '
+                          'fleet sunk{}; {} entries for {} frames sent and '
+                          'game ends ({})'.format(
+                              len(games) - len(wrong), len(games),
+                              ' (wrong: {})'.format(', '.join(wrong))
+                              if wrong else '',
+                              entries, expected,
+                              'ok' if entries == expected else 'MISMATCH'
+                          ))
+
+    @staticmethod
+    async def in_executor(function, *args):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, function, *args
+        )
+
+    @staticmethod
+    def delete_games(usernames):
+        Game.objects.filter(member__in=usernames).delete()
+
+    @staticmethod
+    def load_games(usernames):
+        return list(Game.objects.filter(member__in=usernames))
+
+    @staticmethod
+    def replays(game):
+        if not game.winner:
+            return False
+        loser = game.guest if game.winner == game.member else game.member
+        dead_cells = game.replay().get(loser + ':dead_cells', '[]')
+        return len(json.loads(dead_cells)) == FLEET_SIZE
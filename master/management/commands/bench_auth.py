@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from master.middleware import AuthCache, AuthMiddleware
+
+
+class Command(BaseCommand):
+    help = ('Reports WebSocket handshake throughput of AuthMiddleware '
+            'with the user hash cache on and off.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--handshakes', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--username', default='bench_auth_user')
+
+    def handle(self, *args, **options):
+        user, created = User.objects.get_or_create(
+            username=options['username']
+        )
+
+        if created:
+            user.set_password(options['username'])
+            user.save()
+
+        try:
+            asyncio.run(self.run(user, options))
+        finally:
+            if created:
+                user.delete()
+
+    async def run(self, user, options):
+        query_string = 'username={}&user_hash={}'.format(
+            user.username, user._legacy_get_session_auth_hash()
+        ).encode()
+
+        for name, cache in (('cache off', None),
+                            ('cache on ', AuthCache(
+                                settings.AUTH_CACHE_SIZE,
+                                settings.AUTH_CACHE_LOCAL_TTL,
+                                settings.AUTH_CACHE_TTL
+                            ))):
+            accepted = []
+
+            async def app(scope, receive, send):
+                accepted.append(scope)
+
+            middleware = AuthMiddleware(app, cache=cache)
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def handshake():
+                async with semaphore:
+                    await middleware({'query_string': query_string},
+                                     None, None)
+
+            if cache is not None:
+                await cache.discard(user.username)
+            started = time.perf_counter()
+            await asyncio.gather(*[handshake() for _
+                                   in range(options['handshakes'])])
+            elapsed = time.perf_counter() - started
+            self.stdout.write('{}: {:.0f} handshakes/s ({} accepted)'.format(
+                name, len(accepted) / elapsed, len(accepted)
+            ))
@@ -0,0 +1,92 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from master import board
+
+
+CELLS = [board.cell_id(index) for index in range(board.CELLS)]
+
+
+class Command(BaseCommand):
+    help = ('Compares per-shot CPU and bytes stored per room of JSON cell '
+            'lists and bitboards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        random.seed(0)
+        games = [self.game() for _ in range(options['games'])]
+        shots = sum(len(shots) for _, shots in games)
+
+        for name, play in (('json lists', self.play_json),
+                           ('bitboards ', self.play_bitboard)):
+            started = time.perf_counter()
+            stored = [play(ships, shots) for ships, shots in games]
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                '{}: {:.2f}us per shot, {:.0f} bytes per room'.format(
+                    name, elapsed / shots * 1e6, sum(stored) / len(stored)
+                )
+            )
+
+    def game(self):
+        """
+        Случайная расстановка и порядок выстрелов до гибели флота.
+
+        A random fleet and shot order until the fleet is sunk.
+        """
+        ships = random.sample(CELLS, board.FLEET_SIZE)
+        order = random.sample(CELLS, len(CELLS))
+        last_hit = max(order.index(cell) for cell in ships)
+        return ships, order[:last_hit + 1]
+
+    def play_json(self, ships, shots):
+        """
+        Путь с JSON списками, как в старом shot_handler.
+
+        The JSON lists path, as in the old shot_handler.
+        """
+        fields = {'selected_cells': json.dumps(ships), 'dead_cells': '[]',
+                  'miss_cells': '[]', 'hit_cells': '[]'}
+
+        for cell in shots:
+            selected_cells = json.loads(fields['selected_cells'])
+            dead_cells = json.loads(fields['dead_cells'])
+            miss_cells = json.loads(fields['miss_cells'])
+
+            if len(dead_cells) < board.FLEET_SIZE:
+                if cell in selected_cells:
+                    dead_cells.append(cell)
+                    fields['dead_cells'] = json.dumps(dead_cells)
+                    fields['hit_cells'] = fields['dead_cells']
+                else:
+                    miss_cells.append(cell)
+                    fields['miss_cells'] = json.dumps(miss_cells)
+        return 2 * sum(len(value) for value in fields.values())
+
+    def play_bitboard(self, ships, shots):
+        """
+        Путь с битовыми досками, как в скрипте SHOT.
+
+        The bitboards path, as in the SHOT script.
+        """
+        fields = {board.SHIPS: board.encode(board.to_mask(ships)),
+                  board.HITS: board.encode(0),
+                  board.MISSES: board.encode(0)}
+
+        for cell in shots:
+            index = board.cell_index(cell)
+            ships_mask = board.decode(fields[board.SHIPS])
+            hits = board.decode(fields[board.HITS])
+
+            if board.popcount(hits) < board.popcount(ships_mask):
+                if ships_mask >> index & 1:
+                    fields[board.HITS] = board.encode(hits | 1 << index)
+                else:
+                    misses = board.decode(fields[board.MISSES])
+                    fields[board.MISSES] = board.encode(misses | 1 << index)
+        return 2 * sum(len(value) for value in fields.values())
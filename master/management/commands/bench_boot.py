@@ -0,0 +1,167 @@
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from urllib.error import URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ._bench import rss
+from ._loadtest import GAME_PATH, NetworkClient, forget_rooms, provision_users
+
+
+# Команды, которые раньше выполнялись при каждом старте контейнера.
+# Commands that used to run on every container start.
+SETUP_COMMANDS = (
+    ('collectstatic', '--no-input'),
+    ('makemigrations',),
+    ('migrate', '--no-input'),
+)
+
+# Контейнер с SQLite мигрирует свою базу при старте (см.
+# docker-compose.yaml); обычно миграций уже нет.
+# A container with SQLite migrates its database on start (see
+# docker-compose.yaml); usually there are no migrations left.
+MIGRATE_COMMANDS = (
+    ('migrate', '--no-input'),
+)
+
+MODES = (
+    ('legacy start', 'game.asgi:application', SETUP_COMMANDS),
+    ('migrate start', 'game.asgi:application', MIGRATE_COMMANDS),
+    ('full', 'game.asgi:application', ()),
+    ('websocket-only', 'game.asgi_ws:application', ()),
+)
+
+
+def ready(url):
+    try:
+        with urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except (URLError, OSError):
+        return False
+
+
+class Command(BaseCommand):
+    help = ('Measures the cold start of a game worker: from spawning the '
+            'process to listening, to a successful /ready and to the first '
+            'accepted WebSocket, for the old container start (setup '
+            'commands, then daphne), the start with migrate, the full '
+            'application and the WebSocket-only entry point.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--port', type=int, default=8150)
+        parser.add_argument('--timeout', type=float, default=60.0)
+        parser.add_argument('--modes', default=','.join(
+            name for name, _, _ in MODES
+        ), help='Comma-separated modes to measure.')
+
+    def handle(self, *args, **options):
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            raise CommandError('bench_boot requires the websockets package.')
+        modes = options['modes'].split(',')
+        user = provision_users('boot_', 1)[0]
+        # Соединения с базой не должны переходить в дочерние процессы.
+        # Database connections must not be inherited by child processes.
+        connections.close_all()
+        self.stdout.write('{:<15} {:>5} {:>12} {:>9} {:>12} {:>8}'.format(
+            'mode', 'runs', 'listening s', 'ready s', 'first ws s', 'rss MB'
+        ))
+
+        with tempfile.TemporaryDirectory() as static_root:
+            env = dict(os.environ, STATIC_ROOT=static_root)
+
+            for name, application, setup in MODES:
+                if name not in modes:
+                    continue
+                runs = [asyncio.run(self.boot(application, setup, env, user,
+                                              options))
+                        for _ in range(options['runs'])]
+                columns = [statistics.median(values) if None not in values
+                           else None for values in zip(*runs)]
+                self.stdout.write('{:<15} {:>5} {} {} {} {}'.format(
+                    name, len(runs), *[
+                        '{:>{}.2f}'.format(value, width) if value is not None
+                        else '{:>{}}'.format('-', width)
+                        for value, width in zip(columns, (12, 9, 12, 8))
+                    ]
+                ))
+
+    async def boot(self, application, setup, env, user, options):
+        """
+        Один холодный старт воркера. Возвращает секунды до прослушивания
+        порта, до готовности и до первого принятого WebSocket, и память
+        воркера после него.
+
+        One cold start of a worker. Returns the seconds until the port is
+        listened on, until ready and until the first accepted WebSocket,
+        and the worker memory after it.
+        """
+        port = str(options['port'])
+        deadline = time.monotonic() + options['timeout']
+        started = time.perf_counter()
+
+        for command in setup:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, 'manage.py', *command,
+                cwd=settings.BASE_DIR, env=env,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL
+            )
+
+            if await process.wait():
+                raise CommandError('manage.py {} failed.'.format(command[0]))
+        worker = await asyncio.create_subprocess_exec(
+            sys.executable, '-m', 'daphne', '-p', port, application,
+            cwd=settings.BASE_DIR, env=env,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        loop = asyncio.get_running_loop()
+
+        try:
+            while True:
+                try:
+                    _, writer = await asyncio.open_connection('127.0.0.1',
+                                                              port)
+                    writer.close()
+                    break
+                except OSError:
+                    await self.retry(deadline, 'listen')
+            listening = time.perf_counter() - started
+
+            while not await loop.run_in_executor(
+                None, ready, 'http://127.0.0.1:{}/ready'.format(port)
+            ):
+                await self.retry(deadline, 'get ready')
+            is_ready = time.perf_counter() - started
+
+            username, user_hash = user
+            client = NetworkClient('ws://127.0.0.1:{}'.format(port))
+            await client.connect(GAME_PATH + '?' + urlencode({
+                'username': username, 'user_hash': user_hash
+            }), options['timeout'])
+            await client.receive(options['timeout'])
+            first_websocket = time.perf_counter() - started
+            memory = rss(worker.pid)
+            await client.close()
+        finally:
+            worker.terminate()
+            await worker.wait()
+            await forget_rooms([user[0]])
+        return listening, is_ready, first_websocket, memory
+
+    async def retry(self, deadline, what):
+        if time.monotonic() > deadline:
+            raise CommandError('The worker did not {} in time.'.format(what))
+        await asyncio.sleep(0.02)
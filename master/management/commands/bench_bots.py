@@ -0,0 +1,158 @@
+import asyncio
+import random
+import statistics
+import time
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from master import board
+from master.bots import BotEngine, ShotPlanner
+from master.metrics import BOT_GAMES
+from ._bench import summary
+from ._loadtest import (InProcessClient, LoadTest, Player, forget_rooms,
+                        provision_users)
+
+
+class Command(BaseCommand):
+    help = ('Plays bot games against random fleets without a server: '
+            'every step chooses the shots of all unfinished games with one '
+            'ShotPlanner call. Reports decisions per second, the step time '
+            'and the shots needed to sink a fleet, against one game per '
+            'call and a random shooter. With --rooms also seats bots in '
+            'rooms of players shooting at random, in this process.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=1000,
+                            help='Games played at once.')
+        parser.add_argument('--single', type=int, default=20,
+                            help='Games played one call per decision.')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--rooms', type=int, default=0,
+                            help='Players waiting alone for a bot.')
+        parser.add_argument('--think-time', type=float, default=0.0,
+                            help='Bot pause in seconds before every move.')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        try:
+            planner = ShotPlanner(options['seed'])
+        except ImportError:
+            raise CommandError('bench_bots requires the numpy package.')
+        np = planner.np
+        rng = random.Random(options['seed'])
+
+        for name, games, size in (
+            ('batched', options['games'], options['games']),
+            ('one by one', options['single'], 1),
+        ):
+            fleets = planner.bits([board.to_mask(board.random_fleet(rng))
+                                   for _ in range(games)])
+            shots, steps, elapsed = self.play(planner, fleets, size)
+            self.stdout.write(
+                '{:<10} {:>5} games: {} decisions in {:.2f}s, {:.0f} '
+                'decisions/s'.format(name, games, sum(shots), elapsed,
+                                     sum(shots) / elapsed)
+            )
+            self.stdout.write('{:<10} step {}'.format('', summary(steps)))
+            self.stdout.write(
+                '{:<10} shots to win: mean {:.1f}, median {:.0f}, max '
+                '{}'.format('', statistics.mean(shots),
+                            statistics.median(shots), max(shots))
+            )
+
+        # Случайный стрелок топит флот выстрелом по последней из его
+        # клеток в случайном порядке обхода поля.
+        # A random shooter sinks a fleet with the shot at the last of its
+        # cells in a random order of the board.
+        generator = np.random.default_rng(options['seed'])
+        fleets = planner.bits([board.to_mask(board.random_fleet(rng))
+                               for _ in range(options['games'])])
+        order = generator.random(fleets.shape).argsort(axis=1)
+        random_shots = (np.take_along_axis(fleets, order, axis=1)
+                        * np.arange(1, board.CELLS + 1)).max(axis=1)
+        self.stdout.write('{:<10} shots to win: mean {:.1f}, median '
+                          '{:.0f}'.format('random', random_shots.mean(),
+                                          np.median(random_shots)))
+
+        if options['rooms']:
+            from game.asgi import application
+
+            self.application = application
+            asyncio.run(self.serve(provision_users('bots_', options['rooms']),
+                                   options))
+
+    async def serve(self, users, options):
+        """
+        Игроки по одному создают комнаты, и каждую сразу забирает бот
+        (BotEngine.invite), поэтому игроки не попадают друг к другу.
+
+        The players create rooms one by one and a bot takes every room
+        right away (BotEngine.invite), so the players do not meet each
+        other.
+        """
+        engine = BotEngine(get_channel_layer(), wait=0,
+                           think_time=options['think_time'],
+                           idle_ttl=options['timeout'])
+        load = LoadTest(lambda: InProcessClient(self.application), users,
+                        timeout=options['timeout'])
+        await forget_rooms([username for username, _ in users])
+        results = dict(BOT_GAMES.values)
+        players = []
+
+        for username, user_hash in users:
+            players.append(asyncio.ensure_future(
+                load.run_player(Player(load, username, user_hash))
+            ))
+            deadline = time.monotonic() + options['timeout']
+
+            while not await engine.invite() and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+        await asyncio.gather(*players)
+        await asyncio.gather(*engine.bots)
+        # Кадры ботов игроки не считают, сверять их с событиями нечего.
+        # The players do not count the bot frames, there is nothing to
+        # compare the events with.
+        load.stats.counts.pop('frames sent', None)
+        load.stats.counts.pop('events written', None)
+        self.stdout.write(load.stats.report())
+        self.stdout.write('bots: ' + ', '.join(
+            '{} {}'.format(result, count - results.get((result,), 0))
+            for (result,), count in sorted(BOT_GAMES.values.items())
+        ))
+
+    @staticmethod
+    def play(planner, fleets, size):
+        """
+        Играет все игры до потопления флота, выбирая выстрелы пачками по
+        size игр. Возвращает число выстрелов каждой игры, время шагов и
+        общее время.
+
+        Plays all the games until the fleet is sunk, choosing the shots in
+        batches of size games. Returns the number of shots of every game,
+        the step times and the total time.
+        """
+        np = planner.np
+        games = len(fleets)
+        hits = np.zeros(fleets.shape, bool)
+        misses = np.zeros(fleets.shape, bool)
+        shots = np.zeros(games, int)
+        steps = []
+        started = time.perf_counter()
+
+        while True:
+            playing = np.flatnonzero(hits.sum(axis=1) < board.FLEET_SIZE)
+
+            if not len(playing):
+                break
+
+            for start in range(0, len(playing), size):
+                batch = playing[start:start + size]
+                step = time.perf_counter()
+                cells = planner.choose(hits[batch], misses[batch])
+                steps.append(time.perf_counter() - step)
+                hit = fleets[batch, cells]
+                hits[batch[hit], cells[hit]] = True
+                misses[batch[~hit], cells[~hit]] = True
+                shots[batch] += 1
+        return shots.tolist(), steps, time.perf_counter() - started
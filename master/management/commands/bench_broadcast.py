@@ -0,0 +1,144 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+
+from master.broadcast import BroadcastHub
+from ._bench import (add_redis_arguments, channel_layer, connect_redis,
+                     summary)
+
+
+ROOM = 'bench_room'
+EVENT = {'type': 'action', 'action_type': 'hit',
+         'params': 'load_17,cell_F7', 'version': 42}
+
+
+class Viewer:
+    """
+    Зритель бенчмарка: вместо ASGI send считает полученные сообщения.
+
+    A benchmark spectator: counts the received messages instead of an
+    ASGI send.
+    """
+
+    def __init__(self, delivery, binary=False):
+        self.delivery = delivery
+        self.binary = binary
+
+    async def base_send(self, message):
+        self.delivery.received()
+
+    async def close(self):
+        pass
+
+
+class Delivery:
+    """
+    Ждёт, пока событие получат все зрители.
+
+    Waits until all the spectators have got an event.
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+        self.count = 0
+        self.done = asyncio.get_event_loop().create_future()
+
+    def received(self):
+        self.count += 1
+
+        if self.count == self.expected and not self.done.done():
+            self.done.set_result(None)
+
+
+class Command(BaseCommand):
+    help = ('Compares the per-event cost of fanning an event out to N '
+            'spectators with a group_send to N channels and with the '
+            'broadcast hub (one channel per process, one encoding per '
+            'event).')
+
+    def add_arguments(self, parser):
+        add_redis_arguments(parser)
+        parser.add_argument('--spectators', default='10,100,1000,5000',
+                            help='Comma-separated spectator counts.')
+        parser.add_argument('--events', type=int, default=20)
+        parser.add_argument('--group-limit', type=int, default=1000,
+                            help='Largest count measured with a channel '
+                                 'per spectator.')
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        connection = await connect_redis(options)
+        self.layer = channel_layer(options)
+
+        try:
+            for count in map(int, options['spectators'].split(',')):
+                if count <= options['group_limit']:
+                    latencies = await self.group_fanout(count,
+                                                        options['events'])
+                    self.stdout.write('{:>6} spectators, group_send: {}'
+                                      .format(count, summary(latencies)))
+                await connection.flushdb()
+                latencies = await self.hub_fanout(count, options['events'])
+                self.stdout.write('{:>6} spectators, hub:        {}'
+                                  .format(count, summary(latencies)))
+                await connection.flushdb()
+        finally:
+            await self.layer.flush()
+            await connection.flushdb()
+            connection.close()
+            await connection.wait_closed()
+
+    async def group_fanout(self, count, events):
+        """
+        Канал на зрителя в группе комнаты: redis хранит и отдаёт событие
+        каждому зрителю отдельно.
+
+        A channel per spectator in the room group: redis stores and hands
+        out the event to every spectator separately.
+        """
+        channels = [await self.layer.new_channel() for _ in range(count)]
+
+        for channel in channels:
+            await self.layer.group_add(ROOM, channel)
+        latencies = []
+
+        for _ in range(events):
+            started = time.perf_counter()
+            await self.layer.group_send(ROOM, EVENT)
+            await asyncio.gather(*[self.layer.receive(channel)
+                                   for channel in channels])
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def hub_fanout(self, count, events):
+        """
+        Зрители одного процесса на broadcast hub.
+
+        Spectators of one process on the broadcast hub.
+        """
+        hub = BroadcastHub(channel_layer=self.layer)
+        delivery = Delivery(count)
+        viewers = [Viewer(delivery, binary=bool(number % 2))
+                   for number in range(count)]
+
+        for viewer in viewers:
+            await hub.subscribe(ROOM, viewer)
+            await hub.ready(ROOM, viewer, 0)
+        latencies = []
+
+        try:
+            for _ in range(events):
+                delivery.count = 0
+                delivery.done = asyncio.get_event_loop().create_future()
+                started = time.perf_counter()
+                await self.layer.group_send(ROOM, EVENT)
+                await delivery.done
+                latencies.append(time.perf_counter() - started)
+        finally:
+            for viewer in viewers:
+                await hub.unsubscribe(ROOM, viewer)
+            hub.refresh_task.cancel()
+        return latencies
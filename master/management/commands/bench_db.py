@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+
+from master.forms import UserRegistrationForm
+from master.middleware import AuthMiddleware, load_user_hash
+from ._loadtest import provision_users
+
+
+PREFIX = 'bench_db_'
+
+
+def legacy_user_hash(username):
+    return User.objects.get(username=username)._legacy_get_session_auth_hash()
+
+
+def register(username):
+    """
+    То же, что view register: форма, хеширование пароля, сохранение.
+
+    The same as the register view: the form, password hashing, saving.
+    """
+    form = UserRegistrationForm({'username': username, 'password': username,
+                                 'password2': username})
+
+    if not form.is_valid():
+        raise ValueError(form.errors)
+    user = form.save(commit=False)
+    user.set_password(form.cleaned_data['password'])
+    user.save()
+    connection.close()
+
+
+@contextmanager
+def conn_max_age(value):
+    """
+    Временно меняет CONN_MAX_AGE для новых соединений.
+
+    Temporarily changes CONN_MAX_AGE for new connections.
+    """
+    database = settings.DATABASES['default']
+    saved = database['CONN_MAX_AGE']
+    database['CONN_MAX_AGE'] = value
+    connections.close_all()
+
+    try:
+        yield
+    finally:
+        database['CONN_MAX_AGE'] = saved
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Measures registration and WebSocket handshake (user hash '
+            'cache off) throughput under concurrency on the configured '
+            'database. Run once per DB_ENGINE to compare SQLite with '
+            'PostgreSQL.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--handshakes', type=int, default=5000)
+        parser.add_argument('--registrations', type=int, default=100)
+        parser.add_argument('--concurrency', type=int, default=50)
+
+    def handle(self, *args, **options):
+        self.stdout.write('database: {}'.format(connection.vendor))
+
+        try:
+            started = time.perf_counter()
+            users = provision_users(PREFIX, options['users'])
+            self.stdout.write('provisioning: {:.0f} users/s'.format(
+                len(users) / (time.perf_counter() - started)
+            ))
+            self.registrations(options)
+
+            with conn_max_age(0):
+                self.handshakes('handshakes, thread-sensitive lookup, '
+                                'no persistent connections',
+                                database_sync_to_async(legacy_user_hash),
+                                users, options)
+            self.handshakes('handshakes, pooled lookup',
+                            load_user_hash, users, options)
+        finally:
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+    def registrations(self, options):
+        usernames = ['{}reg_{}'.format(PREFIX, number)
+                     for number in range(options['registrations'])]
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            started = time.perf_counter()
+            list(pool.map(register, usernames))
+            elapsed = time.perf_counter() - started
+        self.stdout.write('registrations: {:.1f}/s'.format(
+            len(usernames) / elapsed
+        ))
+
+    def handshakes(self, name, load, users, options):
+        accepted = []
+
+        async def app(scope, receive, send):
+            accepted.append(scope)
+
+        async def run():
+            middleware = AuthMiddleware(app, cache=None, load=load)
+            semaphore = asyncio.Semaphore(options['concurrency'])
+
+            async def handshake(username, user_hash):
+                async with semaphore:
+                    await middleware({
+                        'query_string': 'username={}&user_hash={}'.format(
+                            username, user_hash
+                        ).encode()
+                    }, None, None)
+
+            started = time.perf_counter()
+            await asyncio.gather(*[
+                handshake(*users[number % len(users)])
+                for number in range(options['handshakes'])
+            ])
+            return time.perf_counter() - started
+
+        elapsed = asyncio.run(run())
+        self.stdout.write('{}: {:.0f}/s ({} accepted)'.format(
+            name, len(accepted) / elapsed, len(accepted)
+        ))
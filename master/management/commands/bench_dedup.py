@@ -0,0 +1,62 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from master.metrics import DUPLICATE_FRAMES
+from ._loadtest import InProcessClient, LoadTest, provision_users
+
+
+class Command(BaseCommand):
+    help = ('Plays games with frequent reconnects, without and with a '
+            'reconnect storm in which every player repeats its last '
+            'frames after reconnecting, and reports whether the rooms '
+            'recorded exactly one event per frame sent.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Number of simultaneously playing users.')
+        parser.add_argument('--reconnect-rate', type=float, default=0.3,
+                            help='Probability to reconnect before a move.')
+        parser.add_argument('--chat-rate', type=float, default=0.0,
+                            help='Probability to send a chat message '
+                                 'before a move.')
+        parser.add_argument('--think-time', type=float, default=0.0)
+        parser.add_argument('--binary', action='store_true')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] % 2:
+            raise CommandError('--concurrency must be even.')
+        from game.asgi import application
+
+        self.application = application
+        # Оба прогона в одном цикле событий: channels_redis привязывает
+        # блокировки приёма по префиксу канала к циклу событий, а префикс -
+        # имя пользователя, одно и то же в обоих прогонах.
+        # Both runs in one event loop: channels_redis binds its receive
+        # locks per channel prefix to the event loop, and the prefix is the
+        # username, the same in both runs.
+        asyncio.run(self.run(provision_users('dedup_',
+                                             options['concurrency']),
+                             options))
+
+    async def run(self, users, options):
+        for name, replay in (('no replays', False), ('reconnect storm', True)):
+            DUPLICATE_FRAMES.values.clear()
+            stats = await LoadTest(
+                lambda: InProcessClient(self.application, options['binary']),
+                users, think_time=options['think_time'],
+                reconnect_rate=options['reconnect_rate'],
+                chat_rate=options['chat_rate'], replay=replay,
+                timeout=options['timeout']
+            ).run()
+            written = stats.counts['events written']
+            sent = stats.counts['frames sent']
+            self.stdout.write('{}: {} events written for {} frames sent '
+                              '({}), {} retried frames acknowledged by the '
+                              'server\n{}\n'.format(
+                                  name, written, sent,
+                                  'ok' if written == sent else 'MISMATCH',
+                                  int(sum(DUPLICATE_FRAMES.values.values())),
+                                  stats.report()
+                              ))
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from master.batch import RedisBatch
+from master.board import (CELLS, SHIPS, cell_id, encode, random_fleet,
+                          to_mask)
+from master.engine import RoomEngine
+from master.events import (EVENTS_KEY, EVENTS_LIMIT, HISTORY_KEY,
+                           MESSAGES_KEY, MESSAGES_LIMIT)
+from master.matchmaking import ROOM_TTL
+from master.scripts import SHOT, APPEND_MESSAGE
+from ._bench import (add_redis_arguments, channel_layer, connect_redis,
+                     summary)
+
+
+ROOM = 'bench_room'
+
+
+class Command(BaseCommand):
+    help = ('Compares per-message latency of the Redis-per-frame path (a Lua '
+            'script and a group_send per frame) with the in-process room '
+            'engine (state in memory, batched write-behind).')
+
+    def add_arguments(self, parser):
+        add_redis_arguments(parser)
+        parser.add_argument('--messages', type=int, default=2000)
+        parser.add_argument('--chat-rate', type=float, default=0.2,
+                            help='Share of chat messages among the frames.')
+        parser.add_argument('--flush-interval', type=float, default=0.05)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        connection = await connect_redis(options)
+        self.layer = channel_layer(options)
+        self.count_round_trips()
+
+        try:
+            for name, path in (('redis per frame:', self.redis_frame),
+                               ('room engine:    ', self.engine_frame)):
+                await self.reset_room(connection)
+                latencies, round_trips = await self.measure(path, options)
+                self.stdout.write('{} {} redis round trips/message={:.2f}'
+                                  .format(name, summary(latencies),
+                                          round_trips / len(latencies)))
+        finally:
+            await self.layer.flush()
+            await connection.flushdb()
+            connection.close()
+            await connection.wait_closed()
+
+    def count_round_trips(self):
+        """
+        Считает соединения, взятые из пула слоя: и RedisBatch, и
+        channels_redis берут соединение на каждый сетевой запрос.
+
+        Counts connections taken from the layer pool: both RedisBatch and
+        channels_redis take a connection for every network round trip.
+        """
+        connection = self.layer.connection
+        self.round_trips = 0
+
+        def counted(index):
+            self.round_trips += 1
+            return connection(index)
+        self.layer.connection = counted
+
+    async def reset_room(self, connection):
+        random.seed(0)
+        state = {'room_member': 'alice', 'room_guest': 'bob',
+                 'game_status': 'started'}
+
+        for username in ('alice', 'bob'):
+            state[username + SHIPS] = encode(to_mask(random_fleet()))
+        await connection.delete(ROOM, EVENTS_KEY.format(ROOM),
+                                MESSAGES_KEY.format(ROOM),
+                                HISTORY_KEY.format(ROOM))
+        await connection.hmset_dict(ROOM, state)
+
+    async def measure(self, path, options):
+        self.engine = RoomEngine(self.layer, options['flush_interval'])
+        await self.engine.start()
+        cells = random.sample(range(CELLS), CELLS)
+        latencies = []
+        self.round_trips = 0
+
+        for number in range(options['messages']):
+            username, enemy = ('alice', 'bob') if number % 2 else ('bob',
+                                                                   'alice')
+            chat = random.random() < options['chat_rate']
+            started = time.perf_counter()
+            await path(username, enemy, chat, cells[number % CELLS])
+            latencies.append(time.perf_counter() - started)
+
+        # Отложенная запись тоже входит в число запросов.
+        # The write-behind flushes are counted too.
+        await self.engine.stop()
+        return latencies, self.round_trips
+
+    async def redis_frame(self, username, enemy, chat, index):
+        if chat:
+            event = (await RedisBatch(self.layer).script(
+                APPEND_MESSAGE,
+                keys=[ROOM, MESSAGES_KEY.format(ROOM), EVENTS_KEY.format(ROOM),
+                      HISTORY_KEY.format(ROOM)],
+                args=[username, json.dumps('hello'), MESSAGES_LIMIT, ROOM_TTL,
+                      EVENTS_LIMIT]
+            ).execute())[0]
+            events = [event]
+        else:
+            events = (await RedisBatch(self.layer).script(
+                SHOT,
+                keys=[ROOM, EVENTS_KEY.format(ROOM), HISTORY_KEY.format(ROOM)],
+                args=[username, enemy, index, cell_id(index), ROOM_TTL,
+                      EVENTS_LIMIT]
+            ).execute())[0]
+
+        for event in events:
+            await self.layer.group_send(ROOM, json.loads(event))
+
+    async def engine_frame(self, username, enemy, chat, index):
+        if chat:
+            await self.engine.submit(ROOM, 'send_message', {
+                'username': username, 'message': 'hello'
+            })
+        else:
+            await self.engine.submit(ROOM, 'shot', {
+                'username': username, 'enemy': enemy, 'index': index,
+                'cell': cell_id(index)
+            })
@@ -0,0 +1,79 @@
+import itertools
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from master import board
+from ._bench import summary
+
+
+def reference_fleet(mask, counts=board.FLEET_COUNTS):
+    """
+    Прямолинейная проверка флота для сравнения: клетки собираются в
+    группы по соседству (в том числе по диагонали), каждая группа должна
+    быть отрезком строки или столбца, а длины групп - совпадать с counts.
+
+    A straightforward fleet check to compare against: the cells are
+    gathered into groups by adjacency (diagonals included), every group
+    must be a segment of a row or a column and the group lengths must
+    match counts.
+    """
+    cells = {(index % board.SIZE, index // board.SIZE)
+             for index in range(board.CELLS) if mask >> index & 1}
+    lengths = [0] * max(len(counts), board.SIZE + 1)
+
+    while cells:
+        group, stack = set(), [cells.pop()]
+
+        while stack:
+            x, y = stack.pop()
+            group.add((x, y))
+
+            for dx, dy in itertools.product((-1, 0, 1), repeat=2):
+                if (x + dx, y + dy) in cells:
+                    cells.remove((x + dx, y + dy))
+                    stack.append((x + dx, y + dy))
+        xs, ys = {x for x, _ in group}, {y for _, y in group}
+
+        if len(xs) > 1 and len(ys) > 1:
+            return False
+        span = xs if len(xs) > 1 else ys
+
+        if max(span) - min(span) + 1 != len(group):
+            return False
+        lengths[len(group)] += 1
+    return lengths == list(counts) + [0] * (len(lengths) - len(counts))
+
+
+class Command(BaseCommand):
+    help = ('Compares the speed of board.valid_fleet and of a '
+            'straightforward reference on legal fleets and on random '
+            'cells. Their agreement is checked by master/tests.py.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=20000,
+                            help='Validations timed per implementation.')
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        valid = [board.to_mask(board.random_fleet(rng)) for _ in range(100)]
+        invalid = [board.to_mask(rng.sample(
+            [board.cell_id(index) for index in range(board.CELLS)],
+            board.FLEET_SIZE
+        )) for _ in range(100)]
+
+        for name, validate in (('valid_fleet', board.valid_fleet),
+                               ('reference', reference_fleet)):
+            for kind, masks in (('legal', valid), ('random', invalid)):
+                latencies = []
+
+                for number in range(options['calls']):
+                    mask = masks[number % len(masks)]
+                    started = time.perf_counter()
+                    validate(mask)
+                    latencies.append(time.perf_counter() - started)
+                self.stdout.write('{:<11} {:<6} {}'.format(
+                    name, kind, summary(latencies)
+                ))
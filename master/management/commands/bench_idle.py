@@ -0,0 +1,169 @@
+import asyncio
+import gc
+import os
+import time
+
+from urllib.parse import urlencode
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from master import bots, heartbeat
+from ._bench import rss
+from ._loadtest import (GAME_PATH, InProcessClient, NetworkClient,
+                        forget_rooms, provision_users)
+
+
+class Command(BaseCommand):
+    help = ('Opens N connections that stay idle after the room state and '
+            'reports the server memory and the redis commands per idle '
+            'connection. Without --url the application runs in this '
+            'process, and the memory includes the in-process clients. The '
+            'clients do not answer pings, so a server given with --url '
+            'needs a HEARTBEAT_TIMEOUT longer than the run.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url',
+                            help='Server to connect to, e.g. '
+                                 'ws://127.0.0.1:8000 (requires websockets).')
+        parser.add_argument('--pid', type=int,
+                            help='Server process whose memory is sampled '
+                                 'with --url.')
+        parser.add_argument('--connections', default='10000,50000',
+                            help='Comma-separated connection counts.')
+        parser.add_argument('--idle', type=float, default=30.0,
+                            help='Seconds the connections stay idle while '
+                                 'redis commands are counted.')
+        parser.add_argument('--batch', type=int, default=500,
+                            help='Connections opened at once.')
+        parser.add_argument('--timeout', type=float, default=60.0)
+        parser.add_argument('--prefix', default='idle_')
+
+    def handle(self, *args, **options):
+        counts = [int(count) for count in options['connections'].split(',')]
+
+        if any(count % 2 for count in counts):
+            raise CommandError('--connections must be even.')
+
+        if options['url']:
+            try:
+                import websockets  # noqa: F401
+            except ImportError:
+                raise CommandError('--url requires the websockets package.')
+            self.pid = options['pid']
+
+            def client():
+                return NetworkClient(options['url'])
+        else:
+            from game.asgi import application
+            self.pid = os.getpid()
+
+            def client():
+                return InProcessClient(application)
+
+            # Ожидающий соперника игрок не должен получить бота.
+            # A player waiting for an enemy must not get a bot.
+            if bots.bot_engine is not None:
+                bots.bot_engine.wait = float('inf')
+
+            # Клиенты не отвечают на ping, но и не должны быть вытеснены.
+            # The clients do not answer pings, but must not be evicted
+            # either.
+            if heartbeat.heartbeat is not None:
+                heartbeat.heartbeat.timeout = float('inf')
+        users = provision_users(options['prefix'], max(counts))
+        asyncio.run(self.run(client, users, counts, options))
+
+    async def run(self, client, users, counts, options):
+        self.stdout.write(
+            '{:>11} {:>8} {:>12} {:>11} {:>17}'.format(
+                'connections', 'rss MB', 'KB/connection', 'redis ops/s',
+                'ops/connection/h'
+            )
+        )
+        await forget_rooms([username for username, _ in users])
+        # Процесс без соединений, но с запущенными фоновыми задачами.
+        # The process without connections, but with its background tasks
+        # running.
+        clients = await self.open(client, users[:2], options)
+        base_rss, base_rate = await self.sample(options)
+        await self.close(clients, options)
+
+        for count in counts:
+            await forget_rooms([username for username, _ in users[:count]])
+            gc.collect()
+            clients = await self.open(client, users[:count], options)
+            memory, rate = await self.sample(options)
+            self.stdout.write(
+                '{:>11} {:>8} {:>12} {:>11.2f} {:>17.3f}'.format(
+                    count, '-' if memory is None else '{:.1f}'.format(memory),
+                    '-' if memory is None or base_rss is None else
+                    '{:.2f}'.format((memory - base_rss) * 1024 / count),
+                    rate, (rate - base_rate) * 3600 / count
+                )
+            )
+            await self.close(clients, options)
+        await forget_rooms([username for username, _ in users])
+
+    async def open(self, client, users, options):
+        """
+        Открывает соединения пачками по --batch и ждёт кадр состояния
+        комнаты на каждом.
+
+        Opens the connections in batches of --batch and waits for the room
+        state frame on every one of them.
+        """
+        clients = []
+
+        async def connect(username, user_hash):
+            connection = client()
+            await connection.connect(GAME_PATH + '?' + urlencode({
+                'username': username, 'user_hash': user_hash
+            }), options['timeout'])
+            await connection.receive(options['timeout'])
+            return connection
+
+        for start in range(0, len(users), options['batch']):
+            clients.extend(await asyncio.gather(*[
+                connect(username, user_hash) for username, user_hash
+                in users[start:start + options['batch']]
+            ]))
+        return clients
+
+    async def close(self, clients, options):
+        for start in range(0, len(clients), options['batch']):
+            await asyncio.gather(*[
+                connection.close()
+                for connection in clients[start:start + options['batch']]
+            ], return_exceptions=True)
+        # Отключения дописываются в redis после закрытия.
+        # Disconnects reach redis after the close.
+        await asyncio.sleep(1)
+
+    async def sample(self, options):
+        """
+        Память сервера и число команд redis в секунду на всех шардах за
+        --idle секунд простоя (без команд самого замера).
+
+        The server memory and the redis commands per second on all the
+        shards over --idle seconds of idling (without the commands of the
+        measurement itself).
+        """
+        before = await self.commands()
+        started = time.monotonic()
+        await asyncio.sleep(options['idle'])
+        commands = await self.commands() - before
+        elapsed = time.monotonic() - started
+        ring_size = get_channel_layer().ring_size
+        return (rss(self.pid) if self.pid else None,
+                max(0, commands - ring_size) / elapsed)
+
+    async def commands(self):
+        channel_layer = get_channel_layer()
+        total = 0
+
+        for index in range(channel_layer.ring_size):
+            async with channel_layer.connection(index) as connection:
+                info = await connection.info('stats')
+                total += int(info['stats']['total_commands_processed'])
+        return total
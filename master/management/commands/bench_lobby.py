@@ -0,0 +1,211 @@
+import asyncio
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from master.lobby import Lobby
+from master.reader import ChannelReader
+from ._bench import add_redis_arguments, channel_layer, connect_redis
+
+
+class Subscriber:
+    """
+    Подписчик лобби бенчмарка: вместо ASGI send считает кадры, байты и
+    пользователей, о подключении которых узнал.
+
+    A benchmark lobby subscriber: instead of an ASGI send counts the
+    frames, the bytes and the users whose connection it has learned of.
+    """
+
+    binary = False
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+        self.joined = 0
+
+    async def base_send(self, message):
+        self.frames += 1
+        self.bytes += len(message['text'])
+
+    def received(self, frame):
+        self.joined += len(frame.get('joined', ()))
+
+
+class TimedLobby(Lobby):
+    """
+    Лобби, которое считает время своих рассылок и полученные сообщения
+    группы.
+
+    A lobby counting the time of its broadcasts and the group messages it
+    has received.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.busy = 0.0
+        self.messages = 0
+
+    async def tick(self, now=None):
+        started = time.perf_counter()
+        await super().tick(now)
+        self.busy += time.perf_counter() - started
+
+    async def dispatch(self, message):
+        self.messages += 1
+        await super().dispatch(message)
+
+    def diff(self, opened, closed):
+        frame = super().diff(opened, closed)
+
+        if frame is not None:
+            for subscriber in self.subscribers:
+                subscriber.received(frame)
+        return frame
+
+
+class Fanout:
+    """
+    Рассылка без объединения: каждое подключение - отдельное сообщение
+    группы и отдельный кадр каждому подписчику.
+
+    Broadcasting without coalescing: every connection is a group message
+    of its own and a frame of its own to every subscriber.
+    """
+
+    def __init__(self, subscribers, expected):
+        self.subscribers = subscribers
+        self.expected = expected
+        self.received = 0
+        self.done = asyncio.get_event_loop().create_future()
+
+    async def dispatch(self, message):
+        text = json.dumps({'context': 'lobby_diff',
+                           'joined': message['joined'], 'left': [],
+                           'opened': {}, 'closed': []})
+
+        for subscriber in self.subscribers:
+            await subscriber.base_send({'type': 'websocket.send',
+                                        'text': text})
+            subscriber.joined += 1
+        self.received += 1
+
+        if self.received == self.expected and not self.done.done():
+            self.done.set_result(None)
+
+
+class Command(BaseCommand):
+    help = ('Connects N users at once and measures what it costs to tell S '
+            'lobby subscribers about them: broadcast time, group messages, '
+            'frames and bytes per subscriber, with coalesced diffs and, up '
+            'to --fanout-limit users, with one event per connection.')
+
+    def add_arguments(self, parser):
+        add_redis_arguments(parser)
+        parser.add_argument('--users', default='100,1000,10000,50000',
+                            help='Comma-separated user counts.')
+        parser.add_argument('--subscribers', type=int, default=100)
+        parser.add_argument('--rate', type=float, default=2.0,
+                            help='Lobby broadcasts per second.')
+        parser.add_argument('--fanout-limit', type=int, default=10000,
+                            help='Largest user count measured with one '
+                                 'event per connection.')
+        parser.add_argument('--timeout', type=float, default=120.0)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        connection = await connect_redis(options)
+        # Без объединения в очереди канала процесса копится по сообщению
+        # на пользователя.
+        # Without coalescing the process channel queue holds a message per
+        # user.
+        self.layer = channel_layer(options, capacity=max(
+            int(count) for count in options['users'].split(',')
+        ) + 100)
+        self.stdout.write('{} subscribers, {:g} broadcasts/s'.format(
+            options['subscribers'], options['rate']
+        ))
+
+        try:
+            for count in map(int, options['users'].split(',')):
+                self.stdout.write('{:>6} users, coalesced: {}'.format(
+                    count, await self.coalesced(count, options)
+                ))
+                await connection.flushdb()
+
+                if count <= options['fanout_limit']:
+                    self.stdout.write('{:>6} users, per event: {}'.format(
+                        count, await self.per_event(count, options)
+                    ))
+                    await connection.flushdb()
+        finally:
+            await self.layer.flush()
+            await connection.flushdb()
+            connection.close()
+            await connection.wait_closed()
+
+    async def coalesced(self, count, options):
+        reader = ChannelReader(channel_layer=self.layer, prefix='bench')
+        lobby = TimedLobby(channel_layer=self.layer, reader=reader,
+                           interval=1 / options['rate'], heartbeat=3600,
+                           ttl=3600)
+        subscribers = [Subscriber() for _ in range(options['subscribers'])]
+
+        try:
+            for subscriber in subscribers:
+                lobby.subscribe(subscriber)
+
+            while lobby.joining:
+                await asyncio.sleep(lobby.interval / 10)
+            lobby.busy, lobby.messages = 0.0, 0
+            frames, size = subscribers[0].frames, subscribers[0].bytes
+            started = time.perf_counter()
+
+            for number in range(count):
+                lobby.connect('lobby_{}'.format(number))
+            await asyncio.wait_for(self.settled(subscribers[0], count),
+                                   options['timeout'])
+            elapsed = time.perf_counter() - started
+        finally:
+            await lobby.stop()
+            await reader.stop()
+        return self.report(elapsed, lobby.busy, lobby.messages,
+                           subscribers[0].frames - frames,
+                           subscribers[0].bytes - size)
+
+    async def per_event(self, count, options):
+        reader = ChannelReader(channel_layer=self.layer, prefix='bench')
+        subscribers = [Subscriber() for _ in range(options['subscribers'])]
+        fanout = Fanout(subscribers, count)
+        channel = reader.add(fanout, 'fanout')
+        await self.layer.group_add('bench_lobby', channel)
+
+        try:
+            started = time.perf_counter()
+
+            for number in range(count):
+                await self.layer.group_send('bench_lobby', {
+                    'type': 'lobby.presence',
+                    'joined': ['lobby_{}'.format(number)], 'left': []
+                })
+            await asyncio.wait_for(fanout.done, options['timeout'])
+            elapsed = time.perf_counter() - started
+        finally:
+            await reader.stop()
+        return self.report(elapsed, elapsed, count, subscribers[0].frames,
+                           subscribers[0].bytes)
+
+    @staticmethod
+    async def settled(subscriber, count):
+        while subscriber.joined < count:
+            await asyncio.sleep(0.01)
+
+    @staticmethod
+    def report(elapsed, busy, messages, frames, size):
+        return ('settled in {:.2f}s, busy {:.1f}ms, {} group messages, '
+                '{} frames and {:.1f} KB per subscriber'.format(
+                    elapsed, busy * 1000, messages, frames, size / 1024
+                ))
@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+
+from master.matchmaking import Matchmaker
+from ._bench import (add_redis_arguments, channel_layer, connect_redis,
+                     summary)
+
+
+class Command(BaseCommand):
+    help = ('Compares connect-time room lookup of the old KEYS * scan '
+            'with the indexed matchmaking queue.')
+
+    def add_arguments(self, parser):
+        add_redis_arguments(parser)
+        parser.add_argument('--rooms', type=int, default=10000,
+                            help='Number of live full rooms to create.')
+        parser.add_argument('--connects', type=int, default=200,
+                            help='Number of simulated connections.')
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        connection = await connect_redis(options)
+        self.matchmaker = Matchmaker(channel_layer(options))
+
+        try:
+            await self.populate(connection, options['rooms'])
+            self.stdout.write('{} full rooms, {} keys'.format(
+                options['rooms'], await connection.dbsize()
+            ))
+            legacy = await self.measure(self.legacy_connect, connection,
+                                        options['connects'])
+            self.stdout.write('KEYS * scan:   ' + summary(legacy))
+            indexed = await self.measure(self.indexed_connect, connection,
+                                         options['connects'])
+            self.stdout.write('indexed queue: ' + summary(indexed))
+        finally:
+            await connection.flushdb()
+            connection.close()
+            await connection.wait_closed()
+
+    async def populate(self, connection, rooms):
+        pipeline = connection.pipeline()
+
+        for number in range(rooms):
+            room = 'bench_room_{}'.format(number)
+            pipeline.zadd('asgi:group:' + room, time.time(),
+                          'member_{}.x!a'.format(number))
+            pipeline.zadd('asgi:group:' + room, time.time(),
+                          'guest_{}.x!b'.format(number))
+            pipeline.hmset_dict(room, {
+                'room_member': 'member_{}'.format(number),
+                'room_guest': 'guest_{}'.format(number),
+                'messages': '[]'
+            })
+        await pipeline.execute()
+
+    async def measure(self, connect, connection, connects):
+        latencies = []
+
+        for number in range(connects):
+            started = time.perf_counter()
+            await connect(connection, 'user_{}'.format(number))
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def legacy_connect(self, connection, username):
+        """
+        Повторяет старый поиск комнаты: KEYS * и ZRANGE каждой группы.
+
+        Replays the old room lookup: KEYS * and a ZRANGE for every group.
+        """
+        keys = [x.decode('utf8') for x in await connection.keys('*')]
+
+        for key in keys:
+            if key.startswith('asgi:group:'):
+                members = await connection.zrange(key, 0, -1)
+
+                if len(members) == 1:
+                    return key
+
+    async def indexed_connect(self, connection, username):
+        room = await self.matchmaker.find_user_room(username)
+
+        if room is None:
+            room, _ = await self.matchmaker.match_room(username)
+        return room
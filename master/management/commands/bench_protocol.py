@@ -0,0 +1,83 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from master import protocol
+from master.events import client_frame
+
+
+# Типичные кадры игры: события группы и кадры клиента.
+# Typical game frames: group events and client frames.
+EVENTS = {
+    'action': {'type': 'action', 'action_type': 'hit',
+               'params': 'load_17,cell_F7', 'version': 42},
+    'message': {'type': 'chat_message', 'version': 43,
+                'message': {'id': '12', 'sender': 'load_17',
+                            'message': 'shot cell_F8'}},
+    'notification': {'type': 'notification', 'message': 'start_game',
+                     'version': 1},
+}
+REQUESTS = {
+    'shot': {'context': 'shot', 'cell': 'cell_F7'},
+    'send_message': {'context': 'send_message', 'message': 'shot cell_F8'},
+    'player_ready': {'context': 'player_ready',
+                     'selected_cells': ['cell_A1', 'cell_A2', 'cell_A3',
+                                        'cell_A4', 'cell_C1', 'cell_D1',
+                                        'cell_E1', 'cell_J1', 'cell_J2',
+                                        'cell_J3', 'cell_G5', 'cell_H5',
+                                        'cell_A7', 'cell_B7', 'cell_D9',
+                                        'cell_E9', 'cell_G9', 'cell_J9',
+                                        'cell_J7', 'cell_F3']},
+}
+
+
+class Command(BaseCommand):
+    help = ('Compares the size and the encode/decode time per frame of the '
+            'JSON frames with the binary msgpack subprotocol.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--frames', type=int, default=100000)
+
+    def handle(self, *args, **options):
+        frames = options['frames']
+        self.stdout.write('{:<22} {:>7} {:>12} {:>12}'.format(
+            'frame', 'bytes', 'encode us', 'decode us'
+        ))
+
+        for name, event in EVENTS.items():
+            self.report(name, 'json', frames,
+                        lambda: json.dumps(client_frame(event)), json.loads)
+            self.report(name, 'msgpack', frames,
+                        lambda: protocol.encode(client_frame(event)),
+                        protocol.decode)
+
+        for name, frame in REQUESTS.items():
+            self.report(name, 'json', frames, lambda: json.dumps(frame),
+                        json.loads)
+            self.report(name, 'msgpack', frames,
+                        lambda: protocol.encode_request(frame),
+                        protocol.decode_request)
+
+    def report(self, name, encoding, frames, encode, decode):
+        """
+        Кодирует кадр на сервере (для событий - вместе с client_frame) и
+        разбирает его на другой стороне frames раз.
+
+        Encodes a frame on the server (for events - together with
+        client_frame) and decodes it on the other side frames times.
+        """
+        started = time.perf_counter()
+
+        for _ in range(frames):
+            data = encode()
+        encoded = time.perf_counter()
+
+        for _ in range(frames):
+            decode(data)
+        decoded = time.perf_counter()
+        self.stdout.write('{:<22} {:>7} {:>12.2f} {:>12.2f}'.format(
+            name + ' ' + encoding, len(data),
+            (encoded - started) / frames * 1e6,
+            (decoded - encoded) / frames * 1e6
+        ))
@@ -0,0 +1,113 @@
+import asyncio
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from master.matchmaking import Matchmaker, OPEN_ROOMS_KEY, touch
+from master.reaper import GROUP_KEY, RoomReaper
+from ._bench import (add_redis_arguments, channel_layer, connect_redis,
+                     percentile)
+
+
+class Command(BaseCommand):
+    help = ('Simulates player churn (players that close the tab without '
+            'leaving the room) and compares the redis keyspace size, the '
+            'open rooms queue and matchmaking with and without the room '
+            'reaper.')
+
+    def add_arguments(self, parser):
+        add_redis_arguments(parser)
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--players', type=int, default=500,
+                            help='New players per round.')
+        parser.add_argument('--abandon', type=float, default=0.3,
+                            help='Share of players that leave right after '
+                                 'connecting.')
+        parser.add_argument('--grace', type=float, default=120)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        connection = await connect_redis(options)
+        self.layer = channel_layer(options)
+        self.matchmaker = Matchmaker(self.layer)
+        self.stdout.write('{:<8} {:>5} {:>7} {:>10} {:>12} {:>12} {:>8}'
+                          .format('reaper', 'round', 'keys', 'open rooms',
+                                  'dead matches', 'match p50 ms', 'reap ms'))
+
+        try:
+            for enabled in (False, True):
+                await connection.flushdb()
+                reaper = RoomReaper(self.layer, grace=options['grace'])
+                random.seed(options['seed'])
+
+                for number in range(options['rounds']):
+                    dead, latencies = await self.play_round(number, options)
+                    started = time.perf_counter()
+
+                    if enabled:
+                        await reaper.reap(now=time.time() + options['grace'],
+                                          lock=False)
+                    reaped = time.perf_counter() - started
+                    self.stdout.write(
+                        '{:<8} {:>5} {:>7} {:>10} {:>12} {:>12.3f} {:>8.1f}'
+                        .format(
+                            'on' if enabled else 'off', number + 1,
+                            await connection.dbsize(),
+                            await connection.zcard(OPEN_ROOMS_KEY), dead,
+                            percentile(latencies, 50) * 1000, reaped * 1000
+                        ))
+        finally:
+            await connection.flushdb()
+            connection.close()
+            await connection.wait_closed()
+
+    async def play_round(self, number, options):
+        """
+        Игроки подключаются по очереди, часть из них сразу закрывает
+        вкладку. В конце раунда отключаются все. Возвращает число
+        подборов в комнату, создатель которой уже ушёл, и задержки
+        подбора.
+
+        Players connect one by one, some of them close the tab right away.
+        At the end of the round everyone disconnects. Returns the number
+        of matches into a room whose creator has already left, and the
+        matchmaking latencies.
+        """
+        connected = []
+        latencies = []
+        dead = 0
+
+        for player in range(options['players']):
+            username = 'churn_{}_{}'.format(number, player)
+            channel = username + '.bench!'
+            started = time.perf_counter()
+            room = await self.matchmaker.find_user_room(username)
+            created = False
+
+            if room is None:
+                room, created = await self.matchmaker.match_room(username)
+            latencies.append(time.perf_counter() - started)
+            members = (await self.matchmaker.batch(room).zcard(
+                GROUP_KEY.format(room)
+            ).execute())[0]
+
+            if not created and not members:
+                dead += 1
+            await self.layer.group_add(room, channel)
+
+            if random.random() < options['abandon']:
+                await self.leave(room, channel)
+            else:
+                connected.append((room, channel))
+
+        for room, channel in connected:
+            await self.leave(room, channel)
+        return dead, latencies
+
+    async def leave(self, room, channel):
+        await self.layer.group_discard(room, channel)
+        await touch(self.matchmaker.batch(room), room).execute()
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from master.board import FLEET_SIZE, SHIPS, cell_index, encode, to_mask
+from master.events import EVENTS_KEY, EVENTS_LIMIT, HISTORY_KEY
+from master.matchmaking import ROOM_TTL
+from master.scripts import SHOT
+from ._bench import add_redis_arguments, connect_redis, summary
+
+
+ROOM = 'bench_room'
+CELLS = ['cell_{}{}'.format(x, y) for y in range(1, 11) for x in 'ABCDEFGHIJ']
+
+
+class Command(BaseCommand):
+    help = ('Compares per-shot latency of the old multi-command path with '
+            'the single Lua script.')
+
+    def add_arguments(self, parser):
+        add_redis_arguments(parser)
+        parser.add_argument('--shots', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options))
+
+    async def run(self, options):
+        connection = await connect_redis(options)
+
+        try:
+            legacy = await self.measure(self.legacy_shot, connection,
+                                        options['shots'])
+            self.stdout.write('multi-command: ' + summary(legacy))
+            scripted = await self.measure(self.scripted_shot, connection,
+                                          options['shots'])
+            self.stdout.write('lua script:    ' + summary(scripted))
+        finally:
+            await connection.flushdb()
+            connection.close()
+            await connection.wait_closed()
+
+    async def reset_room(self, connection, shot):
+        ships = random.sample(CELLS, FLEET_SIZE)
+        state = {'room_member': 'alice', 'room_guest': 'bob'}
+
+        for username in ('alice', 'bob'):
+            if shot == self.legacy_shot:
+                state[username + ':selected_cells'] = json.dumps(ships)
+            else:
+                state[username + SHIPS] = encode(to_mask(ships))
+        await connection.delete(ROOM)
+        await connection.hmset_dict(ROOM, state)
+
+    async def measure(self, shot, connection, shots):
+        latencies = []
+        random.seed(0)
+
+        for number in range(shots):
+            if number % 100 == 0:
+                await self.reset_room(connection, shot)
+                cells = iter(random.sample(CELLS, len(CELLS)))
+            username, enemy = ('alice', 'bob') if number % 2 else ('bob',
+                                                                   'alice')
+            cell = next(cells)
+            started = time.perf_counter()
+            await shot(connection, username, enemy, cell)
+            latencies.append(time.perf_counter() - started)
+        return latencies
+
+    async def legacy_shot(self, connection, username, enemy, cell):
+        """
+        Повторяет старый путь: HGETALL, разбор JSON и отдельные пары
+        HSET/EXPIRE на каждое поле.
+
+        Replays the old path: HGETALL, JSON decoding and a separate
+        HSET/EXPIRE pair per field.
+        """
+        data = {k.decode('utf8'): v.decode('utf8')
+                for k, v in (await connection.hgetall(ROOM)).items()}
+        selected_cells = json.loads(data.get(enemy + ':selected_cells', '[]'))
+        dead_cells = json.loads(data.get(enemy + ':dead_cells', '[]'))
+        miss_cells = json.loads(data.get(username + ':miss_cells', '[]'))
+
+        if len(dead_cells) >= FLEET_SIZE:
+            return
+        if cell in selected_cells:
+            dead_cells.append(cell)
+            fields = [(enemy + ':dead_cells', json.dumps(dead_cells)),
+                      (username + ':hit_cells', json.dumps(dead_cells))]
+        else:
+            miss_cells.append(cell)
+            fields = [(username + ':miss_cells', json.dumps(miss_cells))]
+        fields += [(username + ':access_to_shot', 'false'),
+                   (enemy + ':access_to_shot', 'true')]
+
+        for field, value in fields:
+            await connection.hset(ROOM, field, value)
+            await connection.expire(ROOM, ROOM_TTL)
+
+    async def scripted_shot(self, connection, username, enemy, cell):
+        await SHOT(connection, keys=[ROOM, EVENTS_KEY.format(ROOM),
+                                     HISTORY_KEY.format(ROOM)],
+                   args=[username, enemy, cell_index(cell), cell, ROOM_TTL,
+                         EVENTS_LIMIT])
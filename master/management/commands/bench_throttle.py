@@ -0,0 +1,103 @@
+import asyncio
+import random
+
+from contextlib import suppress
+
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+
+from master.metrics import THROTTLED_FRAMES
+from master.throttle import frame_throttle
+from ._loadtest import (CELLS, GAME_PATH, InProcessClient, LoadTest,
+                        forget_rooms, provision_users)
+
+
+class Command(BaseCommand):
+    help = ('Plays well-behaved games next to abusive clients that flood '
+            'their own rooms with shots and chat messages, with the frame '
+            'rate limits off and on, and reports the latency of the '
+            'well-behaved rooms.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Well-behaved players (must be even).')
+        parser.add_argument('--abusers', type=int, default=4,
+                            help='Abusive players (must be even).')
+        parser.add_argument('--abuse-rate', type=float, default=200,
+                            help='Frames per second of every abuser.')
+        parser.add_argument('--think-time', type=float, default=0.05)
+        parser.add_argument('--chat-rate', type=float, default=0.1,
+                            help='Chance of a chat message per turn of a '
+                                 'well-behaved player. Chat goes through '
+                                 'the same reader as the shots, so a run '
+                                 'without it hides delivery stalls.')
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] % 2 or options['abusers'] % 2:
+            raise CommandError('--concurrency and --abusers must be even.')
+        from game.asgi import application
+
+        self.application = application
+        users = provision_users('throttle_', options['concurrency'])
+        abusers = provision_users('abuse_', options['abusers'])
+        rates = (frame_throttle.connection_rates, frame_throttle.room_rates)
+
+        for name, limits in (('limits off', ({}, {})), ('limits on', rates)):
+            frame_throttle.connection_rates, frame_throttle.room_rates = limits
+            THROTTLED_FRAMES.values.clear()
+            stats = asyncio.run(self.run(users, abusers, options))
+            self.stdout.write('{}: {} frames throttled\n{}\n'.format(
+                name, int(sum(THROTTLED_FRAMES.values.values())),
+                stats.report()
+            ))
+
+    async def run(self, users, abusers, options):
+        await forget_rooms([username for username, _ in abusers])
+        clients = []
+
+        # Нарушители подключаются парами до остальных и попадают в
+        # комнаты друг к другу.
+        # Abusers connect in pairs before everyone else and end up in
+        # each other's rooms.
+        for username, user_hash in abusers:
+            client = InProcessClient(self.application)
+            await client.connect(GAME_PATH + '?' + urlencode({
+                'username': username, 'user_hash': user_hash
+            }), options['timeout'])
+            clients.append(client)
+        floods = [asyncio.ensure_future(self.flood(client, options))
+                  for client in clients]
+
+        try:
+            return await LoadTest(
+                lambda: InProcessClient(self.application), users,
+                think_time=options['think_time'],
+                chat_rate=options['chat_rate'], timeout=options['timeout']
+            ).run()
+        finally:
+            for flood in floods:
+                flood.cancel()
+            await asyncio.gather(*floods, return_exceptions=True)
+
+            # Приложение нарушителя могло уже завершиться с ошибкой.
+            # An abuser's application may have failed already.
+            for client in clients:
+                with suppress(Exception):
+                    await client.send({'context': 'exit_room'})
+                    await client.close()
+
+    async def flood(self, client, options):
+        """
+        Шлёт выстрелы и сообщения чата, не читая ответов.
+
+        Sends shots and chat messages without reading the replies.
+        """
+        pause = 2 / options['abuse_rate']
+
+        while True:
+            await client.send({'context': 'send_message', 'message': 'spam'})
+            await client.send({'context': 'shot',
+                               'cell': random.choice(CELLS)})
+            await asyncio.sleep(pause)
@@ -0,0 +1,124 @@
+import asyncio
+import multiprocessing
+import socket
+import subprocess
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from ._loadtest import LoadTest, NetworkClient, provision_users
+
+
+def run_load(url, users, **options):
+    """
+    Нагрузочный тест одного процесса-генератора против одного воркера.
+
+    The load test of one generator process against one worker.
+    """
+    stats = asyncio.run(LoadTest(lambda: NetworkClient(url), users,
+                                 **options).run())
+    return stats, time.perf_counter() - stats.started
+
+
+class Command(BaseCommand):
+    help = ('Measures connection and message throughput of 1..N daphne '
+            'workers on this machine. Every worker gets its own load '
+            'generator process; players of one room usually land on '
+            'different workers.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Largest number of workers to measure.')
+        parser.add_argument('--port', type=int, default=8100,
+                            help='Port of the first worker.')
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help='Players per worker (must be even).')
+        parser.add_argument('--games', type=int, default=1)
+        parser.add_argument('--think-time', type=float, default=0.0)
+        parser.add_argument('--chat-rate', type=float, default=0.0)
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] % 2:
+            raise CommandError('--concurrency must be even.')
+
+        try:
+            import websockets  # noqa: F401
+        except ImportError:
+            raise CommandError('bench_workers requires the websockets '
+                               'package.')
+        users = [provision_users('bench_w{}_'.format(worker),
+                                 options['concurrency'])
+                 for worker in range(options['workers'])]
+        # Соединения с базой не должны переходить в дочерние процессы.
+        # Database connections must not be inherited by child processes.
+        connections.close_all()
+        baseline = None
+        self.stdout.write('{:>7} {:>8} {:>10} {:>12} {:>9} {:>7}'.format(
+            'workers', 'players', 'conn/s', 'messages/s', 'speedup', 'errors'
+        ))
+
+        for count in range(1, options['workers'] + 1):
+            ports = [options['port'] + worker for worker in range(count)]
+            workers = self.start_workers(ports)
+
+            try:
+                results = self.run_load(ports, users[:count], options)
+            finally:
+                for worker in workers:
+                    worker.terminate()
+
+                for worker in workers:
+                    worker.wait()
+            elapsed = max(elapsed for _, elapsed in results)
+            messages = sum(len(latencies) for stats, _ in results
+                           for latencies in stats.latencies.values())
+            throughput = messages / elapsed
+            baseline = baseline or throughput
+            self.stdout.write('{:>7} {:>8} {:>10.1f} {:>12.1f} {:>8.2f}x '
+                              '{:>7}'.format(
+                                  count, count * options['concurrency'],
+                                  sum(stats.connections
+                                      for stats, _ in results) / elapsed,
+                                  throughput, throughput / baseline,
+                                  sum(sum(stats.errors.values())
+                                      for stats, _ in results)
+                              ))
+
+    def start_workers(self, ports):
+        workers = [subprocess.Popen(
+            [sys.executable, '-m', 'daphne', '-p', str(port),
+             '{}:{}'.format(*settings.ASGI_APPLICATION.rsplit('.', 1))],
+            cwd=settings.BASE_DIR, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        ) for port in ports]
+        deadline = time.monotonic() + 30
+
+        for port in ports:
+            while True:
+                try:
+                    socket.create_connection(('127.0.0.1', port), 1).close()
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise CommandError('Worker on port {} did not start.'
+                                           .format(port))
+                    time.sleep(0.1)
+        return workers
+
+    def run_load(self, ports, users, options):
+        context = multiprocessing.get_context('fork')
+
+        with ProcessPoolExecutor(len(ports), mp_context=context) as pool:
+            futures = [pool.submit(run_load, 'ws://127.0.0.1:{}'.format(port),
+                                   worker_users, games=options['games'],
+                                   think_time=options['think_time'],
+                                   chat_rate=options['chat_rate'],
+                                   timeout=options['timeout'])
+                       for port, worker_users in zip(ports, users)]
+            return [future.result() for future in futures]
@@ -0,0 +1,73 @@
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ._loadtest import (LoadTest, NetworkClient, InProcessClient,
+                        provision_users)
+
+
+class Command(BaseCommand):
+    help = ('Simulates concurrent game sessions over WebSockets and reports '
+            'p50/p99 latency per message context and connections per second. '
+            'Without --url the ASGI application runs in this process.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url',
+                            help='Server to connect to, e.g. '
+                                 'ws://127.0.0.1:8000 (requires websockets).')
+        parser.add_argument('--concurrency', type=int, default=100,
+                            help='Number of simultaneously playing users.')
+        parser.add_argument('--games', type=int, default=1,
+                            help='Games played by every user in a row.')
+        parser.add_argument('--think-time', type=float, default=0.0,
+                            help='Mean pause in seconds before every move.')
+        parser.add_argument('--reconnect-rate', type=float, default=0.0,
+                            help='Probability to reconnect before a move.')
+        parser.add_argument('--chat-rate', type=float, default=0.1,
+                            help='Probability to send a chat message '
+                                 'before a move.')
+        parser.add_argument('--timeout', type=float, default=30.0,
+                            help='Seconds to wait for a server frame.')
+        parser.add_argument('--binary', action='store_true',
+                            help='Use the binary msgpack subprotocol '
+                                 'instead of JSON.')
+        parser.add_argument('--bots', action='store_true',
+                            help='Choose shots with the bot planner '
+                                 '(master/bots.py, requires numpy) instead '
+                                 'of at random.')
+        parser.add_argument('--prefix', default='load_',
+                            help='Username prefix of the load test users.')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] % 2:
+            raise CommandError('--concurrency must be even.')
+
+        if options['bots']:
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                raise CommandError('--bots requires the numpy package.')
+
+        if options['url']:
+            try:
+                import websockets  # noqa: F401
+            except ImportError:
+                raise CommandError('--url requires the websockets package.')
+
+            def client():
+                return NetworkClient(options['url'], options['binary'])
+        else:
+            from game.asgi import application
+
+            def client():
+                return InProcessClient(application, options['binary'])
+
+        users = provision_users(options['prefix'], options['concurrency'])
+        stats = asyncio.run(LoadTest(
+            client, users, games=options['games'],
+            think_time=options['think_time'],
+            reconnect_rate=options['reconnect_rate'],
+            chat_rate=options['chat_rate'], timeout=options['timeout'],
+            bots=options['bots']
+        ).run())
+        self.stdout.write(stats.report())
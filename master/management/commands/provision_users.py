@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ._loadtest import provision_users
+
+
+class Command(BaseCommand):
+    help = ('Creates the load test users <prefix>0..<prefix>N-1 in batches '
+            '(the password is the prefix), e.g. before running load '
+            'generators on several machines against one database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prefix', default='load_')
+        parser.add_argument('--count', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        users = provision_users(options['prefix'], options['count'])
+        self.stdout.write('{} users {}0..{}{} ready.'.format(
+            len(users), options['prefix'], options['prefix'],
+            options['count'] - 1
+        ))
@@ -0,0 +1,30 @@
+import asyncio
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from master.reaper import RoomReaper
+
+
+class Command(BaseCommand):
+    help = ('Runs one pass of the room reaper over all the shards, e.g. from '
+            'cron when the workers run with REAPER_INTERVAL=0.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=float,
+                            default=settings.REAPER_GRACE)
+        parser.add_argument('--idle-ttl', type=float,
+                            default=settings.REAPER_IDLE_TTL)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        reaper = RoomReaper(channel_layers.make_backend(DEFAULT_CHANNEL_LAYER),
+                            grace=options['grace'],
+                            idle_ttl=options['idle_ttl'],
+                            batch_size=options['batch_size'])
+        reaped = asyncio.run(reaper.reap(lock=False))
+        self.stdout.write('Reaped {} rooms, {} rooms live.'.format(
+            reaped, sum(reaper.live.values())
+        ))
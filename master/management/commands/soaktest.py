@@ -0,0 +1,231 @@
+import asyncio
+import os
+import time
+
+from channels.layers import get_channel_layer
+from django.core.management.base import BaseCommand, CommandError
+
+from master import heartbeat, reaper
+from master.metrics import CONNECTIONS, EVICTED_CONNECTIONS
+from ._bench import rss
+from ._loadtest import (InProcessClient, LoadTest, NetworkClient, Player,
+                        forget_rooms, provision_users)
+
+
+class SoakPlayer(Player):
+    """
+    Игрок, который с вероятностью abandon_rate перед ходом пропадает:
+    перестаёт отвечать, в том числе на ping, и не закрывает соединение,
+    пока его не закроет сервер.
+
+    A player that vanishes before a move with probability abandon_rate:
+    stops answering, pings included, and does not close the connection
+    until the server closes it.
+    """
+
+    async def play(self):
+        try:
+            await super().play()
+        except ConnectionError:
+            # Сервер закрыл соединение игрока, чей соперник пропал.
+            # The server closed the connection of a player whose enemy
+            # vanished.
+            self.load.stats.counts['closed by server'] += 1
+            await forget_rooms([self.username])
+
+    async def take_turn(self):
+        if self.rng.random() >= self.load.abandon_rate:
+            await super().take_turn()
+            return
+        self.my_turn = False
+        self.finished = True
+        self.load.stats.counts['players vanished'] += 1
+        started = time.perf_counter()
+
+        try:
+            while True:
+                await self.client.receive(self.load.eviction_timeout)
+        except ConnectionError:
+            self.load.stats.record('evicted', time.perf_counter() - started)
+        except asyncio.TimeoutError:
+            self.load.stats.errors['not evicted'] += 1
+        # Сервер закрыл соединение; следующая игра начинается с подбора.
+        # The server closed the connection; the next game starts with
+        # matchmaking.
+        await forget_rooms([self.username])
+
+
+class SoakTest(LoadTest):
+
+    player = SoakPlayer
+
+    def __init__(self, *args, abandon_rate=0.0, eviction_timeout=60.0,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.abandon_rate = abandon_rate
+        self.eviction_timeout = eviction_timeout
+
+
+class Command(BaseCommand):
+    help = ('Keeps players churning for a long time: playing, reconnecting '
+            'and vanishing without closing their connections. Every '
+            '--sample-interval seconds reports the server memory, open '
+            'connections, redis keys and group members, and at the end '
+            'their drift per hour, which stays near zero when stale '
+            'connections and rooms are cleaned up. Without --url the '
+            'application runs in this process with shortened heartbeat and '
+            'reaper timings.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url',
+                            help='Server to connect to, e.g. '
+                                 'ws://127.0.0.1:8000 (requires websockets).')
+        parser.add_argument('--pid', type=int,
+                            help='Server process whose memory is sampled '
+                                 'with --url.')
+        parser.add_argument('--duration', type=float, default=3600.0)
+        parser.add_argument('--sample-interval', type=float, default=60.0)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--think-time', type=float, default=0.2)
+        parser.add_argument('--reconnect-rate', type=float, default=0.05)
+        parser.add_argument('--abandon-rate', type=float, default=0.01,
+                            help='Probability to vanish before a move.')
+        parser.add_argument('--heartbeat-interval', type=float, default=1.0)
+        parser.add_argument('--heartbeat-timeout', type=float, default=3.0)
+        parser.add_argument('--idle-timeout', type=float, default=30.0)
+        parser.add_argument('--reaper-grace', type=float, default=10.0)
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def handle(self, *args, **options):
+        if options['concurrency'] % 2:
+            raise CommandError('--concurrency must be even.')
+
+        if options['url']:
+            try:
+                import websockets  # noqa: F401
+            except ImportError:
+                raise CommandError('--url requires the websockets package.')
+            self.pid = options['pid']
+
+            def client():
+                return NetworkClient(options['url'])
+        else:
+            from game.asgi import application
+            self.pid = os.getpid()
+
+            def client():
+                return InProcessClient(application)
+
+            if heartbeat.heartbeat is None:
+                raise CommandError('The heartbeat is disabled '
+                                   '(HEARTBEAT_INTERVAL=0).')
+            # Те же проверки, что на сервере, только в масштабе минут.
+            # The same checks as on the server, only on a scale of minutes.
+            heartbeat.heartbeat.interval = options['heartbeat_interval']
+            heartbeat.heartbeat.timeout = options['heartbeat_timeout']
+            heartbeat.heartbeat.idle_timeout = options['idle_timeout']
+
+            if reaper.room_reaper is not None:
+                reaper.room_reaper.interval = options['heartbeat_interval']
+                reaper.room_reaper.grace = options['reaper_grace']
+                reaper.room_reaper.idle_ttl = 3 * options['idle_timeout']
+        users = provision_users('soak_', options['concurrency'])
+        asyncio.run(self.run(client, users, options))
+
+    async def run(self, client, users, options):
+        soak = SoakTest(
+            client, users, think_time=options['think_time'],
+            reconnect_rate=options['reconnect_rate'],
+            timeout=options['timeout'], duration=options['duration'],
+            abandon_rate=options['abandon_rate'],
+            eviction_timeout=2 * options['timeout']
+        )
+        self.stdout.write(
+            '{:>8} {:>8} {:>11} {:>10} {:>13} {:>7} {:>8}'.format(
+                'seconds', 'rss MB', 'connections', 'redis keys',
+                'group members', 'games', 'evicted'
+            )
+        )
+        started = time.monotonic()
+        samples = []
+        load = asyncio.ensure_future(soak.run())
+
+        while True:
+            await asyncio.wait([load], timeout=options['sample_interval'])
+            sample = (time.monotonic() - started,
+                      *await self.sample(soak, options))
+            self.stdout.write(
+                '{:>8.0f} {:>8} {:>11} {:>10} {:>13} {:>7} {:>8}'.format(
+                    sample[0], '-' if sample[1] is None
+                    else '{:.1f}'.format(sample[1]), *sample[2:]
+                )
+            )
+
+            # Последний замер - после ухода всех игроков.
+            # The last sample is taken after all the players have left.
+            if load.done():
+                break
+            samples.append(sample)
+        stats = load.result()
+
+        for name in ('frames sent', 'events written'):
+            stats.counts.pop(name, None)
+        self.stdout.write(stats.report())
+        self.stdout.write(self.drift(samples))
+
+    async def sample(self, soak, options):
+        """
+        Память сервера, открытые соединения (в этом процессе), ключи redis
+        и участники групп комнат на всех шардах, сыгранные игры и
+        вытесненные соединения.
+
+        The server memory, open connections (in this process), redis keys
+        and room group members on all the shards, games played and evicted
+        connections.
+        """
+        channel_layer = get_channel_layer()
+        keys = members = 0
+
+        for index in range(channel_layer.ring_size):
+            async with channel_layer.connection(index) as connection:
+                keys += await connection.dbsize()
+
+                async for key in connection.iscan(match='asgi:group:*'):
+                    members += await connection.zcard(key)
+        connections = ('-' if options['url']
+                       else int(CONNECTIONS.values.get((), 0)))
+        return (rss(self.pid) if self.pid else None, connections, keys,
+                members, soak.stats.games,
+                int(sum(EVICTED_CONNECTIONS.values.values())))
+
+    @staticmethod
+    def drift(samples):
+        """
+        Наклон (в час) прямой, приближающей память, ключи redis и
+        участников групп по второй половине замеров, когда прогон уже
+        разогрелся.
+
+        The slope (per hour) of the line fitting the memory, the redis
+        keys and the group members over the second half of the samples,
+        when the run has warmed up.
+        """
+        samples = samples[len(samples) // 2:]
+
+        if len(samples) < 2:
+            return 'drift: not enough samples'
+        times = [sample[0] for sample in samples]
+        mean_time = sum(times) / len(times)
+        spread = sum((t - mean_time) ** 2 for t in times)
+        lines = []
+
+        for name, column in (('rss MB', 1), ('redis keys', 3),
+                             ('group members', 4)):
+            values = [sample[column] for sample in samples]
+
+            if None in values or not spread:
+                continue
+            mean_value = sum(values) / len(values)
+            slope = sum((t - mean_time) * (v - mean_value)
+                        for t, v in zip(times, values)) / spread
+            lines.append('{} {:+.1f}/h'.format(name, slope * 3600))
+        return 'drift over the second half: ' + ', '.join(lines)
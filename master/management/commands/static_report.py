@@ -0,0 +1,75 @@
+import os
+import re
+import tempfile
+
+from django.contrib.staticfiles import finders
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+from django.test import override_settings
+
+
+STATIC_RE = re.compile(r"{%\s*static\s+'([^']+)'\s*%}")
+PAGES = ('main.html', 'login.html', 'register.html')
+
+
+class Command(BaseCommand):
+    help = ('Builds the static files with the production pipeline into a '
+            'temporary directory and reports the transfer size of every '
+            'page before (raw files) and after (minified, precompressed, '
+            'WebP images).')
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as root, override_settings(
+            STATIC_ROOT=root,
+            STATICFILES_STORAGE='master.storage.MinifiedStaticFilesStorage'
+        ):
+            from django.contrib.staticfiles.storage import staticfiles_storage
+
+            call_command('collectstatic', interactive=False, verbosity=0)
+
+            for page in PAGES:
+                self.report(page, staticfiles_storage)
+
+    def report(self, page, storage):
+        with open(get_template(page).origin.name, encoding='utf8') as source:
+            assets = STATIC_RE.findall(source.read())
+        self.stdout.write('{}\n{:<24} {:>10} {:>10}  {}'.format(
+            page, 'asset', 'before', 'after', 'served as'
+        ))
+        before = after = 0
+
+        for asset in assets:
+            if asset.endswith('.webp'):
+                continue
+            served = asset
+            webp = asset.rsplit('.', 1)[0] + '.webp'
+
+            # Браузеры с WebP получают его вместо исходного изображения.
+            # Browsers with WebP get it instead of the original image.
+            if webp in assets:
+                served = webp
+            raw = os.path.getsize(finders.find(asset))
+            name, size = self.transfer(storage, served)
+            before += raw
+            after += size
+            self.stdout.write('{:<24} {:>10} {:>10}  {}'.format(
+                asset, raw, size, name
+            ))
+        self.stdout.write('{:<24} {:>10} {:>10}  {:.0%} smaller\n'.format(
+            'total', before, after, 1 - after / before
+        ))
+
+    def transfer(self, storage, asset):
+        """
+        Самый маленький вариант собранного файла: brotli, gzip или сам
+        файл с хешем в имени.
+
+        The smallest variant of the built file: brotli, gzip or the file
+        itself with a hash in the name.
+        """
+        hashed = storage.stored_name(asset)
+        variants = [hashed + suffix for suffix in ('', '.gz', '.br')
+                    if storage.exists(hashed + suffix)]
+        name = min(variants, key=storage.size)
+        return name, storage.size(name)
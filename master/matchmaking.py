@@ -0,0 +1,176 @@
+import time
+
+from .batch import RedisBatch, shard
+from .scripts import JOIN_ROOM, MATCH_ROOM, FORGET_ROOMS
+
+
+OPEN_ROOMS_KEY = 'matchmaking:open_room_queue'
+OPEN_ROOM_MEMBERS_KEY = 'matchmaking:open_room_members'
+ROOM_COUNTER_KEY = 'matchmaking:room_counter'
+USER_ROOM_KEY = 'matchmaking:user_room:{}'
+ROOM_TTL = 3600
+
+# Время последней активности комнат (ZSET комната -> unix время) на шарде
+# каждой комнаты, по нему RoomReaper находит брошенные комнаты.
+# The last activity time of rooms (a ZSET room -> unix time) on the shard
+# of every room, RoomReaper finds abandoned rooms by it.
+ACTIVITY_KEY = 'rooms:activity'
+
+# Ключи подбора лежат на первом шарде, состояние комнаты - на шарде её
+# группы (см. batch.shard).
+# The matchmaking keys live on the first shard, the room state on the
+# shard of its group (see batch.shard).
+MATCHMAKING_SHARD = 0
+
+
+def touch(batch, room):
+    """
+    Добавляет в пакет на шарде комнаты отметку её активности.
+
+    Queues an activity mark of the room into a batch on its shard.
+    """
+    return batch.zadd(ACTIVITY_KEY, time.time(), room)
+
+
+class Matchmaker:
+    """
+    Подбор комнат без сканирования пространства ключей redis.
+    Комнаты с одним игроком лежат в очереди открытых комнат,
+    а для каждого пользователя хранится ссылка на его текущую комнату,
+    поэтому вход, повторный вход и создание комнаты - это O(1) операции.
+
+    Room matchmaking without scanning the redis keyspace.
+    Rooms with a single player live in the open rooms queue and every user
+    has a pointer to their current room, so joining, rejoining and
+    creating a room are O(1) operations.
+    """
+
+    def __init__(self, channel_layer):
+        self.channel_layer = channel_layer
+
+    def batch(self, room=None, transaction=False):
+        """
+        Пакет команд на шарде комнаты или, без неё, на шарде подбора.
+
+        A command batch on the room shard or, without a room, on the
+        matchmaking shard.
+        """
+        index = MATCHMAKING_SHARD
+
+        if room is not None:
+            index = shard(self.channel_layer, room)
+        return RedisBatch(self.channel_layer, index, transaction)
+
+    async def find_user_room(self, username):
+        """
+        Возвращает комнату, в которой уже находится пользователь.
+
+        Returns the room the user is already in.
+        """
+        key = USER_ROOM_KEY.format(username)
+        room = (await self.batch().get(key, encoding='utf8').execute())[0]
+
+        if room is None:
+            return None
+
+        if (await self.batch(room).exists(room).execute())[0]:
+            await self.batch().expire(key, ROOM_TTL).execute()
+            return room
+        await self.batch().delete(key).execute()
+        return None
+
+    async def match_room(self, username):
+        """
+        Забирает комнату, ожидающую второго игрока, или создаёт новую
+        (см. MATCH_ROOM) и записывает игрока в хеш комнаты. Возвращает
+        комнату и признак её создания.
+
+        Takes a room waiting for a second player or creates a new one
+        (see MATCH_ROOM) and records the player in the room hash. Returns
+        the room and whether it was created.
+        """
+        room, member = (await self.batch().script(
+            MATCH_ROOM,
+            keys=[OPEN_ROOMS_KEY, OPEN_ROOM_MEMBERS_KEY, ROOM_COUNTER_KEY,
+                  USER_ROOM_KEY.format(username)],
+            args=[username, ROOM_TTL, int(time.time())]
+        ).execute())[0]
+        room, member = room.decode('utf8'), member.decode('utf8')
+        batch = self.batch(room)
+
+        # Создатель и гость могут записать хеш в любом порядке: гость
+        # знает создателя из очереди, а создатель не затирает гостя.
+        # The creator and the guest may write the hash in any order: the
+        # guest knows the creator from the queue, and the creator does not
+        # overwrite the guest.
+        if member == username:
+            batch.hset(room, 'room_member', username)
+            batch.hsetnx(room, 'room_guest', 'None')
+        else:
+            if member:
+                batch.hset(room, 'room_member', member)
+            batch.hset(room, 'room_guest', username)
+        await touch(batch.expire(room, ROOM_TTL), room).execute()
+        return room, member == username
+
+    async def join_room(self, room, username):
+        """
+        Делает пользователя гостем выбранной открытой комнаты, если её ещё
+        никто не забрал, она не истекла и создана не им (см. JOIN_ROOM).
+        Комната снимается из очереди в том же скрипте, поэтому достаётся
+        одному гостю, как и в MATCH_ROOM.
+
+        Makes the user the guest of the chosen open room unless someone
+        took it already, it has expired or the user created it (see
+        JOIN_ROOM). The room is taken off the queue in the same script, so
+        it goes to a single guest, as in MATCH_ROOM.
+        """
+        member = (await self.batch().script(
+            JOIN_ROOM,
+            keys=[OPEN_ROOMS_KEY, OPEN_ROOM_MEMBERS_KEY,
+                  USER_ROOM_KEY.format(username)],
+            args=[room, username, ROOM_TTL, int(time.time())]
+        ).execute())[0]
+
+        if member is None:
+            return False
+        member = member.decode('utf8')
+        batch = self.batch(room)
+
+        if member:
+            batch.hset(room, 'room_member', member)
+        batch.hset(room, 'room_guest', username)
+        await touch(batch.expire(room, ROOM_TTL), room).execute()
+        return True
+
+    async def close_room(self, room, *usernames):
+        """
+        Убирает комнату из очереди и удаляет ссылки пользователей на неё.
+
+        Removes the room from the queue and drops the users' pointers to it.
+        """
+        transaction = self.batch(transaction=True)
+        transaction.zrem(OPEN_ROOMS_KEY, room)
+        transaction.hdel(OPEN_ROOM_MEMBERS_KEY, room)
+
+        for username in usernames:
+            transaction.delete(USER_ROOM_KEY.format(username))
+        await transaction.execute()
+
+    async def forget_rooms(self, rooms):
+        """
+        Забывает удалённые комнаты (словарь комната -> игроки), см.
+        FORGET_ROOMS.
+
+        Forgets removed rooms (a dict of room -> players), see
+        FORGET_ROOMS.
+        """
+        pointers = [(username, room) for room, usernames in rooms.items()
+                    for username in usernames]
+        await self.batch().script(
+            FORGET_ROOMS,
+            keys=[OPEN_ROOMS_KEY, OPEN_ROOM_MEMBERS_KEY] + [
+                USER_ROOM_KEY.format(username) for username, _ in pointers
+            ],
+            args=[len(rooms)] + list(rooms) + [room for _, room in pointers]
+        ).execute()
@@ -0,0 +1,227 @@
+import time
+
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+
+
+def format_labels(names, values, extra=''):
+    labels = ['{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                               .replace('"', '\\"'))
+              for name, value in zip(names, values)]
+
+    if extra:
+        labels.append(extra)
+    return '{' + ','.join(labels) + '}' if labels else ''
+
+
+def format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class Metric:
+    """
+    Метрика процесса в формате Prometheus. Значения хранятся по кортежам
+    меток, без блокировок: весь код консьюмера выполняется в одном
+    цикле событий. Каждый воркер отдаёт свои значения, сложением по
+    воркерам занимается Prometheus.
+
+    A process metric in the Prometheus format. Values are kept per label
+    tuple, without locks: all consumer code runs in one event loop. Every
+    worker exposes its own values, Prometheus sums them over workers.
+    """
+
+    type = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+        REGISTRY.append(self)
+
+    def samples(self):
+        for labels, value in self.values.items():
+            yield self.name, format_labels(self.labels, labels), value
+
+    def exposition(self):
+        lines = ['# HELP {} {}'.format(self.name, self.help),
+                 '# TYPE {} {}'.format(self.name, self.type)]
+
+        for name, labels, value in self.samples():
+            lines.append('{}{} {}'.format(name, labels, format_value(value)))
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Gauge. Если передана функция, значение читается из неё при каждом
+    снятии метрик, и на горячем пути ничего не обновляется.
+
+    Gauge. When a function is given, the value is read from it on every
+    scrape and nothing is updated on the hot path.
+    """
+
+    type = 'gauge'
+
+    def __init__(self, name, help, labels=(), function=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def inc(self, *labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount=1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value, *labels):
+        self.values[labels] = value
+
+    def samples(self):
+        if self.function is not None:
+            self.values[()] = self.function()
+        return super().samples()
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labels):
+        counts = self.values.get(labels)
+
+        if counts is None:
+            # Счётчики корзин и корзины +Inf, затем сумма и количество.
+            # The bucket counts and the +Inf bucket, then the sum and the
+            # count.
+            counts = self.values[labels] = [0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    @contextmanager
+    def time(self, *labels):
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self):
+        for labels, counts in self.values.items():
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="{}"'.format('+Inf' if bound == float('inf')
+                                      else format_value(bound))
+                yield (self.name + '_bucket',
+                       format_labels(self.labels, labels, le), cumulative)
+            labels = format_labels(self.labels, labels)
+            yield self.name + '_sum', labels, counts[-2]
+            yield self.name + '_count', labels, counts[-1]
+
+
+def exposition():
+    """
+    Все метрики процесса в текстовом формате Prometheus.
+
+    All process metrics in the Prometheus text format.
+    """
+    return '\n'.join(metric.exposition() for metric in REGISTRY) + '\n'
+
+
+class MetricsApp:
+    """
+    ASGI приложение, отдающее метрики по path, остальные HTTP запросы
+    передаются в app.
+
+    An ASGI application serving the metrics on path, other HTTP requests
+    are passed to app.
+    """
+
+    def __init__(self, app, path='/metrics'):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['path'] != self.path:
+            return await self.app(scope, receive, send)
+        body = exposition().encode('utf8')
+        await send({'type': 'http.response.start', 'status': 200,
+                    'headers': [(b'content-type',
+                                 b'text/plain; version=0.0.4; charset=utf-8'),
+                                (b'content-length', str(len(body)).encode())]})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+# Время обработки кадра клиента по контексту и время сетевого запроса к
+# redis по команде (для Lua скриптов - по имени скрипта).
+#
+# Client frame handling time per context and redis round trip time per
+# command (per script name for Lua scripts).
+RECEIVE_SECONDS = Histogram('game_receive_seconds',
+                            'Time to handle a client frame.', ['context'])
+REDIS_SECONDS = Histogram('game_redis_seconds',
+                          'Redis round trip time of a command batch.',
+                          ['command'])
+GROUP_SEND_SECONDS = Histogram('game_group_send_seconds',
+                               'Time to fan an event out to a room.')
+BROADCAST_SECONDS = Histogram('game_broadcast_seconds',
+                              'Time to fan an event out to the spectators '
+                              'of a room in this process.')
+CONNECT_SECONDS = Histogram('game_connect_seconds',
+                            'Time to match a room and send its state.')
+CONNECTIONS = Gauge('game_connections', 'Open game WebSocket connections.')
+ROOMS = Gauge('game_rooms', 'Rooms with players connected to this process.')
+AUTH_FAILURES = Counter('game_auth_failures_total',
+                        'Rejected WebSocket handshakes.', ['reason'])
+ROOMS_REAPED = Counter('game_rooms_reaped_total',
+                       'Rooms removed by the room reaper.', ['reason'])
+THROTTLED_FRAMES = Counter('game_throttled_frames_total',
+                           'Client frames dropped by rate limits.',
+                           ['context', 'scope'])
+OUTBOUND_OVERFLOWS = Counter('game_outbound_overflows_total',
+                             'Outbound frames that did not fit the queue '
+                             'of a slow client.', ['policy'])
+DUPLICATE_FRAMES = Counter('game_duplicate_frames_total',
+                           'Retried client frames acknowledged without '
+                           'being executed again.', ['context'])
+INVALID_FRAMES = Counter('game_invalid_frames_total',
+                         'Client frames rejected by validation.',
+                         ['context'])
+GAMES_ARCHIVED = Counter('game_games_archived_total',
+                         'Room histories moved to the database.',
+                         ['result'])
+BOT_GAMES = Counter('game_bot_games_total',
+                    'Games played by bot guests of this process.', ['result'])
+BOT_DECISION_SECONDS = Histogram('game_bot_decision_seconds',
+                                 'Time to choose the shots of all the '
+                                 'waiting bots in one step.')
+EVICTED_CONNECTIONS = Counter('game_evicted_connections_total',
+                              'Connections closed by the heartbeat.',
+                              ['reason'])
+DROPPED_MESSAGES = Counter('game_dropped_messages_total',
+                           'Channel layer messages for connections already '
+                           'closed in this process.')
+LOBBY_TICK_SECONDS = Histogram('game_lobby_tick_seconds',
+                               'Time to publish the presence changes of '
+                               'this process and broadcast the lobby diff.')
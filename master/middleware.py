@@ -1,8 +1,187 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import parse_qs
 
-from channels.db import database_sync_to_async
-from django.db import close_old_connections
+from channels.layers import get_channel_layer
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import close_old_connections
+
+from .batch import RedisBatch, shard
+from .metrics import AUTH_FAILURES
+from .scripts import AUTH_CACHE_SET
+
+
+AUTH_CACHE_KEY = 'auth:{}'
+# Поколение записи пользователя в общем кэше: растёт при каждом сбросе.
+# The generation of the user entry in the shared cache: grows with every
+# discard.
+AUTH_GENERATION_KEY = 'auth:{}:generation'
+
+
+class AuthCache:
+    """
+    Кэш проверенных хешей пользователей: локальный LRU с TTL в каждом
+    процессе и общий для всех воркеров слой в redis. Запись удаляется при
+    смене пароля и удалении пользователя (см. signals.py), остальные
+    воркеры увидят изменение не позже чем через local_ttl секунд.
+    Одновременные промахи по одному пользователю выполняют один запрос.
+    Загрузка, начатая до сброса, не записывает устаревший хеш после него:
+    в redis запись идёт, только если поколение пользователя не изменилось
+    (см. AUTH_CACHE_SET), а в локальный кэш - только если процесс с её
+    начала ничего не сбрасывал.
+
+    Cache of verified user hashes: a local LRU with a TTL in every process
+    and a redis layer shared by all workers. An entry is dropped when the
+    password changes or the user is deleted (see signals.py), other
+    workers see the change within local_ttl seconds. Concurrent misses
+    for the same user share a single lookup. A load started before a
+    discard does not write the stale hash after it: redis is written only
+    if the user generation has not changed (see AUTH_CACHE_SET), and the
+    local cache only if the process has discarded nothing since the load
+    started.
+    """
+
+    def __init__(self, size, local_ttl, shared_ttl):
+        self.size = size
+        self.local_ttl = local_ttl
+        self.shared_ttl = shared_ttl
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.generation = 0
+
+    def get_local(self, username):
+        entry = self.entries.get(username)
+
+        if entry is None:
+            return None
+        user_hash, expires = entry
+
+        if expires < time.monotonic():
+            del self.entries[username]
+            return None
+        self.entries.move_to_end(username)
+        return user_hash
+
+    def batch(self, username):
+        channel_layer = get_channel_layer()
+        return RedisBatch(channel_layer, shard(channel_layer, username))
+
+    def set_local(self, username, user_hash):
+        self.entries[username] = (user_hash,
+                                  time.monotonic() + self.local_ttl)
+        self.entries.move_to_end(username)
+
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    async def lookup(self, username, load):
+        """
+        Хеш пользователя из локального кэша, из redis или, при промахе,
+        из load(username) с сохранением в оба слоя.
+
+        The user hash from the local cache, from redis or, on a miss, from
+        load(username), stored into both layers.
+        """
+        user_hash = self.get_local(username)
+
+        if user_hash is not None:
+            return user_hash
+        pending = self.pending.get(username)
+
+        if pending is None:
+            pending = asyncio.ensure_future(self.load(username, load))
+            self.pending[username] = pending
+            pending.add_done_callback(
+                lambda future: self.pending.pop(username, None)
+                if self.pending.get(username) is future else None
+            )
+        return await asyncio.shield(pending)
+
+    async def load(self, username, load):
+        generation = self.generation
+        user_hash, shared_generation = await self.batch(username).get(
+            AUTH_CACHE_KEY.format(username), encoding='utf8'
+        ).get(
+            AUTH_GENERATION_KEY.format(username), encoding='utf8'
+        ).execute()
+
+        if user_hash is None:
+            user_hash = await load(username)
+            await self.batch(username).script(
+                AUTH_CACHE_SET,
+                keys=[AUTH_CACHE_KEY.format(username),
+                      AUTH_GENERATION_KEY.format(username)],
+                args=[user_hash, self.shared_ttl, shared_generation or '']
+            ).execute()
+
+        if generation == self.generation:
+            self.set_local(username, user_hash)
+        return user_hash
+
+    async def discard(self, username):
+        """
+        Сбрасывает запись пользователя в обоих слоях и увеличивает его
+        поколение: начатые раньше загрузки её не восстановят.
+
+        Drops the user entry in both layers and bumps the user generation:
+        loads started earlier do not restore it.
+        """
+        self.generation += 1
+        self.entries.pop(username, None)
+        self.pending.pop(username, None)
+        generation_key = AUTH_GENERATION_KEY.format(username)
+        await self.batch(username).delete(
+            AUTH_CACHE_KEY.format(username)
+        ).incr(generation_key).expire(
+            generation_key, self.shared_ttl
+        ).execute()
+
+
+auth_cache = AuthCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_LOCAL_TTL,
+                       settings.AUTH_CACHE_TTL)
+
+
+# Пул потоков для запросов к базе из middleware. database_sync_to_async
+# выполняет все запросы процесса в одном потоке по очереди; здесь каждый
+# поток держит своё соединение (CONN_MAX_AGE), поэтому пул потоков - это и
+# пул соединений.
+# A thread pool for the middleware database queries.
+# database_sync_to_async runs all the queries of a process one by one in
+# a single thread; here every thread keeps its own connection
+# (CONN_MAX_AGE), so the thread pool is a connection pool too.
+db_executor = ThreadPoolExecutor(settings.DB_POOL_SIZE,
+                                 thread_name_prefix='db')
+
+
+def get_user_hash(username):
+    """
+    Хеш пользователя из базы данных: читается только пароль, из которого
+    он считается. Соединение потока закрывается, только если оно
+    устарело или сломано.
+
+    The user hash from the database: only the password it is computed from
+    is read. The thread connection is closed only if it is stale or
+    broken.
+    """
+    close_old_connections()
+    return User.objects.only('password').get(
+        username=username
+    )._legacy_get_session_auth_hash()
+
+
+async def load_user_hash(username):
+    """
+    get_user_hash в пуле db_executor.
+
+    get_user_hash in the db_executor pool.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        db_executor, get_user_hash, username
+    )
 
 
 class AuthMiddleware:
@@ -11,26 +190,33 @@ class AuthMiddleware:
 
     """
 
-    def __init__(self, app):
+    def __init__(self, app, cache=auth_cache, load=load_user_hash):
         self.app = app
+        self.cache = cache
+        self.load = load
 
     async def __call__(self, scope, receive, send):
         values = scope['query_string']
         values = parse_qs(values.decode())
 
         try:
-            if values['username'] and values['user_hash']:
-                username = values['username'][0]
-                received_user_hash = values['user_hash'][0]
-                user = await database_sync_to_async(
-                    User.objects.get
-                )(username=username)
-                user_hash = await database_sync_to_async(
-                    user._legacy_get_session_auth_hash
-                )()
-                await database_sync_to_async(close_old_connections)()
-
-                if user_hash == received_user_hash:
-                    return await self.app(scope, receive, send)
+            username = values['username'][0]
+            received_user_hash = values['user_hash'][0]
+            if self.cache is not None:
+                user_hash = await self.cache.lookup(username, self.load)
+            else:
+                user_hash = await self.load(username)
+        except KeyError:
+            AUTH_FAILURES.inc('missing')
+            return None
+        except User.DoesNotExist:
+            AUTH_FAILURES.inc('unknown_user')
+            return None
         except:
+            AUTH_FAILURES.inc('error')
+            return None
+
+        if user_hash != received_user_hash:
+            AUTH_FAILURES.inc('mismatch')
             return None
+        return await self.app(scope, receive, send)
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.8 on 2026-10-18 13:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Game',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('room', models.CharField(max_length=64)),
+                ('member', models.CharField(max_length=150)),
+                ('guest', models.CharField(blank=True, max_length=150)),
+                ('winner', models.CharField(blank=True, max_length=150)),
+                ('ended_at', models.DateTimeField(db_index=True)),
+                ('length', models.PositiveIntegerField()),
+                ('history', models.BinaryField()),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='game',
+            constraint=models.UniqueConstraint(fields=('room', 'ended_at'), name='unique_game_room_end'),
+        ),
+    ]
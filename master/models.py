@@ -1 +1,47 @@
 from django.db import models
+
+from . import history
+
+
+class Game(models.Model):
+    """
+    Сыгранная (или брошенная) игра, перенесённая архиватором из redis
+    (см. archive.py): игроки, итог и сжатая история комнаты.
+
+    A played (or abandoned) game moved from redis by the archiver (see
+    archive.py): the players, the result and the compressed room history.
+    """
+
+    room = models.CharField(max_length=64)
+    member = models.CharField(max_length=150)
+    guest = models.CharField(max_length=150, blank=True)
+    winner = models.CharField(max_length=150, blank=True)
+    ended_at = models.DateTimeField(db_index=True)
+    length = models.PositiveIntegerField()
+    history = models.BinaryField()
+
+    class Meta:
+        # Повторный перенос той же комнаты (архиватор упал между записью
+        # в базу и удалением из redis) не создаёт второй игры.
+        # Moving the same room again (the archiver crashed between the
+        # database write and the redis removal) does not create a second
+        # game.
+        constraints = [
+            models.UniqueConstraint(fields=['room', 'ended_at'],
+                                    name='unique_game_room_end')
+        ]
+
+    def __str__(self):
+        return '{} ({} vs {})'.format(self.room, self.member, self.guest)
+
+    def entries(self):
+        return history.decompress(self.history)
+
+    def replay(self, upto=None):
+        """
+        Состояние комнаты после первых upto записей (см. history.replay).
+
+        The room state after the first upto entries (see history.replay).
+        """
+        return history.replay((self.member, self.guest), self.entries(),
+                              upto)
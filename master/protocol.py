@@ -0,0 +1,200 @@
+import msgpack
+
+from . import board
+
+
+SUBPROTOCOL = 'battleship.msgpack.v1'
+
+# Кадры сервера. Частые кадры (сообщение чата, уведомление, действие)
+# передаются массивами msgpack с кодом операции и номерами клеток, редкие
+# (connect, resync, messages) - словарями msgpack с теми же полями, что и
+# в JSON.
+# Server frames. Frequent frames (chat message, notification, action) are
+# sent as msgpack arrays with an opcode and cell indexes, rare ones
+# (connect, resync, messages) as msgpack maps with the same fields as in
+# JSON.
+#
+# [MESSAGE, version, id, sender, message]
+# [NOTIFICATION, version, notification]
+# [ACTION, version, action, username, cell index] (lose: без/without cell)
+MESSAGE = 1
+NOTIFICATION = 2
+ACTION = 3
+
+NOTIFICATIONS = ('start_game', 'exit_room')
+ACTIONS = ('miss', 'hit', 'lose')
+
+# Кадры клиента. Номер кадра seq (см. events.frame_seq) необязателен.
+# Client frames. The frame number seq (see events.frame_seq) is optional.
+#
+# [SEND_MESSAGE, message, seq]
+# [LOAD_MESSAGES, before]
+# [PLAYER_READY, [cell index, ...], seq]
+# [SHOT, cell index, seq]
+# [EXIT_ROOM]
+# [PONG] - ответ на кадр ping сервера / the answer to a server ping frame
+SEND_MESSAGE = 1
+LOAD_MESSAGES = 2
+PLAYER_READY = 3
+SHOT = 4
+EXIT_ROOM = 5
+PONG = 6
+SEQUENCED = (SEND_MESSAGE, PLAYER_READY, SHOT)
+
+
+def pack(value):
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def unpack(data):
+    return msgpack.unpackb(data, raw=False)
+
+
+def compact(frame):
+    """
+    Массив с кодом операции для частых кадров, None для остальных.
+
+    An array with an opcode for frequent frames, None for the others.
+    """
+    context = frame['context']
+    version = frame.get('version')
+
+    if context == 'message':
+        message = frame['message']
+        return [MESSAGE, version, int(message['id']), message['sender'],
+                message['message']]
+    if context == 'notification' and frame['type'] in NOTIFICATIONS:
+        return [NOTIFICATION, version, NOTIFICATIONS.index(frame['type'])]
+    if context == 'action' and frame['action_type'] in ACTIONS:
+        action = ACTIONS.index(frame['action_type'])
+
+        if frame['action_type'] == 'lose':
+            return [ACTION, version, action, frame['params']]
+        username, cell = frame['params'].rsplit(',', 1)
+        return [ACTION, version, action, username, board.cell_index(cell)]
+    return None
+
+
+def expand(value):
+    """
+    Обратное compact(): кадр в том же виде, что и в JSON.
+
+    The inverse of compact(): the frame in the same shape as in JSON.
+    """
+    opcode, version = value[0], value[1]
+
+    if opcode == MESSAGE:
+        frame = {'context': 'message',
+                 'message': {'id': str(value[2]), 'sender': value[3],
+                             'message': value[4]}}
+    elif opcode == NOTIFICATION:
+        frame = {'context': 'notification', 'type': NOTIFICATIONS[value[2]]}
+    elif opcode == ACTION:
+        params = value[3]
+
+        if len(value) > 4:
+            params += ',' + board.cell_id(value[4])
+        frame = {'context': 'action', 'action_type': ACTIONS[value[2]],
+                 'params': params}
+    else:
+        raise ValueError('Unknown opcode: {!r}'.format(opcode))
+
+    if version is not None:
+        frame['version'] = version
+    return frame
+
+
+def encode(frame):
+    """
+    Кадр сервера (словарь, как для JSON) в байты подпротокола.
+
+    A server frame (a dict, as for JSON) into subprotocol bytes.
+    """
+    value = compact(frame)
+
+    if value is None:
+        if frame['context'] == 'resync':
+            frame = dict(frame, events=[compact(event) or event
+                                        for event in frame['events']])
+        value = frame
+    return pack(value)
+
+
+def decode(data):
+    """
+    Байты подпротокола в кадр сервера (для клиентов на Python).
+
+    Subprotocol bytes into a server frame (for Python clients).
+    """
+    value = unpack(data)
+
+    if isinstance(value, list):
+        return expand(value)
+
+    if value.get('context') == 'resync':
+        value['events'] = [expand(event) if isinstance(event, list)
+                           else event for event in value['events']]
+    return value
+
+
+def encode_request(frame):
+    """
+    Кадр клиента в байты подпротокола (для клиентов на Python).
+
+    A client frame into subprotocol bytes (for Python clients).
+    """
+    context = frame['context']
+
+    if context == 'send_message':
+        value = [SEND_MESSAGE, frame['message']]
+    elif context == 'load_messages':
+        value = [LOAD_MESSAGES, int(frame['before'])]
+    elif context == 'player_ready':
+        value = [PLAYER_READY, [board.cell_index(cell)
+                                for cell in frame['selected_cells']]]
+    elif context == 'shot':
+        value = [SHOT, board.cell_index(frame['cell'])]
+    elif context == 'pong':
+        value = [PONG]
+    else:
+        value = [EXIT_ROOM]
+
+    if 'seq' in frame and value[0] in SEQUENCED:
+        value.append(frame['seq'])
+    return pack(value)
+
+
+def decode_request(data):
+    """
+    Байты подпротокола в кадр клиента в том же виде, что и в JSON.
+    Ошибочный кадр поднимает ValueError.
+
+    Subprotocol bytes into a client frame in the same shape as in JSON.
+    A malformed frame raises ValueError.
+    """
+    try:
+        value = unpack(data)
+        opcode = value[0]
+
+        if opcode == SEND_MESSAGE:
+            frame = {'context': 'send_message', 'message': value[1]}
+        elif opcode == LOAD_MESSAGES:
+            return {'context': 'load_messages', 'before': value[1]}
+        elif opcode == PLAYER_READY:
+            frame = {'context': 'player_ready',
+                     'selected_cells': [board.cell_id(index)
+                                        for index in value[1]]}
+        elif opcode == SHOT:
+            frame = {'context': 'shot', 'cell': board.cell_id(value[1])}
+        elif opcode == EXIT_ROOM:
+            return {'context': 'exit_room'}
+        elif opcode == PONG:
+            return {'context': 'pong'}
+        else:
+            raise ValueError('Unknown opcode: {!r}'.format(opcode))
+
+        if len(value) > 2:
+            frame['seq'] = value[2]
+        return frame
+    except (TypeError, IndexError, KeyError) as error:
+        raise ValueError('Malformed frame') from error
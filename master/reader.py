@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import uuid
+
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+
+from .metrics import DROPPED_MESSAGES, Gauge
+
+
+logger = logging.getLogger(__name__)
+
+
+def channel_username(channel):
+    """
+    Пользователь, которому принадлежит канал соединения
+    (см. ChannelReader.add), или None для других каналов.
+
+    The user owning a connection channel (see ChannelReader.add) or None
+    for other channels.
+    """
+    _, _, local = channel.partition('!')
+    username, dot, _ = local.rpartition('.')
+    return username if dot else None
+
+
+class ChannelReader:
+    """
+    Общий приёмник channel layer для всех соединений процесса. Каналы
+    соединений различаются только частью после '!', поэтому channels_redis
+    хранит их сообщения в одной очереди redis, а одна задача читает её
+    BZPOPMIN и передаёт каждое сообщение обработчику своего соединения. У
+    соединения нет своего цикла приёма (задач, буферов и ожидания
+    блокировки приёма слоя), а простаивающие соединения не добавляют
+    запросов к redis: на процесс приходится одно ожидание BZPOPMIN.
+    Сообщение группы для нескольких соединений процесса приходит одним
+    сообщением redis.
+
+    Обработчики событий группы только ставят кадры в очередь соединения
+    (см. InterfaceConsumer.enqueue), поэтому общая задача не ждёт
+    медленных клиентов. Очередь читается пачками до batch сообщений (см.
+    receive), чтобы одна задача успевала за всеми соединениями процесса.
+
+    A channel layer receiver shared by all the connections of the process.
+    Connection channels differ only after '!', so channels_redis keeps
+    their messages in a single redis queue, and one task reads it with
+    BZPOPMIN and passes every message to the handler of its connection. A
+    connection has no receive loop of its own (tasks, buffers and waiting
+    for the layer receive lock), and idle connections add no redis
+    requests: there is one BZPOPMIN wait per process. A group message for
+    several connections of the process arrives as one redis message.
+
+    Group event handlers only put frames into the connection queue (see
+    InterfaceConsumer.enqueue), so the shared task does not wait for slow
+    clients. The queue is read in batches of up to batch messages (see
+    receive), so that one task keeps up with all the connections of the
+    process.
+    """
+
+    def __init__(self, channel_layer=None, prefix='player', batch=100):
+        self.channel_layer = channel_layer
+        self.prefix = prefix
+        self.batch = batch
+        self.channel = None
+        self.consumers = {}
+        self.task = None
+
+    def start(self):
+        # Задача прошлого цикла событий (asyncio.run в командах) отменена
+        # вместе с ним.
+        # The task of a previous event loop (asyncio.run in commands) was
+        # cancelled along with it.
+        if self.task is not None and not self.task.done():
+            return
+
+        if self.channel_layer is None:
+            # Свой экземпляр слоя, как у движка комнат (см. engine.py).
+            # A separate layer instance, as for the room engine (see
+            # engine.py).
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.channel = '{}.{}!'.format(self.prefix,
+                                       self.channel_layer.client_prefix)
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def add(self, consumer, username):
+        """
+        Новый канал соединения пользователя username: сообщения на него
+        передаются в consumer.dispatch.
+
+        A new connection channel of the user username: messages to it are
+        passed to consumer.dispatch.
+        """
+        self.start()
+        channel = '{}{}.{}'.format(self.channel, username,
+                                   uuid.uuid4().hex[:12])
+        self.consumers[channel] = consumer
+        return channel
+
+    def discard(self, channel):
+        self.consumers.pop(channel, None)
+
+    async def receive(self):
+        """
+        Следующая пачка сообщений общей очереди: ждёт первое (BZPOPMIN) и
+        забирает вместе с ним до batch - 1 уже пришедших (ZPOPMIN), то
+        есть два запроса к redis на пачку. receive_single channels_redis
+        делает четыре запроса на каждое сообщение и не начинает следующий
+        приём до очистки резервной очереди, и при потоке сообщений общая
+        задача отставала от соединений. Резервной очереди здесь нет:
+        сообщения, забранные в момент остановки процесса, теряются, как и
+        очередь соединений.
+
+        The next batch of messages from the shared queue: waits for the
+        first one (BZPOPMIN) and takes up to batch - 1 already queued ones
+        with it (ZPOPMIN), i.e. two redis requests per batch. channels_redis
+        receive_single makes four requests per message and does not start
+        the next receive before the backup queue is cleaned, and under a
+        stream of messages the shared task fell behind the connections.
+        There is no backup queue here: messages taken the moment the
+        process stops are lost, as is the connection queue.
+        """
+        layer = self.channel_layer
+        key = layer.prefix + self.channel
+
+        async with layer.connection(layer.consistent_hash(self.channel)) \
+                as connection:
+            first = await connection.bzpopmin(key,
+                                              timeout=layer.brpop_timeout)
+
+            if first is None:
+                return []
+            members = [first[1]]
+
+            if self.batch > 1:
+                members.extend((await connection.zpopmin(
+                    key, self.batch - 1
+                ))[::2])
+        return [layer.deserialize(member) for member in members]
+
+    async def run(self):
+        while True:
+            try:
+                messages = await self.receive()
+            except Exception:
+                logger.exception('Failed to receive from the channel layer')
+                await asyncio.sleep(1)
+                continue
+
+            for message in messages:
+                await self.deliver(message.pop('__asgi_channel__'), message)
+
+    async def deliver(self, channels, message):
+        # Сообщение группы приходит один раз для всех каналов процесса.
+        # A group message arrives once for all the process channels.
+        if not isinstance(channels, list):
+            channels = [channels]
+
+        for channel in channels:
+            consumer = self.consumers.get(channel)
+
+            if consumer is None:
+                DROPPED_MESSAGES.inc()
+                continue
+
+            try:
+                await consumer.dispatch(message)
+            except Exception:
+                logger.exception('Failed to dispatch a message to %s',
+                                 channel)
+
+
+channel_reader = ChannelReader()
+Gauge('game_reader_channels', 'Connection channels served by the shared '
+      'channel reader of this process.',
+      function=lambda: len(channel_reader.consumers))
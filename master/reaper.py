@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import time
+
+from aioredis import Redis
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.layers import channel_layers
+from django.conf import settings
+
+from .archive import archive
+from .batch import RedisBatch
+from .engine import OWNER_KEY
+from .events import EVENTS_KEY, MESSAGES_KEY
+from .matchmaking import ACTIVITY_KEY, Matchmaker
+from .metrics import ROOMS_REAPED, Gauge
+
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = 'rooms:reaper'
+GROUP_KEY = 'asgi:group:{}'
+
+
+class RoomReaper:
+    """
+    Удаляет брошенные комнаты. Консьюмеры отмечают активность комнаты в
+    ACTIVITY_KEY (см. matchmaking.touch) при подборе, на каждый кадр и при
+    отключении. Раз в interval секунд один из процессов (блокировка
+    LOCK_KEY на каждом шарде) пачками по batch_size просматривает комнаты,
+    не отмечавшиеся дольше grace секунд, и удаляет:
+
+    - брошенные - в группе не осталось ни одного канала;
+    - простаивающие - активности не было дольше idle_ttl секунд, хотя
+      игроки подключены; им сначала рассылается уведомление exit_room.
+
+    Вместе с комнатой удаляются её журнал, чат, ключ владельца и группа, а
+    из ключей подбора - открытая комната и ссылки игроков; история
+    комнаты ставится в очередь архива (см. archive.py). Остальные
+    комнаты пропускаются до следующей отметки.
+
+    Removes abandoned rooms. Consumers mark room activity in ACTIVITY_KEY
+    (see matchmaking.touch) on matchmaking, on every frame and on
+    disconnect. Every interval seconds one of the processes (the LOCK_KEY
+    lock on every shard) walks, in pages of batch_size, the rooms not
+    marked for longer than grace seconds and removes:
+
+    - abandoned ones - no channels are left in the group;
+    - idle ones - no activity for longer than idle_ttl seconds, although
+      players are connected; they get the exit_room notification first.
+
+    Together with the room its event log, chat, owner key and group are
+    removed, and so are the open room and the player pointers in the
+    matchmaking keys; the room history is queued for the archive (see
+    archive.py). Other rooms are skipped until their next mark.
+    """
+
+    def __init__(self, channel_layer=None, interval=30, grace=120,
+                 idle_ttl=1800, batch_size=100):
+        self.channel_layer = channel_layer
+        self.interval = interval
+        self.grace = grace
+        self.idle_ttl = idle_ttl
+        self.batch_size = batch_size
+        self.task = None
+        # Комнаты в ACTIVITY_KEY по шардам, которые обходит этот процесс.
+        # Rooms in ACTIVITY_KEY per shard walked by this process.
+        self.live = {}
+
+    def start(self):
+        if self.task is not None:
+            return
+
+        if self.channel_layer is None:
+            self.channel_layer = channel_layers.make_backend(
+                DEFAULT_CHANNEL_LAYER
+            )
+        self.task = asyncio.ensure_future(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.reap()
+            except Exception:
+                logger.exception('Failed to reap rooms')
+
+    async def reap(self, now=None, lock=True):
+        """
+        Один проход по всем шардам. Возвращает число удалённых комнат.
+
+        One pass over all the shards. Returns the number of removed rooms.
+        """
+        now = time.time() if now is None else now
+        reaped = 0
+
+        for index in range(self.channel_layer.ring_size):
+            batch = RedisBatch(self.channel_layer, index)
+
+            if lock:
+                batch.set(LOCK_KEY, now, expire=max(1, int(self.interval)),
+                          exist=Redis.SET_IF_NOT_EXIST)
+            *locked, live = await batch.zcard(ACTIVITY_KEY).execute()
+
+            if locked and not locked[0]:
+                self.live.pop(index, None)
+                continue
+            count = await self.reap_shard(index, now)
+            self.live[index] = live - count
+            reaped += count
+        return reaped
+
+    async def reap_shard(self, index, now):
+        expiry = getattr(self.channel_layer, 'group_expiry', 86400)
+        offset = reaped = 0
+
+        while True:
+            rooms = (await RedisBatch(self.channel_layer, index).zrangebyscore(
+                ACTIVITY_KEY, max=now - self.grace, withscores=True,
+                offset=offset, count=self.batch_size, encoding='utf8'
+            ).execute())[0]
+
+            if not rooms:
+                break
+            batch = RedisBatch(self.channel_layer, index)
+
+            for room, _ in rooms:
+                # Каналы упавших процессов остаются в группе до истечения
+                # group_expiry, их нужно убрать перед подсчётом.
+                # Channels of crashed processes stay in the group until
+                # group_expiry, they have to go before counting.
+                group = GROUP_KEY.format(room)
+                batch.zremrangebyscore(group, max=now - expiry)
+                batch.zcard(group)
+                batch.hmget(room, 'room_member', 'room_guest',
+                            encoding='utf8')
+            results = await batch.execute()
+            abandoned, idle = {}, {}
+
+            for number, (room, touched) in enumerate(rooms):
+                connected, players = results[number * 3 + 1:number * 3 + 3]
+                players = [player for player in players
+                           if player not in (None, 'None')]
+
+                if not connected:
+                    abandoned[room] = players
+                elif touched < now - self.idle_ttl:
+                    idle[room] = players
+
+            for room in idle:
+                await self.channel_layer.group_send(room, {
+                    'type': 'notification', 'message': 'exit_room'
+                })
+            removed = dict(abandoned, **idle)
+
+            if removed:
+                await self.remove(index, removed)
+            ROOMS_REAPED.inc('abandoned', amount=len(abandoned))
+            ROOMS_REAPED.inc('idle', amount=len(idle))
+            reaped += len(removed)
+            offset += len(rooms) - len(removed)
+
+            if len(rooms) < self.batch_size:
+                break
+        return reaped
+
+    async def remove(self, index, rooms):
+        """
+        Удаляет комнаты (словарь комната -> игроки) с их ключами.
+
+        Removes rooms (a dict of room -> players) with their keys.
+        """
+        batch = RedisBatch(self.channel_layer, index)
+
+        for room, players in rooms.items():
+            batch.delete(room, EVENTS_KEY.format(room),
+                         MESSAGES_KEY.format(room), OWNER_KEY.format(room),
+                         GROUP_KEY.format(room))
+            archive(batch, room, players)
+        await batch.zrem(ACTIVITY_KEY, *rooms).execute()
+        await Matchmaker(self.channel_layer).forget_rooms(rooms)
+
+
+if settings.REAPER_INTERVAL > 0:
+    room_reaper = RoomReaper(interval=settings.REAPER_INTERVAL,
+                             grace=settings.REAPER_GRACE,
+                             idle_ttl=settings.REAPER_IDLE_TTL)
+    Gauge('game_rooms_live', 'Rooms with recent activity on the shards '
+          'walked by this process.',
+          function=lambda: sum(room_reaper.live.values()))
+else:
+    room_reaper = None
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from .consumers import InterfaceConsumer, LobbyConsumer, SpectatorConsumer
+
+
+websocket_urlpatterns = [
+    path('ws/game/', InterfaceConsumer.as_asgi()),
+    path('ws/spectate/<str:room>/', SpectatorConsumer.as_asgi()),
+    path('ws/lobby/', LobbyConsumer.as_asgi())
+]
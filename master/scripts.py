@@ -0,0 +1,515 @@
+import hashlib
+
+from aioredis.errors import ReplyError
+
+from .events import HISTORY_TTL, SEQ_WINDOW
+from .metrics import REDIS_SECONDS
+
+
+class RedisScript:
+    """
+    Lua скрипт, выполняемый на стороне redis. Вызывается через EVALSHA,
+    а при отсутствии в кэше скриптов (NOSCRIPT) загружается через EVAL.
+
+    A Lua script executed on the redis side. Called with EVALSHA and
+    loaded with EVAL when it is missing from the script cache (NOSCRIPT).
+    The name labels the script in the metrics.
+    """
+
+    def __init__(self, source, name='script'):
+        self.source = source
+        self.name = name
+        self.sha = hashlib.sha1(source.encode('utf8')).hexdigest()
+
+    async def __call__(self, connection, keys=(), args=()):
+        keys, args = list(keys), list(args)
+
+        with REDIS_SECONDS.time(self.name):
+            try:
+                return await connection.evalsha(self.sha, keys=keys,
+                                                args=args)
+            except ReplyError as error:
+                if not str(error).startswith('NOSCRIPT'):
+                    raise
+                return await connection.eval(self.source, keys=keys,
+                                             args=args)
+
+
+# Операции над битовыми досками (см. board.py): клетка i - бит i % 8
+# байта i // 8 строки длиной BOARD_BYTES.
+#
+# Bitboard operations (see board.py): cell i is bit i % 8 of byte i // 8
+# of a BOARD_BYTES long string.
+BITBOARD = '''
+local BOARD_BYTES = 13
+
+local function board_test(board, index)
+    local byte = string.byte(board or '', math.floor(index / 8) + 1) or 0
+    return math.floor(byte / 2 ^ (index % 8)) % 2 == 1
+end
+
+local function board_set(board, index)
+    board = board or ''
+    board = board .. string.rep('\\0', BOARD_BYTES - #board)
+    if board_test(board, index) then
+        return board
+    end
+    local position = math.floor(index / 8) + 1
+    local byte = string.byte(board, position) + 2 ^ (index % 8)
+    return string.sub(board, 1, position - 1) .. string.char(byte)
+        .. string.sub(board, position + 1)
+end
+
+local function board_popcount(board)
+    local count = 0
+    for position = 1, #(board or '') do
+        local byte = string.byte(board, position)
+        while byte > 0 do
+            count = count + byte % 2
+            byte = math.floor(byte / 2)
+        end
+    end
+    return count
+end
+'''
+
+
+# Журнал событий комнаты: каждое событие, рассылаемое группе, получает
+# следующую версию состояния комнаты и добавляется в ограниченный список,
+# из которого переподключившийся клиент получает пропущенные события.
+#
+# Room event log: every event broadcast to the group gets the next room
+# state version and is appended to a capped list, from which a
+# reconnecting client gets the events it missed.
+EVENT_LOG = '''
+local function record_event(room, log, event, limit, ttl)
+    event['version'] = redis.call('HINCRBY', room, 'version', 1)
+    local encoded = cjson.encode(event)
+    redis.call('RPUSH', log, encoded)
+    redis.call('LTRIM', log, -tonumber(limit), -1)
+    redis.call('EXPIRE', log, ttl)
+    return encoded
+end
+'''
+
+
+# История комнаты для архива: компактные записи (см. history.py) в
+# неограниченном списке, без версий и повторов уведомлений. Срок жизни
+# (events.HISTORY_TTL) задаётся один раз, при создании списка.
+#
+# The room history for the archive: compact entries (see history.py) in
+# an uncapped list, without versions and repeated notifications. The
+# lifetime (events.HISTORY_TTL) is set once, when the list is created.
+HISTORY = 'local HISTORY_TTL = {}\n'.format(HISTORY_TTL) + '''
+local function record_history(history, entry)
+    if redis.call('RPUSH', history, cjson.encode(entry)) == 1 then
+        redis.call('EXPIRE', history, HISTORY_TTL)
+    end
+end
+
+local function board_hex(board)
+    return (string.gsub(board, '.', function(byte)
+        return string.format('%02x', string.byte(byte))
+    end))
+end
+'''
+
+
+# Окно повторов: номер последнего применённого кадра игрока хранится в
+# поле <username>:seq хеша комнаты, а номера, пропущенные до него (кадры,
+# не дошедшие до скрипта), - в поле <username>:skipped. Кадр с номером не
+# больше последнего уже выполнен и только подтверждается, если его номер
+# не пропущен; кадр без номера (пустой аргумент) выполняется всегда.
+#
+# Retry window: the number of the last applied frame of a player is kept
+# in the <username>:seq field of the room hash, and the numbers skipped
+# before it (frames that never reached the script) in the
+# <username>:skipped field. A frame numbered no higher than the last one
+# has been executed already and is only acknowledged unless its number
+# was skipped; a frame without a number (an empty argument) is always
+# executed.
+DEDUP = 'local SEQ_WINDOW = {}\n'.format(SEQ_WINDOW) + '''
+local function is_retry(room, username, seq)
+    seq = tonumber(seq)
+    if not seq then
+        return false
+    end
+    local field, skipped_field = username .. ':seq', username .. ':skipped'
+    local last = tonumber(redis.call('HGET', room, field) or '0')
+    local value = redis.call('HGET', room, skipped_field) or ''
+    local skipped, found = {}, false
+    local floor = math.max(seq, last) - SEQ_WINDOW
+    for number in string.gmatch(value, '%d+') do
+        number = tonumber(number)
+        if number == seq then
+            found = true
+        elseif number > floor then
+            skipped[#skipped + 1] = number
+        end
+    end
+    if seq <= last and not found then
+        return true
+    end
+    if seq > last then
+        for number = math.max(last + 1, floor + 1), seq - 1 do
+            skipped[#skipped + 1] = number
+        end
+        redis.call('HSET', room, field, seq)
+    end
+    local updated = table.concat(skipped, ',')
+    if updated ~= value then
+        redis.call('HSET', room, skipped_field, updated)
+    end
+    return false
+end
+'''
+
+
+# Разрешение выстрела одним атомарным вызовом: проверка попадания,
+# отметка клетки, передача хода, продление TTL и проверка победы.
+#
+# Shot resolution as one atomic call: hit test, cell marking, turn swap,
+# TTL refresh and win detection.
+#
+# KEYS[1] - room, KEYS[2] - event log, KEYS[3] - history; ARGV - username,
+# enemy, cell index, cell id, ttl, event log length, frame number.
+# Returns the list of recorded events (hit/miss and lose actions) or nil
+# for a retried frame.
+SHOT = RedisScript(BITBOARD + EVENT_LOG + HISTORY + DEDUP + '''
+local room, log, history = KEYS[1], KEYS[2], KEYS[3]
+local username, enemy = ARGV[1], ARGV[2]
+local cell, cell_id = tonumber(ARGV[3]), ARGV[4]
+local ttl, limit = tonumber(ARGV[5]), ARGV[6]
+if is_retry(room, username, ARGV[7]) then
+    return false
+end
+
+local ships = redis.call('HGET', room, enemy .. ':ships') or ''
+local hits = redis.call('HGET', room, enemy .. ':hits') or ''
+local fleet = board_popcount(ships)
+local lose = {type = 'action', action_type = 'lose', params = enemy}
+if fleet > 0 and board_popcount(hits) >= fleet then
+    return {record_event(room, log, lose, limit, ttl)}
+end
+
+local events = {}
+if board_test(ships, cell) then
+    hits = board_set(hits, cell)
+    redis.call('HSET', room, enemy .. ':hits', hits)
+    record_history(history, {'h', username, cell})
+    table.insert(events, record_event(room, log, {
+        type = 'action', action_type = 'hit',
+        params = enemy .. ',' .. cell_id
+    }, limit, ttl))
+else
+    local misses = redis.call('HGET', room, username .. ':misses')
+    redis.call('HSET', room, username .. ':misses', board_set(misses, cell))
+    record_history(history, {'m', username, cell})
+    table.insert(events, record_event(room, log, {
+        type = 'action', action_type = 'miss',
+        params = username .. ',' .. cell_id
+    }, limit, ttl))
+end
+redis.call('HSET', room, username .. ':access_to_shot', 'false',
+           enemy .. ':access_to_shot', 'true')
+redis.call('EXPIRE', room, ttl)
+
+if fleet > 0 and board_popcount(hits) >= fleet then
+    record_history(history, {'l', enemy})
+    table.insert(events, record_event(room, log, lose, limit, ttl))
+end
+return events
+''', name='shot')
+
+
+# Готовность игрока: сохраняет флот и, если соперник уже готов, а игра
+# ещё не началась, начинает её.
+#
+# Player readiness: stores the fleet and, if the enemy is ready and the
+# game has not started yet, starts it.
+#
+# KEYS[1] - room, KEYS[2] - event log, KEYS[3] - history; ARGV - username,
+# enemy, ships bitboard, ttl, event log length, frame number.
+# Returns the list of recorded events (the start_game notification) or
+# nil for a retried frame.
+READY = RedisScript(EVENT_LOG + HISTORY + DEDUP + '''
+local room, log, history = KEYS[1], KEYS[2], KEYS[3]
+local username, enemy, ships = ARGV[1], ARGV[2], ARGV[3]
+local ttl, limit = ARGV[4], ARGV[5]
+
+if is_retry(room, username, ARGV[6]) then
+    return false
+end
+redis.call('EXPIRE', room, ttl)
+if redis.call('HEXISTS', room, 'game_status') == 1 then
+    return {}
+end
+redis.call('HSET', room, username .. ':ships', ships)
+record_history(history, {'p', username, board_hex(ships)})
+if redis.call('HEXISTS', room, enemy .. ':ships') == 0 then
+    return {}
+end
+redis.call('HSET', room, 'game_status', 'started',
+           username .. ':access_to_shot', 'false',
+           enemy .. ':access_to_shot', 'true')
+return {record_event(room, log, {type = 'notification',
+                                 message = 'start_game'}, limit, ttl)}
+''', name='ready')
+
+
+# Добавление сообщения в журнал чата комнаты: сервер назначает
+# возрастающий id, журнал обрезается до заданной длины.
+#
+# Appends a message to the room chat log: the server assigns an
+# increasing id and the log is trimmed to the given length.
+#
+# KEYS[1] - room, KEYS[2] - chat log, KEYS[3] - event log, KEYS[4] -
+# history; ARGV - sender, JSON message, chat log length, ttl, event log
+# length, frame number.
+# Returns the recorded chat_message event or nil for a retried frame.
+APPEND_MESSAGE = RedisScript(EVENT_LOG + HISTORY + DEDUP + '''
+local room, messages, log = KEYS[1], KEYS[2], KEYS[3]
+local ttl, limit = ARGV[4], ARGV[5]
+if is_retry(room, ARGV[1], ARGV[6]) then
+    return false
+end
+local id = redis.call('HINCRBY', room, 'message_id', 1)
+local message = {id = tostring(id), sender = ARGV[1],
+                 message = cjson.decode(ARGV[2])}
+
+redis.call('RPUSH', messages, cjson.encode(message))
+redis.call('LTRIM', messages, -tonumber(ARGV[3]), -1)
+redis.call('EXPIRE', room, ttl)
+redis.call('EXPIRE', messages, ttl)
+record_history(KEYS[4], {'c', ARGV[1], message.message})
+return record_event(room, log, {type = 'chat_message', message = message},
+                    limit, ttl)
+''', name='append_message')
+
+
+# События после версии since для переподключившегося клиента. Возвращает
+# {текущая версия, события...} или nil, если разрыв больше журнала и
+# нужен полный снимок состояния.
+#
+# Events after version since for a reconnecting client. Returns
+# {current version, events...} or nil when the gap is larger than the log
+# and a full snapshot is needed.
+#
+# KEYS[1] - room, KEYS[2] - event log; ARGV - since.
+EVENTS_SINCE = RedisScript('''
+local version = tonumber(redis.call('HGET', KEYS[1], 'version') or '0')
+local since = tonumber(ARGV[1])
+if since > version then
+    return false
+end
+local events = {}
+if since < version then
+    if version - since > redis.call('LLEN', KEYS[2]) then
+        return false
+    end
+    events = redis.call('LRANGE', KEYS[2], since - version, -1)
+end
+table.insert(events, 1, version)
+return events
+''', name='events_since')
+
+
+# Страница журнала чата: до count сообщений с id меньше before. Id в
+# журнале идут подряд, поэтому позиция считается от id первого сообщения.
+#
+# A chat log page: up to count messages with ids below before. Ids in
+# the log are consecutive, so positions are derived from the first id.
+#
+# KEYS[1] - chat log; ARGV - before, count.
+MESSAGES_PAGE = RedisScript('''
+local first = redis.call('LINDEX', KEYS[1], 0)
+if not first then
+    return {}
+end
+local stop = tonumber(ARGV[1]) - 1 - tonumber(cjson.decode(first).id)
+if stop < 0 then
+    return {}
+end
+local start = math.max(0, stop - tonumber(ARGV[2]) + 1)
+return redis.call('LRANGE', KEYS[1], start, stop)
+''', name='messages_page')
+
+
+# Записывает хеш пользователя в общий кэш проверки (см.
+# middleware.AuthCache), только если поколение пользователя не изменилось
+# с начала загрузки: иначе хеш мог устареть.
+#
+# Writes the user hash into the shared verification cache (see
+# middleware.AuthCache) only if the user generation has not changed since
+# the load started: otherwise the hash may be stale.
+#
+# KEYS[1] - user hash, KEYS[2] - user generation; ARGV - hash, ttl, the
+# generation read before the load ('' - none). Returns 1 if written.
+AUTH_CACHE_SET = RedisScript('''
+if (redis.call('GET', KEYS[2]) or '') ~= ARGV[3] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+''', name='auth_cache_set')
+
+
+# Продлевает и отпускает владение комнатой движка (см. engine.py), только
+# если ключ владельца всё ещё хранит канал этого процесса: процесс, чей
+# ключ истёк и которого сменил другой владелец, не продлевает и не
+# удаляет чужое владение.
+#
+# Extend and release the ownership of an engine room (see engine.py) only
+# if the owner key still holds the channel of this process: a process
+# whose key expired and that was replaced by another owner neither
+# extends nor deletes the other ownership.
+#
+# KEYS[1] - room owner; ARGV - channel (, ttl). Returns 1 on success.
+OWNER_EXTEND = RedisScript('''
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+return redis.call('EXPIRE', KEYS[1], ARGV[2])
+''', name='owner_extend')
+
+OWNER_RELEASE = RedisScript('''
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+return redis.call('DEL', KEYS[1])
+''', name='owner_release')
+
+
+# Подбор комнаты одним атомарным шагом: забирает самую старую открытую
+# комнату или, если открытых нет, заводит новую. Одновременно пришедшие
+# игроки не могут оба создать по комнате и остаться без соперника.
+# Открытые комнаты лежат в ZSET со временем истечения в качестве веса, их
+# создатели - в хеше рядом, а хеш самой комнаты записывается отдельно на
+# шарде комнаты (см. matchmaking.py), поэтому скрипт трогает только ключи
+# подбора.
+#
+# Room matchmaking in a single atomic step: takes the oldest open room or,
+# when there are none, starts a new one. Players arriving at the same time
+# cannot both create a room and be left without an enemy. Open rooms live
+# in a ZSET scored by their expiry time, their creators in a hash next to
+# it, and the room hash itself is written separately on the room shard
+# (see matchmaking.py), so the script only touches the matchmaking keys.
+#
+# KEYS[1] - open rooms, KEYS[2] - open room members, KEYS[3] - room
+# counter, KEYS[4] - user room; ARGV - username, ttl, now.
+# Returns {room, room member}.
+MATCH_ROOM = RedisScript('''
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[3],
+                           'LIMIT', 0, 100)
+if #expired > 0 then
+    redis.call('ZREM', KEYS[1], unpack(expired))
+    redis.call('HDEL', KEYS[2], unpack(expired))
+end
+local room = redis.call('ZRANGE', KEYS[1], 0, 0)[1]
+local member = ARGV[1]
+if room then
+    member = redis.call('HGET', KEYS[2], room) or ''
+    redis.call('ZREM', KEYS[1], room)
+    redis.call('HDEL', KEYS[2], room)
+else
+    room = 'room_' .. redis.call('INCR', KEYS[3])
+    redis.call('ZADD', KEYS[1], tonumber(ARGV[3]) + tonumber(ARGV[2]), room)
+    redis.call('HSET', KEYS[2], room, ARGV[1])
+end
+redis.call('SET', KEYS[4], room, 'EX', ARGV[2])
+return {room, member}
+''', name='match_room')
+
+
+# Вход в открытую комнату, выбранную в лобби, одним атомарным шагом.
+# Комната не достаётся гостю, если её уже забрали, если её срок истёк
+# (такая комната убирается из очереди, как в MATCH_ROOM) или если её
+# создатель - сам гость: своя комната остаётся в очереди.
+#
+# Joins an open room chosen in the lobby in a single atomic step. The room
+# does not go to the guest if it has been taken already, if it has expired
+# (such a room is taken off the queue, as in MATCH_ROOM) or if its creator
+# is the guest themselves: their own room stays in the queue.
+#
+# KEYS[1] - open rooms, KEYS[2] - open room members, KEYS[3] - user room;
+# ARGV - room, username, ttl, now. Returns the room member or false.
+JOIN_ROOM = RedisScript('''
+local expiry = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not expiry then
+    return false
+end
+if tonumber(expiry) <= tonumber(ARGV[4]) then
+    redis.call('ZREM', KEYS[1], ARGV[1])
+    redis.call('HDEL', KEYS[2], ARGV[1])
+    return false
+end
+local member = redis.call('HGET', KEYS[2], ARGV[1]) or ''
+if member == ARGV[2] then
+    return false
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('SET', KEYS[3], ARGV[1], 'EX', ARGV[3])
+return member
+''', name='join_room')
+
+
+# Забывает удалённые комнаты в ключах подбора: убирает их из очереди
+# открытых комнат и удаляет ссылки пользователей, если те всё ещё
+# указывают на эти комнаты (игрок мог уже перейти в новую).
+#
+# Forgets removed rooms in the matchmaking keys: takes them out of the open
+# rooms queue and drops the user pointers that still point to them (a
+# player may have moved to a new room already).
+#
+# KEYS[1] - open rooms, KEYS[2] - open room members, KEYS[3..] - user
+# rooms; ARGV - the number of rooms n, n rooms, then the room of every
+# user room key. Returns the number of dropped pointers.
+FORGET_ROOMS = RedisScript('''
+local count = tonumber(ARGV[1])
+for i = 2, count + 1 do
+    redis.call('ZREM', KEYS[1], ARGV[i])
+    redis.call('HDEL', KEYS[2], ARGV[i])
+end
+local dropped = 0
+for i = 3, #KEYS do
+    if redis.call('GET', KEYS[i]) == ARGV[count + i - 1] then
+        dropped = dropped + redis.call('DEL', KEYS[i])
+    end
+end
+return dropped
+''', name='forget_rooms')
+
+
+# Записывает присутствие пользователей одного процесса в лобби (см.
+# lobby.py): продлевает пользователей онлайн до времени expiry, убирает
+# отключившихся и всех, чьё время истекло. Возвращает тех, кто появился в
+# лобби, и тех, кто из него ушёл.
+#
+# Writes the presence of the users of a process into the lobby (see
+# lobby.py): extends the online users up to the expiry time, removes the
+# disconnected ones and everyone whose time is up. Returns the users who
+# appeared in the lobby and the ones who left it.
+#
+# KEYS[1] - online users; ARGV - now, expiry, the number of online users
+# n, n online users, then the disconnected users.
+PRESENCE = RedisScript('''
+local count = tonumber(ARGV[3])
+local joined, left = {}, {}
+for i = 4, count + 3 do
+    if redis.call('ZADD', KEYS[1], ARGV[2], ARGV[i]) == 1 then
+        joined[#joined + 1] = ARGV[i]
+    end
+end
+for i = count + 4, #ARGV do
+    if redis.call('ZREM', KEYS[1], ARGV[i]) == 1 then
+        left[#left + 1] = ARGV[i]
+    end
+end
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for _, username in ipairs(expired) do
+    left[#left + 1] = username
+end
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+return {joined, left}
+''', name='presence')
@@ -0,0 +1,53 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .middleware import auth_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+def discard_auth_cache(username):
+    """
+    Сбрасывает кэшированный хеш пользователя. Ошибка redis только
+    записывается в лог: сохранение пользователя не должно из-за неё
+    падать, а запись в кэше истечёт сама.
+
+    Drops the cached user hash. A redis error is only logged: saving the
+    user must not fail because of it, and the cache entry expires by
+    itself.
+    """
+    try:
+        async_to_sync(auth_cache.discard)(username)
+    except Exception:
+        logger.exception('Failed to drop the cached hash of %s', username)
+
+
+@receiver(post_save, sender=User)
+def invalidate_auth_cache(sender, instance, created, update_fields,
+                          **kwargs):
+    """
+    Сбрасывает кэш при смене пароля (хеш считается из пароля): после
+    set_password или при сохранении с update_fields, включающими пароль.
+    Остальные сохранения, например last_login при входе, хеш не меняют.
+
+    Drops the cache on a password change (the hash is computed from the
+    password): after set_password or on a save with update_fields that
+    include the password. Other saves, e.g. last_login on a login, do not
+    change the hash.
+    """
+    if created:
+        return
+
+    if instance._password is not None or (
+            update_fields is not None and 'password' in update_fields):
+        discard_auth_cache(instance.username)
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    discard_auth_cache(instance.username)
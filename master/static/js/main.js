@@ -1,3 +1,9 @@
+const RESEND_INTERVAL = 200;
+const MAX_NOT_ACKED = 20;
+// Сервер закрыл соединение простаивающего игрока и удалил его комнату
+// (см. master/heartbeat.py): переподключаться к ней не нужно.
+const IDLE_CLOSE_CODE = 4001;
+
 window.addEventListener('load', function () {
   username = document.getElementById('username').value
   user_hash = document.getElementById('user_hash').value
@@ -9,8 +15,10 @@ window.addEventListener('load', function () {
       connection: null,
       messages_list: [],
       connected: false,
-      not_sended_messages: [],
-      not_sended_shots: [],
+      // Номер последнего кадра и кадры, применение которых сервер ещё не
+      // подтвердил.
+      seq: 0,
+      not_acked: [],
       cells: [],
       selected_cells: [],
       enemy_cells_: [],
@@ -19,41 +27,110 @@ window.addEventListener('load', function () {
       your_hits: [],
       to_you_miss_cells: [],
       enemy: null,
+      room: null,
+      version: 0,
+      // Открытая комната, выбранная в лобби, для следующего подключения.
+      join: null,
+      // Лобби: пользователи онлайн и открытые комнаты (комната -> создатель).
+      lobby: null,
+      lobby_users: [],
+      lobby_rooms: {},
     },
 
     mutations: {
+      // Нумерует кадр: после переподключения сервер сообщает номер
+      // последнего применённого кадра, и повторяются только более поздние.
+      number(state, frame) {
+        frame.seq = ++state.seq;
+        state.not_acked.push(frame);
+        if (state.not_acked.length > MAX_NOT_ACKED) {
+          state.not_acked.shift();
+        }
+      },
       connecting(state) {
-        state.connection = null;
-        state.connection = new WebSocket('ws://' +
+        // Переподключаясь к своей комнате, передаём последнюю известную
+        // версию, чтобы получить только пропущенные события.
+        let resume = '';
+        if (state.room !== null) {
+          resume = '&room=' + state.room + '&version=' + state.version;
+        } else if (state.join !== null) {
+          resume = '&join=' + state.join;
+        }
+        state.join = null;
+        const connection = new WebSocket('ws://' +
           'localhost:8000' +
           '/ws/game/' +
           '?' +
           'username=' + username +
-          '&' + 'user_hash=' + user_hash);
+          '&' + 'user_hash=' + user_hash + resume, [Protocol.SUBPROTOCOL]);
+        connection.binaryType = 'arraybuffer';
+        state.connection = connection;
 
-        state.connection.onopen = () => {
+        connection.onopen = () => {
           state.connected = true;
           state.cells = Object.keys(app.$refs);
         };
 
-        state.connection.onerror = () => {
+        connection.onerror = () => {
           state.connected = false;
-          state.connection = null;
         };
 
-        state.connection.onclose = () => {
-          app.game_started = false;
-          app.player_ready = false;
-          app.room_guest = null;
-          state.connection.close();
+        connection.onclose = (event) => {
+          if (state.connection !== connection) {
+            return;
+          }
+          state.connected = false;
           state.connection = null;
-          state.messages_list = [];
-          state.selected_cells = [];
+          if (event.code === IDLE_CLOSE_CODE) {
+            state.room = null;
+          }
+          if (state.room !== null) {
+            // Соединение оборвалось, а не закрыто выходом из комнаты:
+            // сохраняем состояние и переподключаемся.
+            setTimeout(() => store.dispatch('connect'), 1000);
+          } else {
+            app.game_started = false;
+            app.player_ready = false;
+            app.placement_rejected = false;
+            app.room_guest = null;
+            state.messages_list = [];
+            state.selected_cells = [];
+            state.version = 0;
+            state.not_acked = [];
+          }
         };
 
-        state.connection.onmessage = (message_event) => {
-          let message = JSON.parse(message_event.data);
-          if (message.context === 'connect') {
+        // Кадры, которые сервер не применил (номер больше acked или
+        // пропущенный), уходят повторно по одному раз в RESEND_INTERVAL мс,
+        // чтобы после переподключения не упереться в ограничение частоты на
+        // сервере. Повтор уже применённого кадра сервер только подтверждает.
+        const resend_not_acked = (acked, skipped) => {
+          state.seq = Math.max(state.seq, acked);
+          state.not_acked = state.not_acked.filter(
+            (frame) => frame.seq > acked || skipped.includes(frame.seq));
+          const frames = state.not_acked.slice();
+          const resend = () => {
+            if (state.connection !== connection || frames.length === 0) {
+              return;
+            }
+            Protocol.send(connection, frames.shift());
+            setTimeout(resend, RESEND_INTERVAL);
+          };
+          resend();
+        };
+
+        const handle = (message) => {
+          if (message.hasOwnProperty('version')) {
+            state.version = message.version;
+          }
+          if (message.context === 'ping') {
+            Protocol.send(connection, {'context': 'pong'});
+          } else if (message.context === 'connect') {
+            if (message.room !== state.room) {
+              state.not_acked = [];
+            }
+            state.room = message.room;
+            state.version = parseInt(message.data.version || '0');
             app.room_member = message.data.room_member;
             app.room_guest = message.data.room_guest;
             state.messages_list = JSON.parse(message.data.messages)
@@ -124,32 +201,65 @@ window.addEventListener('load', function () {
               setTimeout(hit_cells, 50);
 
             }
-            var not_sended_messages_length = state.not_sended_messages.length;
-            if (not_sended_messages_length > 0) {
-              for (var i = 0; i < not_sended_messages_length; i++) {
-                state.connection.send(JSON.stringify({
-                  'context': 'send_message',
-                  'message': state.not_sended_messages[i]
-                }));
-                state.not_sended_messages.splice(i, 1);
-              }
+            const skipped = message.data[username + ':skipped'];
+            resend_not_acked(parseInt(message.data[username + ':seq'] || '0'),
+                             skipped ? skipped.split(',').map(Number) : []);
+          } else if (message.context === 'resync') {
+            message.events.forEach(handle);
+            state.version = message.version;
+            resend_not_acked(message.seq || 0, message.skipped || []);
+          } else if (message.context === 'duplicate') {
+            // Повторённый кадр уже был применён.
+            state.not_acked = state.not_acked.filter(
+              (frame) => frame.seq !== message.seq);
+          } else if (message.context === 'throttled') {
+            // Сервер отбросил кадр из-за ограничения частоты, не применив
+            // его: выстрел игрок сделает заново, остальные кадры уходят
+            // повторно с тем же номером.
+            const frame = state.not_acked.find(
+              (frame) => frame.seq === message.seq);
+            if (message.request === 'shot') {
+              state.not_acked = state.not_acked.filter(
+                (frame) => frame.seq !== message.seq);
+              app.access_to_shot = true;
+            } else if (frame !== undefined) {
+              setTimeout(() => {
+                if (state.connection === connection &&
+                    state.not_acked.includes(frame)) {
+                  Protocol.send(connection, frame);
+                }
+              }, RESEND_INTERVAL);
+            }
+          } else if (message.context === 'rejected') {
+            // Сервер не принял кадр (выстрел по неверной клетке или
+            // расстановку кораблей, которую можно исправить).
+            state.not_acked = state.not_acked.filter(
+              (frame) => frame.seq !== message.seq);
+            if (message.request === 'player_ready') {
+              app.player_ready = false;
+              app.placement_rejected = true;
             }
           } else if (message.context === 'message') {
             state.messages_list.push(message.message)
+          } else if (message.context === 'messages') {
+            state.messages_list = message.messages.concat(state.messages_list)
           } else if (message.context === 'notification') {
             if (message.type === 'start_game') {
               app.access_to_shot = true;
               app.game_started = true;
-              if (message.data['room_member'] === username) {
-                state.enemy = message.data['room_guest'];
+              if (app.room_member === username) {
+                state.enemy = app.room_guest;
               } else {
-                state.enemy = message.data['room_member'];
+                state.enemy = app.room_member;
               }
             } else if (message.type === 'exit_room') {
               app.access_to_shot = false;
               app.game_started = false;
               app.player_ready = false;
+              app.placement_rejected = false;
               app.room_guest = null;
+              state.room = null;
+              state.version = 0;
               state.connection.close();
               state.connection = null;
               state.messages_list = [];
@@ -184,19 +294,57 @@ window.addEventListener('load', function () {
                 app.access_to_shot = true;
               };
             } else if (message.action_type === 'lose') {
-              store.state.connection.send(JSON.stringify({
+              state.room = null;
+              Protocol.send(store.state.connection, {
                 'context': 'exit_room'
-              }));
+              });
               this.room_guest = null;
               store.state.connection.close();
             };
           };
         };
+
+        connection.onmessage = (message_event) => {
+          handle(Protocol.decode(message_event.data));
+        };
       },
 
       disconnecting(state) {
         state.connection.close();
       },
+      // Лобби присылает своё состояние, а затем не чаще нескольких раз в
+      // секунду разницу с ним.
+      lobbyConnecting(state) {
+        const lobby = new WebSocket('ws://' +
+          'localhost:8000' +
+          '/ws/lobby/' +
+          '?' +
+          'username=' + username +
+          '&' + 'user_hash=' + user_hash, [Protocol.SUBPROTOCOL]);
+        lobby.binaryType = 'arraybuffer';
+        state.lobby = lobby;
+
+        lobby.onclose = () => {
+          state.lobby = null;
+          setTimeout(() => store.commit('lobbyConnecting'), 5000);
+        };
+
+        lobby.onmessage = (message_event) => {
+          const message = Protocol.decode(message_event.data);
+          if (message.context === 'lobby') {
+            state.lobby_users = message.users.sort();
+            state.lobby_rooms = message.rooms;
+          } else if (message.context === 'lobby_diff') {
+            const users = new Set(state.lobby_users);
+            message.left.forEach((user) => users.delete(user));
+            message.joined.forEach((user) => users.add(user));
+            state.lobby_users = Array.from(users).sort();
+            const rooms = Object.assign({}, state.lobby_rooms, message.opened);
+            message.closed.forEach((room) => delete rooms[room]);
+            state.lobby_rooms = rooms;
+          }
+        };
+      },
     },
 
     actions: {
@@ -224,42 +372,57 @@ window.addEventListener('load', function () {
       room_member: null,
       room_guest: null,
       player_ready: false,
+      placement_rejected: false,
       access_to_shot: false,
     },
     computed: {
       messages_list: function () {
         return this.$store.state.messages_list
       },
+      earlier_messages: function () {
+        let messages_list = this.$store.state.messages_list;
+        return messages_list.length > 0 && messages_list[0]['id'] !== '1';
+      },
       selected_cells: function () {
         return 20 - this.$store.state.selected_cells.length;
       },
+      lobby_users: function () {
+        return this.$store.state.lobby_users;
+      },
+      lobby_rooms: function () {
+        return this.$store.state.lobby_rooms;
+      },
     },
     methods: {
       setShipPosition: function (e) {
         if (this.player_ready === false) {
-          if (this.$store.state.selected_cells.length < 20) {
-            if (this.$store.state.selected_cells.includes(e)) {
-              let index = this.$store.state.selected_cells.indexOf(e);
-              this.$store.state.selected_cells.splice(index, 1);
-              this.$refs[e][0].style.background = ""
-            } else {
-              this.$store.state.selected_cells.push(e)
-              this.$refs[e][0].style.background = "blue"
-            }
+          // Выбранную клетку можно снять и после отказа сервера, когда
+          // выбраны все 20.
+          if (this.$store.state.selected_cells.includes(e)) {
+            let index = this.$store.state.selected_cells.indexOf(e);
+            this.$store.state.selected_cells.splice(index, 1);
+            this.$refs[e][0].style.background = ""
+          } else if (this.$store.state.selected_cells.length < 20) {
+            this.$store.state.selected_cells.push(e)
+            this.$refs[e][0].style.background = "blue"
           } else {
             this.player_ready = true
-            this.$store.state.connection.send(JSON.stringify({
+            this.placement_rejected = false
+            const frame = {
               'context': 'player_ready',
               'selected_cells': this.$store.state.selected_cells
-            }));
+            };
+            this.$store.commit('number', frame);
+            Protocol.send(this.$store.state.connection, frame);
           }
         }
       },
       exitRoom: function (e) {
         e.preventDefault();
-        this.$store.state.connection.send(JSON.stringify({
+        this.$store.state.room = null;
+        Protocol.send(this.$store.state.connection, {
           'context': 'exit_room'
-        }));
+        });
         this.room_guest = null;
         this.$store.state.connection.close();
       },
@@ -272,14 +435,28 @@ window.addEventListener('load', function () {
         }
         this.$store.dispatch('connect');
       },
+      joinRoom: function (room) {
+        this.$store.state.join = room;
+        this.$store.dispatch('connect');
+      },
+      loadMessages: function (e) {
+        e.preventDefault();
+        Protocol.send(this.$store.state.connection, {
+          'context': 'load_messages',
+          'before': this.$store.state.messages_list[0]['id']
+        });
+      },
       sendMessage: function (e) {
         e.preventDefault();
+        const frame = {
+          'context': 'send_message',
+          'message': this.message
+        };
+        this.$store.commit('number', frame);
         try {
-          this.$store.state.connection.send(JSON.stringify({
-            'context': 'send_message',
-            'message': this.message
-          }));
+          Protocol.send(this.$store.state.connection, frame);
         } catch {
+          // Сообщение отправится после переподключения.
           while (true) {
             try {
               this.$store.state.connection.close();
@@ -299,11 +476,13 @@ window.addEventListener('load', function () {
         try {
           if (this.access_to_shot) {
             this.access_to_shot = false;
-            this.$store.state.connection.send(JSON.stringify({
+            const frame = {
               'context': 'shot',
               'user': this.username,
               'cell': e
-            }));
+            };
+            this.$store.commit('number', frame);
+            Protocol.send(this.$store.state.connection, frame);
           }
         } catch {
           while (true) {
@@ -327,4 +506,7 @@ window.addEventListener('load', function () {
 
   });
 
+
+  store.commit('lobbyConnecting');
+
 })
\ No newline at end of file
@@ -0,0 +1,197 @@
+// Бинарный подпротокол игры (см. master/protocol.py): кадры в msgpack,
+// частые кадры - массивами с кодом операции и номерами клеток. Если
+// сервер не выбрал подпротокол, кадры передаются в JSON.
+// The binary game subprotocol (see master/protocol.py): frames in msgpack,
+// frequent frames as arrays with an opcode and cell indexes. If the server
+// did not pick the subprotocol, frames are sent as JSON.
+const Protocol = (function () {
+  const SUBPROTOCOL = 'battleship.msgpack.v1';
+  const COLUMNS = 'ABCDEFGHIJ';
+  const NOTIFICATIONS = ['start_game', 'exit_room'];
+  const ACTIONS = ['miss', 'hit', 'lose'];
+  const REQUESTS = {
+    send_message: 1,
+    load_messages: 2,
+    player_ready: 3,
+    shot: 4,
+    exit_room: 5,
+    pong: 6
+  };
+  const encoder = new TextEncoder();
+  const decoder = new TextDecoder();
+
+  function cellId(index) {
+    return 'cell_' + COLUMNS[index % 10] + (Math.floor(index / 10) + 1);
+  }
+
+  function cellIndex(cell) {
+    return (parseInt(cell.slice(6)) - 1) * 10 + COLUMNS.indexOf(cell[5]);
+  }
+
+  // Подмножество msgpack, которое использует игра.
+  // The msgpack subset the game uses.
+  function pack(value, bytes) {
+    if (value === null || value === undefined) {
+      bytes.push(0xc0);
+    } else if (value === false || value === true) {
+      bytes.push(value ? 0xc3 : 0xc2);
+    } else if (typeof value === 'number') {
+      if (Number.isInteger(value) && value >= 0 && value < 0x80) {
+        bytes.push(value);
+      } else if (Number.isInteger(value) && value >= 0 && value <= 0xffffffff) {
+        bytes.push(0xce, value >>> 24, (value >>> 16) & 0xff,
+          (value >>> 8) & 0xff, value & 0xff);
+      } else {
+        const view = new DataView(new ArrayBuffer(8));
+        view.setFloat64(0, value);
+        bytes.push(0xcb, ...new Uint8Array(view.buffer));
+      }
+    } else if (typeof value === 'string') {
+      const data = encoder.encode(value);
+      if (data.length < 32) {
+        bytes.push(0xa0 | data.length);
+      } else {
+        bytes.push(0xdb, data.length >>> 24, (data.length >>> 16) & 0xff,
+          (data.length >>> 8) & 0xff, data.length & 0xff);
+      }
+      bytes.push(...data);
+    } else if (Array.isArray(value)) {
+      if (value.length < 16) {
+        bytes.push(0x90 | value.length);
+      } else {
+        bytes.push(0xdc, value.length >>> 8, value.length & 0xff);
+      }
+      value.forEach((item) => pack(item, bytes));
+    } else {
+      const keys = Object.keys(value);
+      bytes.push(0xde, keys.length >>> 8, keys.length & 0xff);
+      keys.forEach((key) => {
+        pack(key, bytes);
+        pack(value[key], bytes);
+      });
+    }
+    return bytes;
+  }
+
+  function unpack(view, state) {
+    const type = view.getUint8(state.offset++);
+    const take = (size) => {
+      const start = state.offset;
+      state.offset += size;
+      return start;
+    };
+    const str = (size) => decoder.decode(
+      new Uint8Array(view.buffer, view.byteOffset + take(size), size));
+    const array = (size) => {
+      const items = [];
+      for (let i = 0; i < size; i++) {
+        items.push(unpack(view, state));
+      }
+      return items;
+    };
+    const map = (size) => {
+      const items = {};
+      for (let i = 0; i < size; i++) {
+        const key = unpack(view, state);
+        items[key] = unpack(view, state);
+      }
+      return items;
+    };
+
+    if (type < 0x80) return type;
+    if (type < 0x90) return map(type & 0x0f);
+    if (type < 0xa0) return array(type & 0x0f);
+    if (type < 0xc0) return str(type & 0x1f);
+    if (type >= 0xe0) return type - 0x100;
+    switch (type) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xca: return view.getFloat32(take(4));
+      case 0xcb: return view.getFloat64(take(8));
+      case 0xcc: return view.getUint8(take(1));
+      case 0xcd: return view.getUint16(take(2));
+      case 0xce: return view.getUint32(take(4));
+      case 0xcf: return Number(view.getBigUint64(take(8)));
+      case 0xd0: return view.getInt8(take(1));
+      case 0xd1: return view.getInt16(take(2));
+      case 0xd2: return view.getInt32(take(4));
+      case 0xd3: return Number(view.getBigInt64(take(8)));
+      case 0xd9: return str(view.getUint8(take(1)));
+      case 0xda: return str(view.getUint16(take(2)));
+      case 0xdb: return str(view.getUint32(take(4)));
+      case 0xdc: return array(view.getUint16(take(2)));
+      case 0xdd: return array(view.getUint32(take(4)));
+      case 0xde: return map(view.getUint16(take(2)));
+      case 0xdf: return map(view.getUint32(take(4)));
+    }
+    throw new Error('Unsupported msgpack type ' + type);
+  }
+
+  // Массив с кодом операции в кадр того же вида, что и в JSON.
+  // An array with an opcode into a frame of the same shape as in JSON.
+  function expand(value) {
+    if (!Array.isArray(value)) {
+      return value;
+    }
+    let frame;
+    if (value[0] === 1) {
+      frame = {
+        context: 'message',
+        message: {id: String(value[2]), sender: value[3], message: value[4]}
+      };
+    } else if (value[0] === 2) {
+      frame = {context: 'notification', type: NOTIFICATIONS[value[2]]};
+    } else {
+      let params = value[3];
+      if (value.length > 4) {
+        params += ',' + cellId(value[4]);
+      }
+      frame = {context: 'action', action_type: ACTIONS[value[2]], params: params};
+    }
+    if (value[1] !== null) {
+      frame.version = value[1];
+    }
+    return frame;
+  }
+
+  function compact(frame) {
+    const value = [REQUESTS[frame.context]];
+    if (frame.context === 'send_message') {
+      value.push(frame.message);
+    } else if (frame.context === 'load_messages') {
+      value.push(parseInt(frame.before));
+    } else if (frame.context === 'player_ready') {
+      value.push(frame.selected_cells.map(cellIndex));
+    } else if (frame.context === 'shot') {
+      value.push(cellIndex(frame.cell));
+    }
+    if (frame.seq !== undefined) {
+      value.push(frame.seq);
+    }
+    return value;
+  }
+
+  return {
+    SUBPROTOCOL: SUBPROTOCOL,
+
+    send(connection, frame) {
+      if (connection.protocol === SUBPROTOCOL) {
+        connection.send(new Uint8Array(pack(compact(frame), [])));
+      } else {
+        connection.send(JSON.stringify(frame));
+      }
+    },
+
+    decode(data) {
+      if (typeof data === 'string') {
+        return JSON.parse(data);
+      }
+      const frame = expand(unpack(new DataView(data), {offset: 0}));
+      if (frame.context === 'resync') {
+        frame.events = frame.events.map(expand);
+      }
+      return frame;
+    },
+  };
+})();
@@ -0,0 +1,44 @@
+from rcssmin import cssmin
+from rjsmin import jsmin
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+MINIFIERS = {
+    '.js': lambda source: jsmin(source, keep_bang_comments=True),
+    '.css': lambda source: cssmin(source, keep_bang_comments=True),
+}
+
+
+class MinifiedStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    Хранилище collectstatic: сначала сжимает собранные JS и CSS (кроме
+    уже сжатых *.min.*), затем, как CompressedManifestStaticFilesStorage,
+    добавляет в имена хеш содержимого (такие файлы WhiteNoise отдаёт с
+    бессрочным immutable кэшированием) и заранее сохраняет их копии в
+    brotli и gzip.
+
+    The collectstatic storage: first minifies the collected JS and CSS
+    (except the already minified *.min.*), then, as
+    CompressedManifestStaticFilesStorage, adds a content hash to the names
+    (WhiteNoise serves such files with forever immutable caching) and
+    stores their brotli and gzip copies in advance.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in paths:
+                self.minify(name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def minify(self, name):
+        base, _, extension = name.rpartition('.')
+        minifier = MINIFIERS.get('.' + extension)
+
+        if minifier is None or base.endswith('.min'):
+            return
+
+        with open(self.path(name), encoding='utf8') as source:
+            minified = minifier(source.read())
+
+        with open(self.path(name), 'w', encoding='utf8') as target:
+            target.write(minified)
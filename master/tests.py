@@ -0,0 +1,1767 @@
+import asyncio
+import datetime
+import itertools
+import json
+import random
+import time
+import uuid
+
+from urllib.parse import urlencode
+
+from asgiref.sync import async_to_sync
+from channels import DEFAULT_CHANNEL_LAYER
+from channels.db import database_sync_to_async
+from channels.layers import channel_layers, get_channel_layer
+from channels.testing import HttpCommunicator
+from channels_redis.core import RedisChannelLayer
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from . import board, bots, broadcast, heartbeat, history, lobby, reader
+from .archive import ARCHIVE_KEY, GameArchiver, archive
+from .batch import RedisBatch, loaded_scripts, shard
+from .broadcast import BroadcastHub
+from .engine import OWNER_KEY, RoomEngine, room_engine
+from .events import HISTORY_KEY, MESSAGES_KEY, SEQ_WINDOW
+from .management.commands._loadtest import (GAME_PATH, InProcessClient,
+                                            provision_users)
+from .management.commands.bench_fleet import reference_fleet
+from .matchmaking import (ACTIVITY_KEY, Matchmaker, OPEN_ROOM_MEMBERS_KEY,
+                          OPEN_ROOMS_KEY, ROOM_COUNTER_KEY, ROOM_TTL,
+                          USER_ROOM_KEY)
+from .metrics import (DROPPED_MESSAGES, DUPLICATE_FRAMES, EVICTED_CONNECTIONS,
+                      GAMES_ARCHIVED, INVALID_FRAMES, REGISTRY, ROOMS_REAPED,
+                      Counter, Gauge, Histogram, MetricsApp)
+from .middleware import AUTH_CACHE_KEY, AuthCache, auth_cache
+from .models import Game
+from .reaper import LOCK_KEY, RoomReaper
+from .scripts import RedisScript
+from .throttle import Throttle
+
+
+TIMEOUT = 5
+
+
+class RedisTestCase(SimpleTestCase):
+    """
+    Тест с redis channel layer: каждый тест начинается с пустой базы
+    REDIS_DB на всех шардах (см. game/settings_test.py).
+
+    A test with the redis channel layer: every test starts with an empty
+    REDIS_DB database on all the shards (see game/settings_test.py).
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        if not hasattr(settings, 'TEST_REDIS_SHARD_DB'):
+            raise ImproperlyConfigured(
+                'Tests flush redis, run them with '
+                '--settings=game.settings_test'
+            )
+        super().setUpClass()
+
+    def setUp(self):
+        self.channel_layer = get_channel_layer()
+        async_to_sync(self.flush)()
+
+    async def flush(self):
+        for index in range(self.channel_layer.ring_size):
+            async with self.channel_layer.connection(index) as connection:
+                await connection.flushdb()
+
+
+class ConsumerTestCase(RedisTestCase, TransactionTestCase):
+    """
+    Тест с игроками, подключёнными к приложению в процессе теста.
+    Фоновые задачи процесса запускаются при первом подключении в цикле
+    событий теста и отменяются вместе с ним, поэтому после теста они
+    забываются и следующий тест запускает их заново.
+
+    A test with players connected to the application in the test process.
+    The background tasks of the process start with the first connection
+    in the event loop of the test and are cancelled along with it, so
+    they are forgotten after the test and the next one starts them again.
+    """
+
+    def setUp(self):
+        super().setUp()
+        # Пользователи создаются заново с новыми хешами.
+        # The users are created anew with new hashes.
+        auth_cache.entries.clear()
+        self.users = dict(provision_users('test_', 4))
+
+    def tearDown(self):
+        reader.channel_reader.task = None
+        broadcast.broadcast_hub.refresh_task = None
+
+        for service in (bots.bot_engine, heartbeat.heartbeat, lobby.lobby):
+            if service is not None:
+                service.task = None
+
+        # Комнаты движка в памяти с теми же именами есть и в следующем
+        # тесте.
+        # The next test has engine rooms with the same names too.
+        if room_engine is not None:
+            for state in (room_engine.rooms, room_engine.owners,
+                          room_engine.loading, room_engine.dirty):
+                state.clear()
+            room_engine.channel = None
+            room_engine.tasks = []
+            room_engine.flushing = asyncio.Lock()
+        super().tearDown()
+
+    async def connect(self, username, binary=False, **query):
+        """
+        Подключает игрока (с binary - по бинарному подпротоколу) и
+        возвращает клиент и первый кадр (состояние комнаты).
+
+        Connects a player (with binary - over the binary subprotocol) and
+        returns the client and the first frame (the room state).
+        """
+        from game.asgi import application
+
+        client = InProcessClient(application, binary)
+        await client.connect(GAME_PATH + '?' + urlencode(dict(
+            query, username=username, user_hash=self.users[username]
+        )), TIMEOUT)
+        return client, await client.receive(TIMEOUT)
+
+    @staticmethod
+    async def receive_until(client, context, **fields):
+        """
+        Пропускает кадры до кадра context с полями fields и возвращает его.
+
+        Skips frames up to the context frame with the fields and returns it.
+        """
+        while True:
+            frame = await client.receive(TIMEOUT)
+
+            if frame.get('context') == context and all(
+                    frame.get(name) == value
+                    for name, value in fields.items()):
+                return frame
+
+    @staticmethod
+    def invalid_frames(context):
+        return INVALID_FRAMES.values.get((context,), 0)
+
+
+class BoardTests(SimpleTestCase):
+
+    def test_random_fleet_is_a_valid_fleet(self):
+        for _ in range(200):
+            cells = board.random_fleet()
+
+            self.assertEqual(len(set(cells)), board.FLEET_SIZE)
+            self.assertTrue(board.valid_fleet(board.to_mask(cells)))
+
+    def test_cell_index_round_trips_cell_id(self):
+        for index in range(board.CELLS):
+            self.assertEqual(board.cell_index(board.cell_id(index)), index)
+
+    def test_cell_index_rejects_other_spellings(self):
+        for cell in ['cell_A01', 'cell_A+1', 'cell_A 1', 'cell_A1 ',
+                     'cell_a1', 'cell_A0', 'cell_A11', 'cell_K1', 'cell_A',
+                     'A1', '', None, 1, ['cell_A1']]:
+            with self.subTest(cell=cell):
+                with self.assertRaises(ValueError):
+                    board.cell_index(cell)
+
+
+def counts_of(*lengths):
+    counts = [0] * len(board.FLEET_COUNTS)
+
+    for length in lengths:
+        counts[length] += 1
+    return tuple(counts)
+
+
+class FleetTests(SimpleTestCase):
+    """
+    board.valid_fleet против прямолинейной проверки (см. bench_fleet).
+
+    board.valid_fleet against a straightforward check (see bench_fleet).
+    """
+
+    FLEETS = 2000
+
+    def assertMatchesReference(self, cases):
+        mismatches = [board.to_cells(mask) for mask, counts in cases
+                      if board.valid_fleet(mask, counts)
+                      != reference_fleet(mask, counts)]
+
+        self.assertEqual(mismatches[:10], [])
+
+    def test_every_single_ship_shape(self):
+        """
+        Все наборы из 1-4 клеток в окне 4x4 во всех сдвигах по полю,
+        каждый как флот из одного корабля своей длины.
+
+        Every set of 1-4 cells in a 4x4 window at every shift over the
+        board, each as a fleet of one ship of its length.
+        """
+        window = [(x, y) for y in range(4) for x in range(4)]
+        shapes = set()
+
+        for size in range(1, max(board.FLEET) + 1):
+            for shape in itertools.combinations(window, size):
+                left = min(x for x, _ in shape)
+                top = min(y for _, y in shape)
+                shapes.add(tuple((x - left, y - top) for x, y in shape))
+
+        def cases():
+            for shape in shapes:
+                width = max(x for x, _ in shape) + 1
+                height = max(y for _, y in shape) + 1
+
+                for dy in range(board.SIZE - height + 1):
+                    for dx in range(board.SIZE - width + 1):
+                        mask = 0
+
+                        for x, y in shape:
+                            mask |= 1 << ((y + dy) * board.SIZE + x + dx)
+                        yield mask, counts_of(len(shape))
+
+        self.assertMatchesReference(cases())
+
+    def test_every_pair_of_ships(self):
+        """
+        Все пары допустимых положений кораблей, включая касающиеся и
+        пересекающиеся.
+
+        Every pair of legal ship positions, touching and overlapping ones
+        included.
+        """
+        ships = [(ship, length) for placements in board.PLACEMENTS
+                 for ship, _, length in placements]
+
+        self.assertMatchesReference(
+            (first | second, counts_of(first_length, second_length))
+            for (first, first_length), (second, second_length)
+            in itertools.combinations(ships, 2)
+        )
+
+    def test_random_fleets_and_mutations(self):
+        """
+        Случайные стандартные флоты и они же со сдвинутой, добавленной или
+        снятой клеткой.
+
+        Random standard fleets and the same with a moved, added or removed
+        cell.
+        """
+        rng = random.Random(1)
+
+        def cases():
+            for _ in range(self.FLEETS):
+                mask = board.to_mask(board.random_fleet(rng))
+                yield mask, board.FLEET_COUNTS
+                cells = [index for index in range(board.CELLS)
+                         if mask >> index & 1]
+                empty = [index for index in range(board.CELLS)
+                         if not mask >> index & 1]
+                mutation = rng.randrange(3)
+
+                if mutation == 0:
+                    mask ^= 1 << rng.choice(cells) | 1 << rng.choice(empty)
+                elif mutation == 1:
+                    mask |= 1 << rng.choice(empty)
+                else:
+                    mask ^= 1 << rng.choice(cells)
+                yield mask, board.FLEET_COUNTS
+
+        self.assertMatchesReference(cases())
+
+
+class MetricsTests(SimpleTestCase):
+
+    def metric(self, metric):
+        self.addCleanup(REGISTRY.remove, metric)
+        return metric
+
+    def test_counter_and_gauge_exposition(self):
+        counter = self.metric(Counter('test_frames_total', 'Frames.',
+                                      ['context']))
+        counter.inc('shot')
+        counter.inc('shot', amount=2)
+        counter.inc('say "hi"')
+        gauge = self.metric(Gauge('test_open', 'Open.', function=lambda: 3))
+
+        self.assertEqual(counter.exposition(), '\n'.join([
+            '# HELP test_frames_total Frames.',
+            '# TYPE test_frames_total counter',
+            'test_frames_total{context="shot"} 3',
+            'test_frames_total{context="say \\"hi\\""} 1'
+        ]))
+        self.assertEqual(gauge.exposition().splitlines()[-1], 'test_open 3')
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.metric(Histogram('test_seconds', 'Time.',
+                                          buckets=(0.1, 1)))
+        for value in (0.05, 0.5, 0.5, 2):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.exposition().splitlines()[2:], [
+            'test_seconds_bucket{le="0.1"} 1',
+            'test_seconds_bucket{le="1"} 3',
+            'test_seconds_bucket{le="+Inf"} 4',
+            'test_seconds_sum 3.05',
+            'test_seconds_count 4'
+        ])
+
+    async def test_endpoint_renders_every_metric(self):
+        async def app(scope, receive, send):
+            raise AssertionError('the metrics path reached the app')
+
+        counter = self.metric(Counter('test_rendered_total', 'Rendered.'))
+        counter.inc()
+        response = await HttpCommunicator(MetricsApp(app), 'GET',
+                                          '/metrics').get_response()
+        body = response['body'].decode('utf8')
+
+        self.assertEqual(response['status'], 200)
+        self.assertIn((b'content-type',
+                       b'text/plain; version=0.0.4; charset=utf-8'),
+                      response['headers'])
+        self.assertIn('# TYPE game_receive_seconds histogram', body)
+        self.assertIn('\ntest_rendered_total 1\n', body)
+
+
+class ThrottleTests(SimpleTestCase):
+
+    def test_connection_bucket_limits_its_connection_only(self):
+        throttle = Throttle({'send_message': (1, 2)}, {})
+        abuser, player = throttle.connection(), throttle.connection()
+
+        self.assertEqual([throttle.limited(abuser, 'room_1', 'send_message')
+                          for _ in range(3)], [None, None, 'connection'])
+        self.assertIsNone(throttle.limited(player, 'room_1', 'send_message'))
+        self.assertIsNone(throttle.limited(abuser, 'room_1', 'shot'))
+
+    def test_room_bucket_is_shared_by_the_room(self):
+        throttle = Throttle({}, {'shot': (1, 2)})
+        first, second = throttle.connection(), throttle.connection()
+
+        self.assertIsNone(throttle.limited(first, 'room_1', 'shot'))
+        self.assertIsNone(throttle.limited(second, 'room_1', 'shot'))
+        self.assertEqual(throttle.limited(first, 'room_1', 'shot'), 'room')
+        self.assertIsNone(throttle.limited(first, 'room_2', 'shot'))
+
+        throttle.forget('room_1')
+        self.assertIsNone(throttle.limited(second, 'room_1', 'shot'))
+
+
+class RedisBatchTests(RedisTestCase):
+
+    def script(self):
+        # Новый текст - скрипт, которого нет в кэше сервера.
+        # A new source is a script missing from the server cache.
+        return RedisScript("return redis.call('INCR', KEYS[1]) -- {}".format(
+            uuid.uuid4().hex
+        ))
+
+    async def test_new_script_keeps_transaction_order(self):
+        script = self.script()
+        results = await RedisBatch(self.channel_layer, transaction=True).set(
+            'counter', 1
+        ).script(script, keys=['counter']).get('counter').execute()
+
+        self.assertEqual(results, [True, 2, b'2'])
+
+    async def test_new_script_keeps_pipeline_order(self):
+        script = self.script()
+        results = await RedisBatch(self.channel_layer).script(
+            script, keys=['counter']
+        ).incr('counter').script(script, keys=['counter']).execute()
+
+        self.assertEqual(results, [1, 2, 3])
+
+    async def test_script_is_loaded_once_per_shard(self):
+        script = self.script()
+        await RedisBatch(self.channel_layer).script(
+            script, keys=['counter']
+        ).execute()
+
+        # Второй пакет уже не загружает скрипт, на каком бы соединении
+        # шарда он ни выполнялся.
+        # The second batch does not load the script any more, whatever
+        # connection of the shard it runs on.
+        self.assertIn(script.sha,
+                      loaded_scripts[self.channel_layer.pools[0]])
+        self.assertEqual(await RedisBatch(self.channel_layer).script(
+            script, keys=['counter']
+        ).execute(), [2])
+
+
+class AuthCacheTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache = AuthCache(10, 30, 600)
+
+    async def shared(self, username):
+        return (await self.cache.batch(username).get(
+            AUTH_CACHE_KEY.format(username), encoding='utf8'
+        ).execute())[0]
+
+    async def test_load_started_before_discard_is_not_stored(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+        hashes = iter(['stale', 'fresh'])
+
+        async def load(username):
+            started.set()
+            await release.wait()
+            return next(hashes)
+
+        lookup = asyncio.ensure_future(self.cache.lookup('user', load))
+        await started.wait()
+        await self.cache.discard('user')
+        release.set()
+
+        # Начатая проверка получает свой хеш, но кэш его не хранит.
+        # The lookup in flight gets its hash, but the cache does not keep it.
+        self.assertEqual(await lookup, 'stale')
+        self.assertIsNone(self.cache.get_local('user'))
+        self.assertIsNone(await self.shared('user'))
+
+        self.assertEqual(await self.cache.lookup('user', load), 'fresh')
+        self.assertEqual(self.cache.get_local('user'), 'fresh')
+        self.assertEqual(await self.shared('user'), 'fresh')
+
+    async def test_discard_in_another_process_blocks_the_shared_write(self):
+        other = AuthCache(10, 30, 600)
+        release = asyncio.Event()
+
+        async def load(username):
+            await release.wait()
+            return 'stale'
+
+        lookup = asyncio.ensure_future(self.cache.lookup('user', load))
+        await asyncio.sleep(0.05)
+        await other.discard('user')
+        release.set()
+        await lookup
+
+        self.assertIsNone(await self.shared('user'))
+
+
+class AuthSignalTests(RedisTestCase, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('signal_user', password='first')
+        auth_cache.set_local('signal_user',
+                             self.user._legacy_get_session_auth_hash())
+
+    def cached(self):
+        return auth_cache.get_local('signal_user')
+
+    def test_login_save_keeps_the_cache(self):
+        user = User.objects.get(username='signal_user')
+        user.save(update_fields=['last_login'])
+        user.first_name = 'Name'
+        user.save()
+
+        self.assertIsNotNone(self.cached())
+
+    def test_password_change_drops_the_cache(self):
+        user = User.objects.get(username='signal_user')
+        user.set_password('second')
+        user.save()
+
+        self.assertIsNone(self.cached())
+
+    def test_delete_drops_the_cache(self):
+        self.user.delete()
+
+        self.assertIsNone(self.cached())
+
+    def test_redis_error_is_logged(self):
+        async def discard(username):
+            raise ConnectionError('redis is down')
+
+        auth_cache.discard, original = discard, auth_cache.discard
+
+        try:
+            with self.assertLogs('master.signals', 'ERROR'):
+                self.user.set_password('second')
+                self.user.save()
+        finally:
+            auth_cache.discard = original
+
+
+class DatabaseTests(TestCase):
+
+    def test_sqlite_runs_in_wal_mode(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            # NORMAL; журнал тестовой базы в памяти не бывает WAL.
+            # NORMAL; the journal of an in-memory test database is never
+            # WAL.
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class RoomEngineTests(RedisTestCase):
+
+    async def owned_room(self, name='room_1'):
+        """
+        Движок, владеющий комнатой name, и её состояние в памяти.
+
+        An engine owning the room name and its state in memory.
+        """
+        engine = RoomEngine(channel_layer=self.channel_layer)
+        engine.channel = await self.channel_layer.new_channel('engine')
+        await engine.batch(name).hmset_dict(name, {
+            'room_member': 'member', 'room_guest': 'guest'
+        }).execute()
+        self.assertEqual(await engine.owner(name), engine.channel)
+        return engine, await engine.load(name)
+
+    async def owner(self, engine, name='room_1'):
+        return (await engine.batch(name).get(
+            OWNER_KEY.format(name), encoding='utf8'
+        ).execute())[0]
+
+    async def messages(self, engine, name='room_1'):
+        return (await engine.batch(name).llen(
+            MESSAGES_KEY.format(name)
+        ).execute())[0]
+
+    async def take_over(self, engine, name='room_1'):
+        await engine.batch(name).set(OWNER_KEY.format(name), 'other',
+                                     expire=30).execute()
+
+    async def test_refresh_keeps_a_foreign_owner(self):
+        engine, room = await self.owned_room()
+        await self.take_over(engine)
+        room.append_message('member', 'hello')
+        engine.dirty.add('room_1')
+        engine.refresh_at = 0
+        await engine.flush()
+
+        self.assertEqual(await self.owner(engine), 'other')
+        self.assertIsNone(engine.local('room_1'))
+        self.assertEqual(await self.messages(engine), 1)
+
+    async def test_release_keeps_a_foreign_owner(self):
+        engine, _ = await self.owned_room()
+        await self.take_over(engine)
+        await engine.release('room_1')
+
+        self.assertEqual(await self.owner(engine), 'other')
+
+    async def test_idle_room_is_written_before_release(self):
+        engine, room = await self.owned_room()
+        room.append_message('member', 'hello')
+        room.touched -= ROOM_TTL + 1
+        engine.refresh_at = 0
+        await engine.flush()
+
+        self.assertIsNone(engine.local('room_1'))
+        self.assertIsNone(await self.owner(engine))
+        self.assertEqual(await self.messages(engine), 1)
+
+    async def test_skipped_seq_is_applied_once(self):
+        _, room = await self.owned_room()
+
+        self.assertFalse(room.is_retry('member', 1))
+        self.assertFalse(room.is_retry('member', 4))
+        self.assertEqual(room.fields['member:skipped'], '2,3')
+        self.assertFalse(room.is_retry('member', 3))
+        self.assertTrue(room.is_retry('member', 3))
+        self.assertTrue(room.is_retry('member', 4))
+
+        # Пропуски старше окна забываются.
+        # Skips older than the window are forgotten.
+        self.assertFalse(room.is_retry('member', 4 + SEQ_WINDOW))
+        self.assertTrue(room.is_retry('member', 2))
+        self.assertEqual(room.fields['member:skipped'], ','.join(
+            str(seq) for seq in range(5, 4 + SEQ_WINDOW)
+        ))
+
+    async def test_forwarded_drop_is_applied_by_the_owner(self):
+        engine, room = await self.owned_room()
+        room.append_message('member', 'hello')
+        engine.dirty.add('room_1')
+        other = RoomEngine(channel_layer=self.channel_layer)
+        other.channel = await self.channel_layer.new_channel('engine')
+        task = asyncio.ensure_future(engine.receive_loop())
+
+        async def dropped():
+            while engine.local('room_1') is not None:
+                await asyncio.sleep(0.01)
+
+        try:
+            await other.submit('room_1', 'drop',
+                               {'players': ['member', 'guest']})
+            await asyncio.wait_for(dropped(), TIMEOUT)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        # Запись владельца после удаления не создаёт комнату заново.
+        # A write by the owner after the removal does not create the room
+        # again.
+        engine.refresh_at = 0
+        await engine.flush()
+        exists, archived = await engine.batch('room_1').exists(
+            'room_1', MESSAGES_KEY.format('room_1')
+        ).zrange(ARCHIVE_KEY, encoding='utf8').execute()
+        self.assertEqual(exists, 0)
+        self.assertEqual(archived, ['["room_1", "member", "guest"]'])
+        self.assertIsNone(await self.owner(engine))
+
+    async def test_receive_error_is_retried(self):
+        engine = RoomEngine(channel_layer=channel_layers.make_backend(
+            DEFAULT_CHANNEL_LAYER
+        ))
+        engine.channel = await engine.channel_layer.new_channel('engine')
+        calls = []
+
+        async def receive(channel):
+            calls.append(channel)
+
+            if len(calls) == 1:
+                raise ConnectionError('redis is down')
+            await asyncio.Future()
+
+        engine.channel_layer.receive = receive
+        task = asyncio.ensure_future(engine.receive_loop())
+
+        async def retried():
+            while len(calls) < 2:
+                await asyncio.sleep(0.1)
+
+        try:
+            with self.assertLogs('master.engine', 'ERROR'):
+                await asyncio.wait_for(retried(), TIMEOUT)
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        self.assertEqual(calls, [engine.channel] * 2)
+
+
+class Spectator:
+
+    binary = False
+
+    def __init__(self):
+        self.frames = asyncio.Queue()
+
+    async def base_send(self, message):
+        await self.frames.put(message['text'])
+
+
+class BroadcastHubTests(RedisTestCase):
+
+    async def test_receive_error_is_retried(self):
+        hub = BroadcastHub(channel_layer=channel_layers.make_backend(
+            DEFAULT_CHANNEL_LAYER
+        ))
+        calls = []
+
+        async def receive(channel):
+            calls.append(channel)
+
+            if len(calls) == 1:
+                raise ConnectionError('redis is down')
+
+            if len(calls) == 2:
+                return {'type': 'action', 'action_type': 'shot',
+                        'params': {'cell': 'a1'}, 'version': 1}
+            await asyncio.Future()
+
+        hub.channel_layer.receive = receive
+        spectator = Spectator()
+
+        try:
+            with self.assertLogs('master.broadcast', 'ERROR'):
+                await hub.subscribe('room_1', spectator)
+                await hub.ready('room_1', spectator, 0)
+                frame = await asyncio.wait_for(spectator.frames.get(),
+                                               TIMEOUT)
+        finally:
+            await hub.unsubscribe('room_1', spectator)
+            hub.refresh_task.cancel()
+        self.assertIn('"action_type": "shot"', frame)
+        self.assertEqual(len(set(calls)), 1)
+
+
+class ChannelReaderTests(RedisTestCase):
+
+    class Consumer:
+
+        def __init__(self):
+            self.messages = []
+
+        async def dispatch(self, message):
+            self.messages.append(message)
+
+    async def test_one_reader_serves_several_channels(self):
+        channel_reader = reader.ChannelReader(
+            channel_layer=self.channel_layer, batch=3
+        )
+        consumers = [self.Consumer() for _ in range(3)]
+        channels = [channel_reader.add(consumer, 'user_{}'.format(number))
+                    for number, consumer in enumerate(consumers)]
+        # Приём ведёт тест, а не задача приёмника.
+        # The test receives, not the reader task.
+        await channel_reader.stop()
+
+        for number, channel in enumerate(channels):
+            self.assertEqual(reader.channel_username(channel),
+                             'user_{}'.format(number))
+            await self.channel_layer.send(channel, {'type': 'direct',
+                                                    'number': number})
+        await self.channel_layer.group_add('room_1', channels[0])
+        await self.channel_layer.group_add('room_1', channels[1])
+        await self.channel_layer.group_send('room_1', {'type': 'group'})
+
+        # Все каналы в одной очереди, пачка - до batch сообщений, а
+        # сообщение группы приходит один раз для двух каналов.
+        # All the channels share one queue, a batch holds up to batch
+        # messages, and the group message arrives once for both channels.
+        batches = [await channel_reader.receive() for _ in range(2)]
+        self.assertEqual([len(messages) for messages in batches], [3, 1])
+        self.assertEqual(sorted(batches[1][0]['__asgi_channel__']),
+                         sorted(channels[:2]))
+
+        channel_reader.discard(channels[2])
+        dropped = DROPPED_MESSAGES.values.get((), 0)
+
+        for message in batches[0] + batches[1]:
+            await channel_reader.deliver(message.pop('__asgi_channel__'),
+                                         message)
+        self.assertEqual(consumers[0].messages, [
+            {'type': 'direct', 'number': 0}, {'type': 'group'}
+        ])
+        self.assertEqual(consumers[1].messages, [
+            {'type': 'direct', 'number': 1}, {'type': 'group'}
+        ])
+        self.assertEqual(consumers[2].messages, [])
+        self.assertEqual(DROPPED_MESSAGES.values.get((), 0), dropped + 1)
+
+
+class LobbyTests(RedisTestCase):
+
+    def make_lobby(self):
+        # Рассылки ведёт тест (tick(now=...)), а не задача лобби.
+        # The test runs the broadcasts (tick(now=...)), not the lobby task.
+        channel_reader = reader.ChannelReader(channel_layer=self.channel_layer)
+        return lobby.Lobby(channel_layer=self.channel_layer,
+                           reader=channel_reader, interval=3600,
+                           heartbeat=10, ttl=30), channel_reader
+
+    async def deliver(self, channel_reader):
+        messages = await channel_reader.receive()
+
+        for message in messages:
+            await channel_reader.deliver(message.pop('__asgi_channel__'),
+                                         message)
+        return messages
+
+    async def expiry(self, users, username):
+        return (await users.batch().zscore(
+            lobby.PRESENCE_KEY, username
+        ).execute())[0]
+
+    async def test_changes_are_batched_into_one_diff(self):
+        users, channel_reader = self.make_lobby()
+        subscriber = Spectator()
+        users.subscribe(subscriber)
+        now = time.time()
+        await users.tick(now=now)
+        # Приём ведёт тест, а не задача приёмника.
+        # The test receives, not the reader task.
+        await channel_reader.stop()
+        self.assertEqual(json.loads(subscriber.frames.get_nowait()),
+                         {'context': 'lobby', 'users': [], 'rooms': {}})
+
+        users.connect('alice')
+        users.connect('bob')
+        users.connect('carol')
+        users.disconnect('carol')
+        await users.tick(now=now + 1)
+
+        # Изменения за интервал - одно сообщение группы, а пользователь,
+        # ушедший до рассылки, в нём не появляется.
+        # The changes of an interval are one group message, and a user gone
+        # before the broadcast does not show up in it.
+        messages = await self.deliver(channel_reader)
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(sorted(messages[0]['joined']), ['alice', 'bob'])
+        self.assertEqual(messages[0]['left'], [])
+        self.assertTrue(subscriber.frames.empty())
+
+        room, _ = await Matchmaker(self.channel_layer).match_room('dave')
+        await users.tick(now=now + 2)
+        frame = json.loads(subscriber.frames.get_nowait())
+        frame['joined'].sort()
+        self.assertEqual(frame, {'context': 'lobby_diff',
+                                 'joined': ['alice', 'bob'], 'left': [],
+                                 'opened': {room: 'dave'}, 'closed': []})
+
+        # Без изменений кадр не отправляется.
+        # No frame is sent without changes.
+        await users.tick(now=now + 3)
+        self.assertTrue(subscriber.frames.empty())
+        await users.stop()
+
+    async def test_heartbeat_extends_presence_until_ttl(self):
+        users, _ = self.make_lobby()
+        users.connect('alice')
+        now = time.time()
+        await users.tick(now=now)
+        self.assertAlmostEqual(await self.expiry(users, 'alice'), now + 30,
+                               places=3)
+
+        # Между продлениями присутствие не переписывается.
+        # Presence is not rewritten between the heartbeats.
+        await users.tick(now=now + 5)
+        self.assertAlmostEqual(await self.expiry(users, 'alice'), now + 30,
+                               places=3)
+        await users.tick(now=now + 10)
+        self.assertAlmostEqual(await self.expiry(users, 'alice'), now + 40,
+                               places=3)
+        # Процесс alice больше не продлевает её (например, упал).
+        # The process of alice no longer extends her (e.g. it has died).
+        await users.stop()
+
+        other, channel_reader = self.make_lobby()
+        subscriber = Spectator()
+        other.subscribe(subscriber)
+        await other.tick(now=now + 20)
+        await channel_reader.stop()
+        self.assertEqual(json.loads(subscriber.frames.get_nowait()),
+                         {'context': 'lobby', 'users': ['alice'],
+                          'rooms': {}})
+
+        # Продление другого процесса убирает тех, чьё время вышло.
+        # The heartbeat of another process removes the expired users.
+        await other.tick(now=now + 41)
+        self.assertIsNone(await self.expiry(other, 'alice'))
+        self.assertEqual(await other.read_users(now + 41), [])
+        messages = await self.deliver(channel_reader)
+        self.assertEqual([(message['joined'], message['left'])
+                          for message in messages], [([], ['alice'])])
+
+        await other.tick(now=now + 42)
+        self.assertEqual(json.loads(subscriber.frames.get_nowait()),
+                         {'context': 'lobby_diff', 'joined': [],
+                          'left': ['alice'], 'opened': {}, 'closed': []})
+        await other.stop()
+
+    async def test_new_subscribers_get_the_state_and_others_the_diff(self):
+        users, channel_reader = self.make_lobby()
+        matchmaker = Matchmaker(self.channel_layer)
+        first = Spectator()
+        users.subscribe(first)
+        room, _ = await matchmaker.match_room('member')
+        now = time.time()
+        await users.tick(now=now)
+        await channel_reader.stop()
+        self.assertEqual(json.loads(first.frames.get_nowait()),
+                         {'context': 'lobby', 'users': [],
+                          'rooms': {room: 'member'}})
+
+        second = Spectator()
+        users.subscribe(second)
+        await matchmaker.match_room('guest')
+        other_room, _ = await matchmaker.match_room('another')
+        await users.tick(now=now + 1)
+
+        # Подписчик получает либо состояние лобби, либо разницу, но не оба.
+        # A subscriber gets either the lobby state or the diff, not both.
+        self.assertEqual(json.loads(first.frames.get_nowait()),
+                         {'context': 'lobby_diff', 'joined': [], 'left': [],
+                          'opened': {other_room: 'another'},
+                          'closed': [room]})
+        self.assertEqual(json.loads(second.frames.get_nowait()),
+                         {'context': 'lobby', 'users': [],
+                          'rooms': {other_room: 'another'}})
+        self.assertTrue(first.frames.empty())
+        self.assertTrue(second.frames.empty())
+        await users.stop()
+
+
+class MatchmakerTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.matchmaker = Matchmaker(self.channel_layer)
+
+    async def test_concurrent_players_share_one_room(self):
+        results = await asyncio.gather(*[
+            self.matchmaker.match_room('player_{}'.format(number))
+            for number in range(2)
+        ])
+
+        self.assertEqual(results[0][0], results[1][0])
+        self.assertEqual(sorted(created for _, created in results),
+                         [False, True])
+
+    async def test_open_room_gets_one_guest(self):
+        room, created = await self.matchmaker.match_room('member')
+        self.assertTrue(created)
+
+        results = await asyncio.gather(*[
+            self.matchmaker.match_room('guest_{}'.format(number))
+            for number in range(9)
+        ])
+        guests = [number for number, (joined, _) in enumerate(results)
+                  if joined == room]
+
+        self.assertEqual(len(guests), 1)
+        # Остальные гости встали в очередь парами.
+        # The other guests were paired up in the queue.
+        self.assertEqual(len({joined for joined, _ in results}), 5)
+        self.assertEqual(
+            await self.matchmaker.batch().zcard(OPEN_ROOMS_KEY).execute(), [0]
+        )
+
+    async def test_guest_is_recorded_with_member(self):
+        room, _ = await self.matchmaker.match_room('member')
+        await self.matchmaker.match_room('guest')
+
+        self.assertEqual(
+            await self.matchmaker.batch(room).hmget(
+                room, 'room_member', 'room_guest', encoding='utf8'
+            ).execute(),
+            [['member', 'guest']]
+        )
+        self.assertEqual(await self.matchmaker.find_user_room('guest'), room)
+
+    async def open_rooms(self):
+        return (await self.matchmaker.batch().zrange(
+            OPEN_ROOMS_KEY, encoding='utf8'
+        ).execute())[0]
+
+    async def test_join_room_takes_the_chosen_room_once(self):
+        room, _ = await self.matchmaker.match_room('member')
+        joined = await asyncio.gather(*[
+            self.matchmaker.join_room(room, 'guest_{}'.format(number))
+            for number in range(5)
+        ])
+
+        self.assertEqual(joined.count(True), 1)
+        guest = 'guest_{}'.format(joined.index(True))
+        self.assertEqual(
+            await self.matchmaker.batch(room).hmget(
+                room, 'room_member', 'room_guest', encoding='utf8'
+            ).execute(),
+            [['member', guest]]
+        )
+        self.assertEqual(await self.matchmaker.find_user_room(guest), room)
+        self.assertEqual(await self.open_rooms(), [])
+
+    async def test_join_room_rejects_an_expired_room(self):
+        room, _ = await self.matchmaker.match_room('member')
+        await self.matchmaker.batch().zadd(OPEN_ROOMS_KEY, time.time() - 1,
+                                           room).execute()
+
+        self.assertFalse(await self.matchmaker.join_room(room, 'guest'))
+        self.assertIsNone(await self.matchmaker.find_user_room('guest'))
+        # Истёкшая комната убрана из очереди.
+        # The expired room is taken off the queue.
+        self.assertEqual(await self.open_rooms(), [])
+
+    async def test_join_room_rejects_the_own_room(self):
+        room, _ = await self.matchmaker.match_room('member')
+
+        self.assertFalse(await self.matchmaker.join_room(room, 'member'))
+        self.assertEqual(
+            await self.matchmaker.batch(room).hget(
+                room, 'room_guest', encoding='utf8'
+            ).execute(),
+            ['None']
+        )
+        # Своя комната остаётся открытой для других.
+        # The own room stays open for others.
+        self.assertEqual(await self.open_rooms(), [room])
+        self.assertTrue(await self.matchmaker.join_room(room, 'guest'))
+
+
+class ShardingTests(RedisTestCase):
+    """
+    Два шарда - две базы одного redis (REDIS_DB и TEST_REDIS_SHARD_DB).
+
+    Two shards are two databases of one redis (REDIS_DB and
+    TEST_REDIS_SHARD_DB).
+    """
+
+    def setUp(self):
+        host = settings.REDIS_HOSTS[0]
+        self.channel_layer = RedisChannelLayer(hosts=[
+            host, dict(host, db=settings.TEST_REDIS_SHARD_DB)
+        ])
+        self.addCleanup(async_to_sync(self.channel_layer.close_pools))
+        async_to_sync(self.flush)()
+
+    async def keys(self, index):
+        async with self.channel_layer.connection(index) as connection:
+            return sorted(key.decode('utf8')
+                          for key in await connection.keys('*'))
+
+    async def test_names_hash_like_channels_redis_groups(self):
+        names = ['room_{}'.format(number) for number in range(20)]
+        names += ['player_{}'.format(number) for number in range(20)]
+        other = RedisChannelLayer(hosts=self.channel_layer.hosts)
+
+        for name in names:
+            self.assertEqual(shard(self.channel_layer, name),
+                             self.channel_layer.consistent_hash(name))
+            self.assertEqual(shard(self.channel_layer, name),
+                             shard(other, name))
+        self.assertEqual({shard(self.channel_layer, name) for name in names},
+                         {0, 1})
+
+    async def test_room_state_lives_with_its_group(self):
+        matchmaker = Matchmaker(self.channel_layer)
+        rooms = [(await matchmaker.match_room('player_{}'.format(number)))[0]
+                 for number in range(20)]
+        channel = await self.channel_layer.new_channel('player')
+
+        for room in rooms:
+            await self.channel_layer.group_add(room, channel)
+        keys = [await self.keys(index) for index in range(2)]
+        self.assertEqual({shard(self.channel_layer, room) for room in rooms},
+                         {0, 1})
+
+        for room in rooms:
+            index = shard(self.channel_layer, room)
+            self.assertIn(room, keys[index])
+            self.assertIn('asgi:group:' + room, keys[index])
+            self.assertNotIn(room, keys[1 - index])
+
+        # Ключи подбора и ссылки пользователей - только на первом шарде.
+        # The matchmaking keys and the user pointers are on the first
+        # shard only.
+        self.assertIn(USER_ROOM_KEY.format('player_0'), keys[0])
+        self.assertIn(ROOM_COUNTER_KEY, keys[0])
+        self.assertFalse([key for key in keys[1]
+                          if key.startswith('matchmaking:')])
+
+
+class ReaperTests(RedisTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.reaper = RoomReaper(channel_layer=self.channel_layer,
+                                 grace=120, idle_ttl=1800)
+        self.now = time.time()
+
+    async def room(self, name, idle, connected=False,
+                   players=('member', 'guest')):
+        """
+        Комната, не отмечавшаяся idle секунд, со ссылками игроков на неё и,
+        если connected, с каналом в группе.
+
+        A room not marked for idle seconds, with the player pointers to it
+        and, if connected, with a channel in the group.
+        """
+        batch = RedisBatch(self.channel_layer, 0).hmset_dict(name, {
+            'room_member': players[0], 'room_guest': players[1]
+        }).zadd(ACTIVITY_KEY, self.now - idle, name)
+
+        for player in players:
+            batch.set(USER_ROOM_KEY.format(player), name)
+        await batch.execute()
+
+        if connected:
+            channel = await self.channel_layer.new_channel('player')
+            await self.channel_layer.group_add(name, channel)
+            return channel
+
+    async def live(self):
+        return (await RedisBatch(self.channel_layer, 0).zrange(
+            ACTIVITY_KEY, encoding='utf8'
+        ).execute())[0]
+
+    @staticmethod
+    def reaped(reason):
+        return ROOMS_REAPED.values.get((reason,), 0)
+
+    async def test_abandoned_and_idle_rooms_are_removed(self):
+        await self.room('room_1', 200, players=('a', 'b'))
+        await self.room('room_2', 200, connected=True, players=('c', 'd'))
+        await self.room('room_3', 2000, connected=True, players=('e', 'f'))
+        await self.room('room_4', 10, players=('g', 'h'))
+        abandoned, idle = self.reaped('abandoned'), self.reaped('idle')
+
+        self.assertEqual(await self.reaper.reap(self.now), 2)
+        self.assertEqual(self.reaped('abandoned'), abandoned + 1)
+        self.assertEqual(self.reaped('idle'), idle + 1)
+        self.assertEqual(sorted(await self.live()), ['room_2', 'room_4'])
+        self.assertEqual(self.reaper.live, {0: 2})
+
+        exists, archived = await RedisBatch(self.channel_layer, 0).exists(
+            'room_1', 'room_3', 'asgi:group:room_3'
+        ).zrange(ARCHIVE_KEY, encoding='utf8').execute()
+        self.assertEqual(exists, 0)
+        self.assertEqual(sorted(archived), ['["room_1", "a", "b"]',
+                                            '["room_3", "e", "f"]'])
+
+    async def test_idle_room_is_notified_before_removal(self):
+        channel = await self.room('room_1', 2000, connected=True)
+        remove, order = self.reaper.remove, []
+
+        async def notified_remove(index, rooms):
+            message = await asyncio.wait_for(
+                self.channel_layer.receive(channel), TIMEOUT
+            )
+            exists = await RedisBatch(self.channel_layer, 0).exists(
+                'room_1'
+            ).execute()
+            order.append((message, exists[0]))
+            await remove(index, rooms)
+
+        self.reaper.remove = notified_remove
+        self.assertEqual(await self.reaper.reap(self.now), 1)
+        self.assertEqual(order, [({'type': 'notification',
+                                   'message': 'exit_room'}, 1)])
+        self.assertEqual(await self.live(), [])
+
+    async def test_pages_skip_the_kept_rooms(self):
+        self.reaper.batch_size = 2
+        kept = {1, 3, 6}
+
+        for number in range(8):
+            await self.room('room_{}'.format(number), 1000 - number,
+                            connected=number in kept,
+                            players=('a{}'.format(number),
+                                     'b{}'.format(number)))
+
+        self.assertEqual(await self.reaper.reap(self.now), 5)
+        self.assertEqual(sorted(await self.live()),
+                         ['room_{}'.format(number) for number in kept])
+
+    async def test_one_process_reaps_a_shard_at_a_time(self):
+        other = RoomReaper(channel_layer=self.channel_layer, grace=120)
+        await self.room('room_1', 200)
+        self.assertEqual(await other.reap(self.now), 1)
+
+        # Блокировку держит other: этот процесс пропускает шард.
+        # other holds the lock: this process skips the shard.
+        await self.room('room_2', 200, players=('c', 'd'))
+        self.reaper.live = {0: 5}
+        self.assertEqual(await self.reaper.reap(self.now), 0)
+        self.assertEqual(self.reaper.live, {})
+        self.assertEqual(await self.live(), ['room_2'])
+
+        self.assertEqual(await self.reaper.reap(self.now, lock=False), 1)
+
+    async def test_removed_rooms_leave_matchmaking(self):
+        matchmaker = Matchmaker(self.channel_layer)
+        open_room, _ = await matchmaker.match_room('member')
+        await self.room('room_9', 200, players=('other', 'guest'))
+        await RedisBatch(self.channel_layer, 0).set(
+            USER_ROOM_KEY.format('guest'), 'room_10'
+        ).execute()
+
+        self.assertEqual(await self.reaper.reap(self.now + 200), 2)
+        queue, members, pointers = await matchmaker.batch().zrange(
+            OPEN_ROOMS_KEY
+        ).hgetall(OPEN_ROOM_MEMBERS_KEY).mget(
+            USER_ROOM_KEY.format('member'), USER_ROOM_KEY.format('other'),
+            USER_ROOM_KEY.format('guest'), encoding='utf8'
+        ).execute()
+        self.assertEqual(open_room, 'room_1')
+        self.assertEqual((queue, members), ([], {}))
+
+        # Ссылка игрока, ушедшего в другую комнату, остаётся.
+        # The pointer of a player who moved to another room stays.
+        self.assertEqual(pointers, [None, None, 'room_10'])
+
+
+def game_entries(member='member', guest='guest'):
+    """
+    История короткой игры: guest топит единственный корабль member.
+
+    The history of a short game: guest sinks the only ship of member.
+    """
+    return [
+        history.entry(history.PLACEMENT, member, board.encode(0b11).hex()),
+        history.entry(history.PLACEMENT, guest, board.encode(1 << 99).hex()),
+        history.entry(history.MISS, member, 5),
+        history.entry(history.HIT, guest, 0),
+        history.entry(history.CHAT, member, 'gg'),
+        history.entry(history.HIT, guest, 1),
+        history.entry(history.LOSE, member)
+    ]
+
+
+class HistoryTests(SimpleTestCase):
+
+    def test_replay_rebuilds_the_client_state(self):
+        entries = [json.loads(entry) for entry in game_entries()]
+        state = history.replay(('member', 'guest'), entries)
+
+        self.assertEqual(history.loser(entries), 'member')
+        self.assertEqual((state['game_status'], state['winner']),
+                         ('finished', 'guest'))
+        self.assertEqual(json.loads(state['member:selected_cells']),
+                         board.to_cells(0b11))
+        self.assertEqual(json.loads(state['member:dead_cells']),
+                         board.to_cells(0b11))
+        self.assertEqual(state['guest:hit_cells'],
+                         state['member:dead_cells'])
+        self.assertEqual(json.loads(state['member:miss_cells']),
+                         [board.cell_id(5)])
+        self.assertEqual(json.loads(state['messages']), [
+            {'id': '1', 'sender': 'member', 'message': 'gg'}
+        ])
+
+    def test_replay_stops_after_upto_entries(self):
+        entries = [json.loads(entry) for entry in game_entries()]
+        state = history.replay(('member', 'guest'), entries, 4)
+
+        self.assertEqual(state['game_status'], 'started')
+        self.assertNotIn('winner', state)
+        self.assertEqual(json.loads(state['member:dead_cells']),
+                         [board.cell_id(0)])
+        self.assertEqual(json.loads(state['messages']), [])
+        self.assertIsNone(history.loser(entries[:4]))
+
+
+class ArchiveTests(RedisTestCase, TransactionTestCase):
+
+    async def queue(self, room, players, entries, ended):
+        batch = RedisBatch(self.channel_layer, 0)
+
+        if entries:
+            batch.rpush(HISTORY_KEY.format(room), *entries)
+        await archive(batch, room, players, now=ended).execute()
+
+    @staticmethod
+    def archived(result):
+        return GAMES_ARCHIVED.values.get((result,), 0)
+
+    async def test_drain_moves_waiting_histories_in_batches(self):
+        archiver = GameArchiver(channel_layer=self.channel_layer, grace=5,
+                                batch_size=2)
+        now = time.time()
+        await self.queue('room_1', ['member', 'guest'], game_entries(),
+                         now - 30)
+        await self.queue('room_2', ['solo', None],
+                         [history.entry(history.CHAT, 'solo', 'hi')],
+                         now - 20)
+        await self.queue('room_3', ['a', 'b'], [], now - 10)
+        await self.queue('room_4', ['c', 'd'], game_entries('c', 'd'), now)
+        finished, abandoned = self.archived('finished'), self.archived(
+            'abandoned'
+        )
+
+        self.assertEqual(await archiver.drain(now), 2)
+        games = await database_sync_to_async(list)(
+            Game.objects.order_by('room')
+        )
+        self.assertEqual(
+            [(game.room, game.member, game.guest, game.winner, game.length)
+             for game in games],
+            [('room_1', 'member', 'guest', 'guest', 7),
+             ('room_2', 'solo', '', '', 1)]
+        )
+        self.assertEqual(games[0].entries(),
+                         [json.loads(entry) for entry in game_entries()])
+        self.assertEqual(self.archived('finished'), finished + 1)
+        self.assertEqual(self.archived('abandoned'), abandoned + 1)
+
+        # Комната, ждущая меньше grace, остаётся в очереди с историей.
+        # A room waiting for less than grace stays queued with its history.
+        waiting, kept = await RedisBatch(self.channel_layer, 0).zrange(
+            ARCHIVE_KEY, encoding='utf8'
+        ).exists(*[HISTORY_KEY.format('room_{}'.format(number))
+                   for number in range(1, 5)]).execute()
+        self.assertEqual(waiting, ['["room_4", "c", "d"]'])
+        self.assertEqual(kept, 1)
+
+
+class ReplayViewTests(TestCase):
+
+    def setUp(self):
+        self.game = Game.objects.create(
+            room='room_1', member='member', guest='guest', winner='guest',
+            ended_at=datetime.datetime.now(datetime.timezone.utc),
+            length=7, history=history.compress(game_entries())
+        )
+        self.url = '/games/{}/replay/'.format(self.game.pk)
+
+    def login(self, username):
+        self.client.force_login(User.objects.create(username=username))
+
+    def test_players_get_the_replay(self):
+        self.login('guest')
+        response = self.client.get(self.url, {'upto': 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: value for key, value in response.json().items()
+             if key != 'data'},
+            {'room': 'room_1', 'winner': 'guest', 'length': 7}
+        )
+        self.assertEqual(response.json()['data'], self.game.replay(4))
+
+    def test_other_users_do_not_see_the_game(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+        self.login('stranger')
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class ShotPlannerTests(SimpleTestCase):
+
+    def test_planner_sinks_fleets_without_repeating_a_cell(self):
+        planner = bots.ShotPlanner(seed=1)
+        rng = random.Random(1)
+        fleets = [board.to_mask(board.random_fleet(rng)) for _ in range(20)]
+        hits, misses = [0] * len(fleets), [0] * len(fleets)
+        playing = set(range(len(fleets)))
+
+        # Все игры делают ход одним шагом планировщика.
+        # All the games move in one planner step.
+        while playing:
+            games = sorted(playing)
+            cells = planner.choose_masks([(hits[game], misses[game])
+                                          for game in games])
+
+            for game, cell in zip(games, cells):
+                bit = 1 << cell
+                self.assertFalse((hits[game] | misses[game]) & bit)
+
+                if fleets[game] & bit:
+                    hits[game] |= bit
+                else:
+                    misses[game] |= bit
+
+                if hits[game] == fleets[game]:
+                    playing.discard(game)
+
+    async def test_queue_decides_pending_shots_in_one_step(self):
+        steps = []
+
+        class Planner:
+            def choose_masks(self, games):
+                steps.append(games)
+                return [hits + 1 for hits, _ in games]
+
+        queue = bots.ShotQueue(Planner(), window=0.01)
+        cells = await asyncio.gather(*[queue.choose(hits, 0)
+                                       for hits in range(5)])
+
+        self.assertEqual(cells, [1, 2, 3, 4, 5])
+        self.assertEqual(steps, [[(hits, 0) for hits in range(5)]])
+
+    def test_bot_tracks_its_shots_and_turns(self):
+        bot = bots.Bot('room_1', None)
+        name = bot.username
+        cells = [board.cell_id(index) for index in (0, 11, 22, 33)]
+        frames = [
+            ({'context': 'notification', 'type': 'start_game'}, False),
+            ({'context': 'action', 'action_type': 'miss',
+              'params': 'member,' + cells[0]}, True),
+            ({'context': 'action', 'action_type': 'hit',
+              'params': 'member,' + cells[1]}, False),
+            ({'context': 'action', 'action_type': 'hit',
+              'params': name + ',' + cells[2]}, True),
+            ({'context': 'action', 'action_type': 'miss',
+              'params': name + ',' + cells[3]}, False),
+            ({'context': 'throttled', 'request': 'shot'}, True)
+        ]
+
+        for frame, my_turn in frames:
+            self.assertFalse(bot.handle(frame))
+            self.assertEqual(bot.my_turn, my_turn)
+        self.assertEqual((bot.hits, bot.misses), (1 << 11, 1 << 33))
+
+        self.assertTrue(bot.handle({'context': 'action',
+                                    'action_type': 'lose',
+                                    'params': 'member'}))
+        self.assertEqual(bot.result, 'won')
+
+
+class BotGameTests(ConsumerTestCase):
+
+    async def test_bot_plays_a_game_to_the_end(self):
+        engine = bots.BotEngine(channel_layer=self.channel_layer, wait=0,
+                                think_time=0)
+        member, state = await self.connect('test_0')
+        room = state['room']
+        await member.send({'context': 'player_ready',
+                           'selected_cells': board.random_fleet()})
+        self.assertEqual(await engine.invite(), [room])
+
+        # Игра начинается, только если сервер принял флот бота.
+        # The game starts only if the server accepted the bot fleet.
+        await self.receive_until(member, 'notification', type='start_game')
+        cell, bot_shots, loser, my_turn = 0, [], None, True
+
+        while loser is None:
+            if my_turn:
+                my_turn = False
+                await member.send({'context': 'shot',
+                                   'cell': board.cell_id(cell)})
+            frame = await member.receive(TIMEOUT)
+
+            if frame['context'] == 'ping':
+                await member.send({'context': 'pong'})
+            elif frame['context'] == 'throttled':
+                await asyncio.sleep(0.1)
+                my_turn = True
+            elif frame['context'] == 'action':
+                if frame['action_type'] == 'lose':
+                    loser = frame['params']
+                    continue
+                name, target = frame['params'].split(',')
+                own_shot = (name == 'test_0') == (
+                    frame['action_type'] == 'miss'
+                )
+
+                if own_shot:
+                    cell += 1
+                else:
+                    bot_shots.append(target)
+                my_turn = not own_shot
+        self.assertEqual(len(bot_shots), len(set(bot_shots)))
+        self.assertIn(loser, ('test_0', bots.BOT_PREFIX + room))
+
+        # Проигравший бот ждёт выхода игрока, выигравший выходит сам.
+        # A losing bot waits for the player to exit, a winning one exits
+        # itself.
+        if loser != 'test_0':
+            await member.send({'context': 'exit_room'})
+        await self.receive_until(member, 'notification', type='exit_room')
+        await asyncio.wait_for(asyncio.gather(*engine.bots), TIMEOUT)
+        await member.close()
+
+
+class ShotTests(ConsumerTestCase):
+
+    async def test_malformed_cell_is_rejected(self):
+        client, _ = await self.connect('test_0')
+        invalid = self.invalid_frames('shot')
+
+        for seq, frame in enumerate([{}, {'cell': None}, {'cell': 42},
+                                     {'cell': ['cell_A1']},
+                                     {'cell': 'cell_K1'}], 1):
+            await client.send(dict(frame, context='shot', seq=seq))
+            self.assertEqual(await client.receive(TIMEOUT), {
+                'context': 'rejected', 'request': 'shot', 'seq': seq
+            })
+        self.assertEqual(self.invalid_frames('shot'), invalid + 5)
+
+        # Соединение продолжает обрабатывать кадры.
+        # The connection keeps handling frames.
+        await client.send({'context': 'load_messages', 'before': 0})
+        self.assertEqual((await client.receive(TIMEOUT))['context'],
+                         'messages')
+        await client.close()
+
+
+class MessagesPageTests(ConsumerTestCase):
+
+    async def test_malformed_before_is_rejected(self):
+        client, _ = await self.connect('test_0')
+        invalid = self.invalid_frames('load_messages')
+
+        # Не больше запаса корзины load_messages (см. THROTTLE_*).
+        # No more than the load_messages bucket capacity (see THROTTLE_*).
+        for frame in [{}, {'before': '5'}, {'before': True},
+                      {'before': -1}]:
+            await client.send(dict(frame, context='load_messages'))
+            self.assertEqual(await client.receive(TIMEOUT), {
+                'context': 'rejected', 'request': 'load_messages'
+            })
+        self.assertEqual(self.invalid_frames('load_messages'), invalid + 4)
+
+        await client.send({'context': 'load_messages', 'before': 10})
+        self.assertEqual(await client.receive(TIMEOUT),
+                         {'context': 'messages', 'messages': []})
+        await client.close()
+
+
+class MalformedFrameTests(ConsumerTestCase):
+
+    async def test_garbage_binary_frames_are_rejected(self):
+        client, _ = await self.connect('test_0', binary=True)
+        invalid = self.invalid_frames('other')
+
+        for data in [b'', b'\xff', b'\xc1', b'\xdd\xff\xff\xff\xff']:
+            await client.communicator.send_input({'type': 'websocket.receive',
+                                                  'bytes': data})
+            self.assertEqual(await client.receive(TIMEOUT),
+                             {'context': 'rejected', 'request': None})
+        self.assertEqual(self.invalid_frames('other'), invalid + 4)
+
+        await client.send({'context': 'load_messages', 'before': 10})
+        self.assertEqual(await client.receive(TIMEOUT),
+                         {'context': 'messages', 'messages': []})
+        await client.close()
+
+
+class ReplayTests(ConsumerTestCase):
+
+    @staticmethod
+    def duplicates(context):
+        return DUPLICATE_FRAMES.values.get((context,), 0)
+
+    async def test_reconnect_storm_replays_are_only_acknowledged(self):
+        member, state = await self.connect('test_0')
+        guest, _ = await self.connect('test_1')
+        room = state['room']
+        sent = [
+            {'context': 'player_ready', 'seq': 1,
+             'selected_cells': board.random_fleet()},
+            {'context': 'send_message', 'seq': 2, 'message': 'before'},
+            {'context': 'shot', 'seq': 3, 'cell': board.cell_id(0)}
+        ]
+        await member.send(sent[0])
+        await guest.send({'context': 'player_ready', 'seq': 1,
+                          'selected_cells': board.random_fleet()})
+        await self.receive_until(member, 'notification', type='start_game')
+
+        for frame in sent[1:]:
+            await member.send(frame)
+        await self.receive_until(guest, 'message')
+        version = (await self.receive_until(guest, 'action'))['version']
+        await member.close()
+
+        # Каждое переподключение повторяет все отправленные кадры: сервер
+        # подтверждает их, не выполняя снова.
+        # Every reconnect repeats all the frames sent: the server
+        # acknowledges them without executing them again.
+        before = {frame['context']: self.duplicates(frame['context'])
+                  for frame in sent}
+
+        for _ in range(3):
+            member, state = await self.connect('test_0', room=room,
+                                               version=version)
+            self.assertEqual((state['context'], state['seq'],
+                              state['events']), ('resync', 3, []))
+
+            for frame in sent:
+                await member.send(frame)
+                self.assertEqual(
+                    await self.receive_until(member, 'duplicate'),
+                    {'context': 'duplicate', 'request': frame['context'],
+                     'seq': frame['seq']}
+                )
+            await member.close()
+
+        for frame in sent:
+            self.assertEqual(self.duplicates(frame['context']),
+                             before[frame['context']] + 3)
+
+        # Следующий кадр соперник получает сразу за первым выстрелом, а
+        # версия комнаты выросла только на него.
+        # The enemy gets the next frame right after the first shot, and
+        # the room version has grown by it only.
+        member, _ = await self.connect('test_0', room=room, version=version)
+        await member.send({'context': 'send_message', 'seq': 4,
+                           'message': 'after'})
+        frame = await guest.receive(TIMEOUT)
+
+        while frame['context'] == 'ping':
+            frame = await guest.receive(TIMEOUT)
+        self.assertEqual((frame['context'], frame['message']['message'],
+                          frame['version']), ('message', 'after', version + 1))
+        await member.close()
+        await guest.close()
+
+    async def test_throttled_frame_is_applied_after_a_later_one(self):
+        member, state = await self.connect('test_0')
+        guest, _ = await self.connect('test_1')
+        room = state['room']
+
+        async def reply(client):
+            frame = await client.receive(TIMEOUT)
+
+            while frame['context'] == 'ping':
+                frame = await client.receive(TIMEOUT)
+            return frame
+
+        def message(seq):
+            return {'context': 'send_message', 'seq': seq,
+                    'message': str(seq)}
+
+        # Кадры сверх запаса отбрасываются, и клиент узнаёт их номер.
+        # Frames beyond the burst are dropped, and the client learns their
+        # number.
+        for seq in range(1, 30):
+            await member.send(message(seq))
+            frame = await reply(member)
+
+            if frame['context'] != 'message':
+                break
+            version = frame['version']
+        self.assertEqual(frame, {'context': 'throttled',
+                                 'request': 'send_message', 'seq': seq})
+
+        await asyncio.sleep(0.5)
+        await member.send(message(seq + 1))
+        version = (await reply(member))['version']
+        await member.close()
+
+        # Номер отброшенного кадра пропущен: после переподключения кадр
+        # применяется один раз.
+        # The number of the dropped frame is skipped: after a reconnect the
+        # frame is applied once.
+        member, state = await self.connect('test_0', room=room,
+                                           version=version)
+        self.assertEqual((state['context'], state['seq'], state['skipped']),
+                         ('resync', seq + 1, [seq]))
+        await member.send(message(seq))
+        frame = await self.receive_until(guest, 'message', version=version + 1)
+        self.assertEqual(frame['message']['message'], str(seq))
+
+        for retried in (seq, seq + 1):
+            await member.send(message(retried))
+            self.assertEqual(
+                await self.receive_until(member, 'duplicate'),
+                {'context': 'duplicate', 'request': 'send_message',
+                 'seq': retried}
+            )
+        await member.close()
+        await guest.close()
+
+
+class ExitRoomTests(ConsumerTestCase):
+
+    async def test_reconnect_after_exit_gets_a_new_room(self):
+        member, state = await self.connect('test_0')
+        guest, _ = await self.connect('test_1')
+        room = state['room']
+
+        await member.send({'context': 'exit_room'})
+        await self.receive_until(guest, 'notification', type='exit_room')
+        await guest.close()
+
+        # Сразу после уведомления комната и ссылки на неё уже удалены.
+        # Right after the notification the room and the pointers to it
+        # are gone already.
+        guest, state = await self.connect('test_1')
+        self.assertNotEqual(state['room'], room)
+        self.assertEqual(state['context'], 'connect')
+        await guest.close()
+        await member.close()
+
+
+class HeartbeatTests(ConsumerTestCase):
+    """
+    Обходы heartbeat вызываются тестом с нужным временем, а не ждут
+    HEARTBEAT_INTERVAL.
+
+    The heartbeat sweeps are called by the test with the time it needs
+    rather than waiting for HEARTBEAT_INTERVAL.
+    """
+
+    def setUp(self):
+        super().setUp()
+
+        if heartbeat.heartbeat is None:
+            self.skipTest('HEARTBEAT_INTERVAL is 0')
+        self.heartbeat = heartbeat.heartbeat
+
+    def consumer(self, username):
+        return next(connection for connection in self.heartbeat.connections
+                    if connection.username == username)
+
+    @staticmethod
+    async def close_code(client):
+        while True:
+            message = await asyncio.wait_for(
+                client.communicator.output_queue.get(), TIMEOUT
+            )
+
+            if message['type'] == 'websocket.close':
+                return message['code']
+
+    @staticmethod
+    def evicted(reason):
+        return EVICTED_CONNECTIONS.values.get((reason,), 0)
+
+    async def test_dead_connection_is_evicted_and_keeps_the_room(self):
+        member, state = await self.connect('test_0')
+        guest, _ = await self.connect('test_1')
+        connected = time.monotonic()
+        evicted = self.evicted('timeout')
+
+        # Обоим молчащим соединениям уходит ping, отвечает только игрок.
+        # Both silent connections get a ping, only the member answers.
+        self.assertEqual(
+            await self.heartbeat.sweep(connected + self.heartbeat.interval), 0
+        )
+        self.assertEqual(await member.receive(TIMEOUT), {'context': 'ping'})
+        self.assertEqual(await guest.receive(TIMEOUT), {'context': 'ping'})
+        await member.send({'context': 'pong'})
+
+        while self.consumer('test_0').seen < connected:
+            await asyncio.sleep(0.01)
+        now = self.consumer('test_0').seen + self.heartbeat.timeout
+
+        self.assertEqual(await self.heartbeat.sweep(now), 1)
+        self.assertEqual(await self.close_code(guest),
+                         heartbeat.CLOSE_CODES['timeout'])
+        self.assertEqual(self.evicted('timeout'), evicted + 1)
+        self.assertEqual([connection.username
+                          for connection in self.heartbeat.connections],
+                         ['test_0'])
+
+        # Вытесненный клиент возвращается в свою комнату.
+        # The evicted client gets back to its room.
+        guest, state = await self.connect('test_1', room=state['room'],
+                                          version=0)
+        self.assertEqual(state['context'], 'resync')
+        await guest.close()
+        await member.close()
+
+    async def test_idle_player_is_evicted_and_leaves_the_room(self):
+        member, state = await self.connect('test_0')
+        guest, _ = await self.connect('test_1')
+        now = time.monotonic()
+        evicted = self.evicted('idle')
+
+        # Игрок отвечал на ping, но сам ничего не отправлял.
+        # The member answered pings but sent nothing of their own.
+        self.consumer('test_0').active = now - self.heartbeat.idle_timeout - 1
+
+        self.assertEqual(await self.heartbeat.sweep(now), 1)
+        self.assertEqual(await self.close_code(member),
+                         heartbeat.CLOSE_CODES['idle'])
+        await self.receive_until(guest, 'notification', type='exit_room')
+        self.assertEqual(self.evicted('idle'), evicted + 1)
+
+        member, new_state = await self.connect('test_0')
+        self.assertNotEqual(new_state['room'], state['room'])
+        await member.close()
+        await guest.close()
+
+
+class ChannelStallTests(ConsumerTestCase):
+
+    async def test_chat_is_not_held_up_by_other_rooms(self):
+        # Комната, где никто ничего не отправляет, и комната с чатом в
+        # одном процессе: приём одной не должен ждать другую.
+        # A room where nobody sends anything and a room with chat in one
+        # process: receiving for one must not wait for the other.
+        idle = [(await self.connect(username, binary=True))[0]
+                for username in ('test_0', 'test_1')]
+        sender, _ = await self.connect('test_2', binary=True)
+        receiver, _ = await self.connect('test_3', binary=True)
+
+        for number in range(10):
+            await sender.send({'context': 'send_message', 'seq': number + 1,
+                               'message': str(number)})
+            frame = await asyncio.wait_for(self.receive_until(
+                receiver, 'message'
+            ), 1)
+            self.assertEqual(frame['message']['message'], str(number))
+
+        for client in idle + [sender, receiver]:
+            await client.close()
@@ -0,0 +1,95 @@
+import time
+
+from django.conf import settings
+
+
+class TokenBucket:
+    """
+    Корзина маркеров: rate маркеров в секунду, не больше capacity.
+    Каждый кадр забирает один маркер.
+
+    A token bucket: rate tokens per second, at most capacity. Every frame
+    takes one token.
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, now=None):
+        now = time.monotonic() if now is None else now
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class Throttle:
+    """
+    Ограничение частоты кадров клиента по контекстам: корзины каждого
+    соединения и общие корзины комнаты в этом процессе (игроки комнаты
+    на разных воркерах ограничиваются каждым воркером отдельно).
+    Контексты без заданной частоты не ограничиваются.
+
+    Client frame rate limiting per context: buckets of every connection
+    and shared room buckets in this process (players of a room on
+    different workers are limited by every worker separately). Contexts
+    without a rate are not limited.
+    """
+
+    def __init__(self, connection_rates, room_rates):
+        self.connection_rates = connection_rates
+        self.room_rates = room_rates
+        self.rooms = {}
+
+    @staticmethod
+    def buckets(rates):
+        return {context: TokenBucket(rate, capacity)
+                for context, (rate, capacity) in rates.items()}
+
+    def connection(self):
+        """
+        Корзины нового соединения.
+
+        The buckets of a new connection.
+        """
+        return self.buckets(self.connection_rates)
+
+    def limited(self, connection, room, context):
+        """
+        Забирает маркер кадра. Возвращает None, если кадр можно
+        обработать, иначе то, что его ограничило: 'connection' или 'room'.
+
+        Takes a token for a frame. Returns None if the frame may be
+        handled, otherwise what limited it: 'connection' or 'room'.
+        """
+        bucket = connection.get(context)
+
+        if bucket is not None and not bucket.take():
+            return 'connection'
+
+        if context not in self.room_rates:
+            return None
+        buckets = self.rooms.get(room)
+
+        if buckets is None:
+            buckets = self.rooms[room] = self.buckets(self.room_rates)
+
+        if not buckets[context].take():
+            return 'room'
+        return None
+
+    def forget(self, room):
+        self.rooms.pop(room, None)
+
+
+frame_throttle = Throttle(settings.THROTTLE_CONNECTION_RATES,
+                          settings.THROTTLE_ROOM_RATES)
@@ -1,8 +1,7 @@
 from django.urls import path
 from django.contrib.auth import views
 
-from .views import main, register
-from .consumers import InterfaceConsumer
+from .views import main, register, replay
 
 
 app_name = 'master'
@@ -11,9 +10,6 @@ urlpatterns = [
     path('', main, name='main'),
     path('login/', views.LoginView.as_view(template_name='login.html'),
          name='login'),
-    path('register/', register, name='register')
-]
-
-websocket_urlpatterns = [
-    path('ws/game/', InterfaceConsumer.as_asgi())
+    path('register/', register, name='register'),
+    path('games/<int:game_id>/replay/', replay, name='replay')
 ]
@@ -1,8 +1,10 @@
-from django.http import HttpResponseRedirect
-from django.shortcuts import render
+from django.db.models import Q
+from django.http import HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, render
 from django.views.decorators.csrf import csrf_exempt
 
 from .forms import UserRegistrationForm
+from .models import Game
 
 
 @csrf_exempt
@@ -28,3 +30,25 @@ def register(request):
     else:
         user_form = UserRegistrationForm()
     return render(request, 'register.html', {'user_form': user_form})
+
+
+def replay(request, game_id):
+    """
+    Состояние архивной игры после первых upto записей истории (по
+    умолчанию - после всех) в формате, который main.js получает при
+    подключении. Его видят только игроки: в нём оба флота и чат.
+
+    The state of an archived game after the first upto history entries
+    (all of them by default) in the format main.js gets on connect. Only
+    the players of the game see it: it holds both fleets and the chat.
+    """
+    if not request.user.is_authenticated:
+        return HttpResponseRedirect('/login/')
+    username = request.user.username
+    game = get_object_or_404(Game.objects.filter(
+        Q(member=username) | Q(guest=username)
+    ), pk=game_id)
+    upto = request.GET.get('upto', '')
+    state = game.replay(int(upto) if upto.isdigit() else None)
+    return JsonResponse({'room': game.room, 'winner': game.winner,
+                         'length': game.length, 'data': state})